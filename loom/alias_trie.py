@@ -1,8 +1,13 @@
+import re
+
 from bson.objectid import ObjectId
-from typing import List, Union
+from string import punctuation
+from typing import Dict, List, Set, Tuple, Union
 
 
 class AliasTrieMatch:
+    __slots__ = ('length', 'page_id', 'alias_id')
+
     def __init__(self, length, page_id, alias_id):
         self.length = length
         self.page_id = page_id
@@ -10,55 +15,186 @@ class AliasTrieMatch:
 
 
 class AliasTrie:
+    """
+    A trie of tokenized alias names, used to find passive links in paragraph text.
+
+    Rather than allocating a node object per token, the trie is stored as flat per-node tables indexed by node number,
+    with each child table a small `{token: node}` dictionary. Each step of a match is then one dictionary lookup, the
+    same as in an object-per-node trie, without the attribute and call overhead.
+    """
+    ROOT = 0
+
     def __init__(self):
-        self.root = AliasTrieNode(None, is_terminal=True, page_id=None, alias_id=None, depth=0)
+        self._children: List[Dict[str, int]] = [{}]
+        # Most token positions in a sentence do not start an alias, so the root's children are kept at hand to reject
+        # those positions with a single lookup.
+        self._root_children: Dict[str, int] = self._children[self.ROOT]
+        # Every token in any alias, so that the single-pass scan can restart at the root on any other token.
+        self._tokens: Set[str] = set()
+        self._depths: List[int] = [0]
+        self._terminals: List[Union[Tuple[ObjectId, ObjectId], None]] = [None]
+        # Aho-Corasick links are only needed for `find_all_matches_in_tokens`, so they are built lazily.
+        self._failure_links: Union[List[int], None] = None
+        self._output_links: Union[List[Union[int, None]], None] = None
 
     def add_path(self, path: List[str], page_id: ObjectId, alias_id: ObjectId):
         if not path:
             return
-        node = self.root
-        for i in range(len(path)):
-            token = path[i]
-            next_node = node.get_child(token)
+        node = self.ROOT
+        self._tokens.update(path)
+        for token in path:
+            children = self._children[node]
+            next_node = children.get(token)
             if next_node is None:
-                next_node = AliasTrieNode(token, is_terminal=False, page_id=None, alias_id=None, depth=i+1)
-                node.add_child(next_node)
+                next_node = len(self._children)
+                children[token] = next_node
+                self._children.append({})
+                self._depths.append(self._depths[node] + 1)
+                self._terminals.append(None)
             node = next_node
-        node.is_terminal = True
-        node.page_id = page_id
-        node.alias_id = alias_id
+        self._terminals[node] = (page_id, alias_id)
+        # The structure changed, so any previously built links are stale.
+        self._failure_links = None
+        self._output_links = None
+
+    def _build_match(self, node: int) -> AliasTrieMatch:
+        page_id, alias_id = self._terminals[node]
+        return AliasTrieMatch(self._depths[node], page_id, alias_id)
 
     def find_longest_match_in_tokens(self, tokens, *, from_index) -> Union[AliasTrieMatch, None]:
-        node = self.root.find_next_terminal(tokens, from_index, None)
-        if node.depth > 0:
-            return AliasTrieMatch(node.depth, node.page_id, node.alias_id)
-        else:
+        try:
+            node = self._root_children.get(tokens[from_index])
+        except IndexError:
+            return None
+        if node is None:
             return None
+        children = self._children
+        terminals = self._terminals
+        last_terminal_node = node if terminals[node] is not None else None
+        for index in range(from_index + 1, len(tokens)):
+            node = children[node].get(tokens[index])
+            if node is None:
+                break
+            if terminals[node] is not None:
+                last_terminal_node = node
+        if last_terminal_node is None:
+            return None
+        return self._build_match(last_terminal_node)
 
+    def find_all_matches_in_tokens(self, tokens) -> List[Tuple[int, AliasTrieMatch]]:
+        """
+        Scan the tokens once (Aho-Corasick) and return the `(start_index, match)` pairs that repeated calls to
+        `find_longest_match_in_tokens` would produce when skipping past each match, i.e. leftmost-longest and
+        non-overlapping.
+        """
+        if self._failure_links is None:
+            self._build_links()
+        known_tokens = self._tokens
+        children = self._children
+        depths = self._depths
+        terminals = self._terminals
+        failure_links = self._failure_links
+        output_links = self._output_links
+        root = self.ROOT
+        # Longest terminal node that begins at each start index.
+        longest_from: Dict[int, int] = {}
+        node = root
+        for end_index, token in enumerate(tokens):
+            if token not in known_tokens:
+                node = root
+                continue
+            while node != root and token not in children[node]:
+                node = failure_links[node]
+            node = children[node].get(token, root)
+            match_node = node if terminals[node] is not None else output_links[node]
+            while match_node is not None:
+                start_index = end_index - depths[match_node] + 1
+                best_node = longest_from.get(start_index)
+                if best_node is None or depths[match_node] > depths[best_node]:
+                    longest_from[start_index] = match_node
+                match_node = output_links[match_node]
+        matches = []
+        next_free_index = 0
+        for start_index in sorted(longest_from):
+            if start_index < next_free_index:
+                continue
+            match_node = longest_from[start_index]
+            matches.append((start_index, self._build_match(match_node)))
+            next_free_index = start_index + depths[match_node]
+        return matches
 
-class AliasTrieNode:
-    def __init__(self, value: Union[str, None], *, is_terminal: bool, page_id: Union[ObjectId, None],
-                 alias_id: Union[ObjectId, None], depth: int):
-        self.is_terminal = is_terminal
-        self.children = {}
-        self.page_id = page_id
-        self.alias_id = alias_id
-        self.depth = depth
-        self.value = value
-
-    def find_next_terminal(self, tokens, next_token_index: int, last_terminal_node):  # -> AliasTrieNode
-        last_terminal_node = self if self.is_terminal else last_terminal_node
-        if not tokens or next_token_index >= len(tokens):
-            return last_terminal_node
-        token = tokens[next_token_index]
-        next_node = self.get_child(token)
-        if next_node is None:
-            return last_terminal_node
-        else:
-            return next_node.find_next_terminal(tokens, next_token_index + 1, last_terminal_node)
-
-    def get_child(self, child: str):
-        return self.children.get(child)
-
-    def add_child(self, child):
-        self.children[child.value] = child
+    def _build_links(self):
+        root = self.ROOT
+        children = self._children
+        terminals = self._terminals
+        failure_links = [root] * len(children)
+        output_links: List[Union[int, None]] = [None] * len(children)
+        # Breadth-first, so every node's failure link is resolved before its children need it.
+        queue = list(children[root].values())
+        for node in queue:
+            for token, child in children[node].items():
+                failure = failure_links[node]
+                while failure != root and token not in children[failure]:
+                    failure = failure_links[failure]
+                failure = children[failure].get(token, root)
+                failure_links[child] = failure
+                output_links[child] = failure if terminals[failure] is not None else output_links[failure]
+                queue.append(child)
+        self._failure_links = failure_links
+        self._output_links = output_links
+
+
+class AliasNormalizer:
+    """
+    Maps tokens to the form used for alias matching, so that one alias can match its spelling variants.
+
+    Each kind of normalization is off by default, so that aliases match exactly unless configured otherwise.
+    Normalization is one-to-one over tokens, which keeps match lengths valid for the original tokens. A token that would
+    normalize to nothing (such as a lone `'s` or `,`) keeps its punctuation instead.
+    """
+    PUNCTUATION = punctuation + '\u2018\u2019\u201c\u201d\u2013\u2014\u2026'
+    POSSESSIVE_REGEX = re.compile(r"['\u2019][sS]?$")
+
+    def __init__(self, *, case_fold=False, strip_possessives=False, strip_punctuation=False):
+        self.case_fold = case_fold
+        self.strip_possessives = strip_possessives
+        self.strip_punctuation = strip_punctuation
+
+    def normalize_token(self, token: str) -> str:
+        if self.case_fold:
+            token = token.casefold()
+        normalized = token
+        if self.strip_possessives:
+            normalized = self.POSSESSIVE_REGEX.sub('', normalized)
+        if self.strip_punctuation:
+            normalized = normalized.strip(self.PUNCTUATION)
+        return normalized if normalized else token
+
+    def normalize_tokens(self, tokens: List[str]) -> List[str]:
+        return [self.normalize_token(token) for token in tokens]
+
+
+class AliasIndex:
+    """
+    The passive-link index for a wiki: normalized alias token paths mapped back to their canonical aliases.
+
+    Alias names are normalized once, when they are added, so matching a sentence only normalizes the sentence's tokens.
+    When several aliases normalize to the same path, the first one added is kept.
+    """
+    def __init__(self, normalizer: AliasNormalizer):
+        self.normalizer = normalizer
+        self.trie = AliasTrie()
+        self._paths = set()
+
+    def add_alias(self, tokens: List[str], page_id: ObjectId, alias_id: ObjectId):
+        path = tuple(self.normalizer.normalize_tokens(tokens))
+        if not path or path in self._paths:
+            return
+        self._paths.add(path)
+        self.trie.add_path(list(path), page_id, alias_id)
+
+    def normalize_tokens(self, tokens: List[str]) -> List[str]:
+        return self.normalizer.normalize_tokens(tokens)
+
+    def find_all_matches_in_tokens(self, tokens: List[str]) -> List[Tuple[int, AliasTrieMatch]]:
+        return self.trie.find_all_matches_in_tokens(self.normalize_tokens(tokens))
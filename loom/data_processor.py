@@ -5,6 +5,7 @@ from loom.messages.outgoing import GetWikiInformationOutgoingMessage, GetStoryIn
 from loom.serialize import decode_string_to_bson, encode_bson_to_string
 
 import re
+import time
 
 from bson import ObjectId
 from typing import Dict
@@ -13,12 +14,22 @@ JSON = Dict
 
 
 class DataProcessor:
-    def __init__(self, interface):
-        self.dispatcher = DemoDataDispatcher(interface)
+    def __init__(self, interface, bulk=False):
+        self.dispatcher = DemoDataDispatcher(interface, bulk)
         self.message_factory = DemoIncomingMessageFactory()
         self.responses = {}
+        self.load_time = 0.0
+
+    @property
+    def paragraphs_loaded(self) -> int:
+        return self.dispatcher.paragraphs_added
+
+    @property
+    def paragraphs_per_second(self) -> float:
+        return self.paragraphs_loaded / self.load_time if self.load_time else 0.0
 
     async def load_file(self, filename, approve_passive_links: bool):
+        start = time.perf_counter()
         with open(filename) as json_file:
             json_string = json_file.read()
         json = decode_string_to_bson(json_string)
@@ -39,10 +50,10 @@ class DataProcessor:
         await self.process_list(json['dispatch_list'], user_id, wiki_id, story_id)
         if approve_passive_links:
             wiki_alias_list = await self.dispatcher.db_interface.get_wiki_alias_list(wiki_id)
-            for alias in wiki_alias_list:
-                for passive_link in alias['passive_links']:
-                    await self.dispatcher.db_interface.approve_passive_link(passive_link['passive_link_id'], story_id,
-                                                                            wiki_id)
+            passive_link_ids = [passive_link['passive_link_id']
+                                for alias in wiki_alias_list for passive_link in alias['passive_links']]
+            await self.dispatcher.db_interface.approve_passive_links(passive_link_ids, story_id, wiki_id)
+        self.load_time = time.perf_counter() - start
 
     async def create_user(self, user_json):
         user_id = await self.dispatcher.db_interface.create_user(**user_json)
@@ -3,3 +3,7 @@ from .mongodb_clients import (
     MongoDBClient,
     MongoDBMotorTornadoClient, MongoDBMotorAsyncioClient,
 )
+from .mongodb_paragraph_clients import (
+    ParagraphDocumentsMixin,
+    MongoDBMotorTornadoParagraphsClient, MongoDBMotorAsyncioParagraphsClient,
+)
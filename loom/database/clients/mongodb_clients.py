@@ -1,10 +1,12 @@
 from loom.loggers import db_queries_log, LogLevel
 
 from bson.objectid import ObjectId
+from itertools import chain
 from motor.core import AgnosticClient, AgnosticDatabase, AgnosticCollection
-from pymongo.results import DeleteResult, UpdateResult
+from pymongo import ASCENDING, UpdateOne
+from pymongo.results import BulkWriteResult, DeleteResult, InsertManyResult, UpdateResult
 from tornado.escape import url_escape
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple, Union
 
 
 class ClientError(Exception):
@@ -38,6 +40,12 @@ class ExtraUpdatesError(BadUpdateError):
 class MongoDBClient:
     logger = db_queries_log
 
+    # The lists in a section or segment that hold its children.
+    SUBSECTION_FIELDS = ('preceding_subsections', 'inner_subsections', 'succeeding_subsections')
+    SUBSEGMENT_FIELDS = ('segments',)
+
+    _reference_indexes_created = False
+
     def __init__(self, mongodb_client_class, db_name='inkweaver', db_host='localhost', db_port=27017, db_user=None,
                  db_pass=None):
         if db_user and db_pass:
@@ -94,6 +102,8 @@ class MongoDBClient:
             self.links,
             self.passive_links,
             self.aliases,
+            self.references,
+            self.jobs,
         ]
 
     @property
@@ -132,6 +142,14 @@ class MongoDBClient:
     def aliases(self) -> AgnosticCollection:
         return self.database.aliases
 
+    @property
+    def references(self) -> AgnosticCollection:
+        return self.database.references
+
+    @property
+    def jobs(self) -> AgnosticCollection:
+        return self.database.jobs
+
     async def authenticate(self, username, password):
         await self.database.authenticate(username, password)
 
@@ -150,6 +168,137 @@ class MongoDBClient:
         if update_result.matched_count == 0:
             raise NoMatchError                  # pragma: no cover
 
+    @staticmethod
+    def assert_bulk_update_was_successful(bulk_result: BulkWriteResult, expected_match_count: int):
+        if bulk_result.matched_count < expected_match_count:
+            raise NoMatchError                  # pragma: no cover
+
+    async def _bulk_push_by_id(self, collection: AgnosticCollection, field: str, values_by_id: Dict[ObjectId, List]):
+        """
+        Append each list of values to `field` in the document with the corresponding ID, using one update per document
+        sent in a single bulk write.
+        """
+        bulk_result: BulkWriteResult = await collection.bulk_write([
+            UpdateOne(
+                filter={'_id': _id},
+                update={
+                    '$push': {
+                        field: {
+                            '$each': values,
+                        }
+                    }
+                }
+            ) for _id, values in values_by_id.items()
+        ], ordered=False)
+        self.assert_bulk_update_was_successful(bulk_result, len(values_by_id))
+
+    async def _set_parent_id(self, collection: AgnosticCollection, _id: ObjectId, parent_id: Union[ObjectId, None]):
+        update_result: UpdateResult = await collection.update_one(
+            filter={'_id': _id},
+            update={
+                '$set': {
+                    'parent_id': parent_id,
+                }
+            }
+        )
+        self.assert_update_was_successful(update_result)
+
+    async def _get_ancestor_ids(self, collection: AgnosticCollection, _id: ObjectId,
+                                child_fields: Tuple[str, ...]) -> List[ObjectId]:
+        """
+        Follow `parent_id` from the given document up to its root, returning the IDs passed on the way from nearest to
+        farthest.
+
+        A document created before parent IDs were recorded has its parent found through the `child_fields` lists that
+        contain it, and that parent is then recorded.
+        """
+        ancestor_ids = []
+        while True:
+            parent_id = await self._get_parent_id(collection, _id, child_fields)
+            if parent_id is None or parent_id in ancestor_ids:
+                return ancestor_ids
+            ancestor_ids.append(parent_id)
+            _id = parent_id
+
+    async def _get_parent_id(self, collection: AgnosticCollection, _id: ObjectId,
+                             child_fields: Tuple[str, ...]) -> Union[ObjectId, None]:
+        document = await collection.find_one({'_id': _id}, projection={'parent_id': 1})
+        if document is None:
+            raise NoMatchError
+        if 'parent_id' in document:
+            return document['parent_id']
+        parent = await collection.find_one({'$or': [{field: _id} for field in child_fields]}, projection={'_id': 1})
+        parent_id = None if parent is None else parent['_id']
+        await self._set_parent_id(collection, _id, parent_id)
+        return parent_id
+
+    async def _move_child(self, collection: AgnosticCollection, child_fields: Tuple[str, ...], child_id: ObjectId,
+                          to_parent_id: ObjectId, to_field: str, at_index=None):
+        """
+        Move a child into `to_field` of `to_parent_id` at `at_index`, writing only to the child and its old and new
+        parents.
+
+        Within one parent, the parent's child lists are rewritten in a single update that only applies if they have not
+        changed since they were read. Between parents, the child's `parent_id` is switched first, and only if it still
+        names the old parent, so that of two concurrent moves of the same child only one goes ahead.
+        """
+        parent_id = await self._get_parent_id(collection, child_id, child_fields)
+        if parent_id == to_parent_id:
+            parent = await collection.find_one({'_id': parent_id}, projection={field: 1 for field in child_fields})
+            if parent is None:
+                raise NoMatchError
+            child_lists = {field: [_id for _id in parent[field] if _id != child_id] for field in child_fields}
+            if at_index is None:
+                child_lists[to_field].append(child_id)
+            else:
+                child_lists[to_field].insert(at_index, child_id)
+            update_result: UpdateResult = await collection.update_one(
+                filter=dict(parent, _id=parent_id),
+                update={
+                    '$set': child_lists
+                }
+            )
+            self.assert_update_was_successful(update_result)
+            return
+        update_result: UpdateResult = await collection.update_one(
+            filter={'_id': child_id, 'parent_id': parent_id},
+            update={
+                '$set': {
+                    'parent_id': to_parent_id,
+                }
+            }
+        )
+        self.assert_update_was_successful(update_result)
+        if parent_id is not None:
+            await collection.update_one(
+                filter={'_id': parent_id},
+                update={
+                    '$pull': {field: child_id for field in child_fields}
+                }
+            )
+        update_result: UpdateResult = await collection.update_one(
+            filter={'_id': to_parent_id},
+            update={
+                '$push': {
+                    to_field: self._insertion_parameters(child_id, at_index)
+                }
+            }
+        )
+        self.assert_update_was_successful(update_result)
+
+    async def _remove_child_from_parent(self, collection: AgnosticCollection, child_fields: Tuple[str, ...],
+                                        child_id: ObjectId):
+        parent_id = await self._get_parent_id(collection, child_id, child_fields)
+        if parent_id is not None:
+            update_result: UpdateResult = await collection.update_one(
+                filter={'_id': parent_id},
+                update={
+                    '$pull': {field: child_id for field in child_fields}
+                }
+            )
+            self.assert_update_was_successful(update_result)
+            await self._set_parent_id(collection, child_id, None)
+
     @staticmethod
     def assert_delete_one_successful(delete_result: DeleteResult):
         if delete_result.deleted_count == 0:
@@ -422,6 +571,7 @@ class MongoDBClient:
         section = {
             'title':                  title,
             'content':                list(),  # content is a list of "paragraph objects"
+            'parent_id':              None,
             'preceding_subsections':  list(),
             'inner_subsections':      list(),
             'succeeding_subsections': list(),
@@ -460,6 +610,8 @@ class MongoDBClient:
                  f'{{{at_index}}}')
 
     async def insert_preceding_subsection(self, subsection_id, to_section_id, at_index=None):
+        # The subsection is updated first, so that a missing subsection is never added to the parent.
+        await self._set_parent_id(self.sections, subsection_id, to_section_id)
         inner_parameters = self._insertion_parameters(subsection_id, at_index)
         update_result: UpdateResult = await self.sections.update_one(
             filter={'_id': to_section_id},
@@ -474,6 +626,8 @@ class MongoDBClient:
                  f'{{{at_index}}}')
 
     async def insert_inner_subsection(self, subsection_id, to_section_id, at_index=None):
+        # The subsection is updated first, so that a missing subsection is never added to the parent.
+        await self._set_parent_id(self.sections, subsection_id, to_section_id)
         inner_parameters = self._insertion_parameters(subsection_id, at_index)
         update_result: UpdateResult = await self.sections.update_one(
             filter={'_id': to_section_id},
@@ -487,6 +641,8 @@ class MongoDBClient:
         self.log(f'insert_inner_subsection {{{subsection_id}}} to section {{{to_section_id}}} at index {{{at_index}}}')
 
     async def insert_succeeding_subsection(self, subsection_id, to_section_id, at_index=None):
+        # The subsection is updated first, so that a missing subsection is never added to the parent.
+        await self._set_parent_id(self.sections, subsection_id, to_section_id)
         inner_parameters = self._insertion_parameters(subsection_id, at_index)
         update_result: UpdateResult = await self.sections.update_one(
             filter={'_id': to_section_id},
@@ -517,6 +673,38 @@ class MongoDBClient:
         self.assert_update_was_successful(update_result)
         self.log(f'insert_paragraph {{{paragraph_id}}} to section {{{to_section_id}}} at index {{{at_index}}}')
 
+    async def insert_paragraphs(self, to_section_id: ObjectId, paragraphs: List[Dict]):
+        """
+        Append several finished paragraphs to the end of a section with a single update. Each paragraph is given as a
+        dict holding its `_id`, `text`, `statistics`, `links`, `passive_links`, and `note`.
+        """
+        update_result: UpdateResult = await self.sections.update_one(
+            filter={'_id': to_section_id},
+            update={
+                '$push': {
+                    'content':       {'$each': [{
+                        '_id':        paragraph['_id'],
+                        'text':       paragraph['text'],
+                        'statistics': paragraph['statistics'],
+                    } for paragraph in paragraphs]},
+                    'links':         {'$each': [{
+                        'paragraph_id': paragraph['_id'],
+                        'links':        paragraph['links'],
+                    } for paragraph in paragraphs]},
+                    'passive_links': {'$each': [{
+                        'paragraph_id':  paragraph['_id'],
+                        'passive_links': paragraph['passive_links'],
+                    } for paragraph in paragraphs]},
+                    'notes':         {'$each': [{
+                        'paragraph_id': paragraph['_id'],
+                        'note':         paragraph['note'],
+                    } for paragraph in paragraphs]},
+                }
+            }
+        )
+        self.assert_update_was_successful(update_result)
+        self.log(f'insert_paragraphs to section {{{to_section_id}}}; inserted {len(paragraphs)}')
+
     async def insert_note_for_paragraph(self, paragraph_id: ObjectId, in_section_id, note=None, at_index=None):
         inner_parameters = self._insertion_parameters({
             'paragraph_id': paragraph_id,
@@ -564,6 +752,25 @@ class MongoDBClient:
         self.assert_update_was_successful(update_result)
         self.log(f'set_story_wiki {{{story_id}}} to wiki {{{wiki_id}}}')
 
+    async def set_stories_wikis(self, wikis_by_story: Dict[ObjectId, ObjectId]):
+        """
+        Set the wiki of each story, using one update per story sent in a single bulk write.
+        """
+        if not wikis_by_story:
+            return
+        bulk_result: BulkWriteResult = await self.stories.bulk_write([
+            UpdateOne(
+                filter={'_id': story_id},
+                update={
+                    '$set': {
+                        'wiki_id': wiki_id
+                    }
+                }
+            ) for story_id, wiki_id in wikis_by_story.items()
+        ], ordered=False)
+        self.assert_bulk_update_was_successful(bulk_result, len(wikis_by_story))
+        self.log(f'set_stories_wikis for {len(wikis_by_story)} stories')
+
     async def set_story_title(self, story_id: ObjectId, new_title: str):
         update_result: UpdateResult = await self.stories.update_one(
             filter={'_id': story_id},
@@ -618,6 +825,26 @@ class MongoDBClient:
         self.assert_update_was_successful(update_result)
         self.log(f'set_paragraph_text {{{paragraph_id}}} in section {{{in_section_id}}}')
 
+    async def set_paragraph_texts(self, texts: List[Tuple[ObjectId, ObjectId, str]]):
+        """
+        Set the text of each `(section_id, paragraph_id, text)` paragraph, using one update per paragraph sent in a
+        single bulk write.
+        """
+        if not texts:
+            return
+        bulk_result: BulkWriteResult = await self.sections.bulk_write([
+            UpdateOne(
+                filter={'_id': section_id, 'content._id': paragraph_id},
+                update={
+                    '$set': {
+                        'content.$.text': text
+                    }
+                }
+            ) for section_id, paragraph_id, text in texts
+        ], ordered=False)
+        self.assert_bulk_update_was_successful(bulk_result, len(texts))
+        self.log(f'set_paragraph_texts; set {len(texts)} paragraphs')
+
     async def set_paragraph_statistics(self, paragraph_id: ObjectId, wf_table: dict, word_count: int,
                                        in_section_id: ObjectId):
         update_result: UpdateResult = await self.sections.update_one(
@@ -656,14 +883,19 @@ class MongoDBClient:
         self.assert_update_was_successful(update_result)
         self.log(f'set_note for paragraph {{{paragraph_id}}} in section {{{section_id}}}')
 
-    async def get_story(self, story_id: ObjectId) -> Dict:
-        result = await self.stories.find_one({'_id': story_id})
+    async def get_story(self, story_id: ObjectId, projection=None) -> Dict:
+        result = await self.stories.find_one({'_id': story_id}, projection=projection)
         if result is None:
             self.log(f'get_story {{{story_id}}}  FAILED')
             raise NoMatchError
         self.log(f'get_story {{{story_id}}}')
         return result
 
+    async def get_stories(self, story_ids: List[ObjectId], projection=None) -> List[Dict]:
+        results = await self.stories.find({'_id': {'$in': story_ids}}, projection=projection).to_list(None)
+        self.log(f'get_stories; found {len(results)} of {len(story_ids)}')
+        return results
+
     async def get_stories_with_wiki_id(self, wiki_id: ObjectId):
         filter = {'wiki_id': wiki_id}
         results = []
@@ -675,8 +907,8 @@ class MongoDBClient:
         self.log(f'get_stories_with_wiki_id for wiki {{{wiki_id}}}')
         return results
 
-    async def get_section(self, section_id: ObjectId) -> Dict:
-        result = await self.sections.find_one({'_id': section_id})
+    async def get_section(self, section_id: ObjectId, projection=None) -> Dict:
+        result = await self.sections.find_one({'_id': section_id}, projection=projection)
         if result is None:
             self.log(f'get_section {{{section_id}}} FAILED')
             raise NoMatchError
@@ -697,6 +929,15 @@ class MongoDBClient:
         self.log(f'get_section_statistics {{{section_id}}}')
         return projected_section['statistics']
 
+    async def get_section_ancestor_ids(self, section_id: ObjectId) -> List[ObjectId]:
+        try:
+            ancestor_ids = await self._get_ancestor_ids(self.sections, section_id, self.SUBSECTION_FIELDS)
+        except NoMatchError:
+            self.log(f'get_section_ancestor_ids {{{section_id}}} FAILED')
+            raise
+        self.log(f'get_section_ancestor_ids {{{section_id}}}')
+        return ancestor_ids
+
     async def get_paragraph_ids(self, section_id: ObjectId):
         pipeline = [{'$unwind': '$content'}, {'$match': {'_id': section_id}},
                     {'$project': {'content._id': 1, '_id': 0}}]
@@ -723,6 +964,28 @@ class MongoDBClient:
         self.log(f'get_paragraph_text {{{paragraph_id}}} in section {{{section_id}}}')
         return projected_section['content'][0]['text']
 
+    async def get_paragraph_texts(self, paragraphs: List[Tuple[ObjectId, ObjectId]]) -> Dict[ObjectId, str]:
+        """
+        Return the text of each `(section_id, paragraph_id)` paragraph keyed by paragraph ID, reading each section once.
+        """
+        if not paragraphs:
+            return {}
+        paragraph_ids_by_section = {}
+        for section_id, paragraph_id in paragraphs:
+            paragraph_ids_by_section.setdefault(section_id, set()).add(paragraph_id)
+        texts = {}
+        async for section in self.sections.find({'_id': {'$in': list(paragraph_ids_by_section)}},
+                                                projection={'content._id': 1, 'content.text': 1}):
+            paragraph_ids = paragraph_ids_by_section[section['_id']]
+            for paragraph in section['content']:
+                if paragraph['_id'] in paragraph_ids:
+                    texts[paragraph['_id']] = paragraph['text']
+        if len(texts) < len({paragraph_id for _, paragraph_id in paragraphs}):
+            self.log(f'get_paragraph_texts; found {len(texts)} of {len(paragraphs)} FAILED')
+            raise NoMatchError
+        self.log(f'get_paragraph_texts; found {len(texts)} of {len(paragraphs)}')
+        return texts
+
     async def get_paragraph_statistics(self, section_id: ObjectId, paragraph_id: ObjectId):
         projected_section = await self.sections.find_one(
             filter={'_id': section_id, 'content._id': paragraph_id},
@@ -745,19 +1008,16 @@ class MongoDBClient:
         self.log(f'delete_story {{{story_id}}}')
 
     async def remove_section_from_parent(self, section_id: ObjectId):
-        update_result: UpdateResult = await self.sections.update_many(
-            filter={},
-            update={
-                '$pull': {
-                    'preceding_subsections':  section_id,
-                    'inner_subsections':      section_id,
-                    'succeeding_subsections': section_id,
-                }
-            }
-        )
-        self.assert_update_was_successful(update_result)
+        await self._remove_child_from_parent(self.sections, self.SUBSECTION_FIELDS, section_id)
         self.log(f'remove_section_from_parent {{{section_id}}}')
 
+    async def move_subsection(self, subsection_id: ObjectId, to_section_id: ObjectId, subsection_field: str,
+                              at_index=None):
+        await self._move_child(self.sections, self.SUBSECTION_FIELDS, subsection_id, to_section_id, subsection_field,
+                               at_index)
+        self.log(f'move_subsection {{{subsection_id}}} to {subsection_field} of section {{{to_section_id}}} at index '
+                 f'{{{at_index}}}')
+
     async def delete_section(self, section_id: ObjectId):
         await self.remove_section_from_parent(section_id)
         delete_result: DeleteResult = await self.sections.delete_one(
@@ -855,6 +1115,7 @@ class MongoDBClient:
     async def create_segment(self, title: str, template_headings=None, _id=None) -> ObjectId:
         segment = {
             'title':             title,
+            'parent_id':         None,
             'segments':          list(),
             'pages':             list(),
             'template_headings': list(),
@@ -868,11 +1129,29 @@ class MongoDBClient:
         self.log(f'create_segment {{{title}}}; inserted ID {{{result.inserted_id}}}')
         return result.inserted_id
 
+    async def create_segments(self, segments: List[Tuple[ObjectId, str, ObjectId, List[ObjectId], List[str]]]):
+        """
+        Insert several segments in a single round trip. Each segment is given as an
+        `(_id, title, parent_id, child_segment_ids, template_heading_titles)` tuple, so a whole tree can be written at
+        once.
+        """
+        documents = [{
+            '_id':               _id,
+            'title':             title,
+            'parent_id':         parent_id,
+            'segments':          list(child_segment_ids),
+            'pages':             list(),
+            'template_headings': [{'title': heading_title, 'text': ''} for heading_title in template_heading_titles],
+            'statistics':        None,
+        } for _id, title, parent_id, child_segment_ids, template_heading_titles in segments]
+        result: InsertManyResult = await self.segments.insert_many(documents)
+        self.log(f'create_segments; inserted {len(result.inserted_ids)}')
+        return result.inserted_ids
+
     async def create_page(self, title: str, template_headings=None, _id=None) -> ObjectId:
         page = {
             'title':      title,
             'headings':   list() if template_headings is None else template_headings,
-            'references': list(),  # list[Reference] (see Loom's wiki for more detail)
             'aliases':    dict(),
         }
         if _id is not None:
@@ -896,6 +1175,8 @@ class MongoDBClient:
                  f'{{{at_index}}}')
 
     async def insert_segment_to_parent_segment(self, child_segment: ObjectId, parent_segment: ObjectId, at_index=None):
+        # The child is updated first, so that a missing segment is never added to the parent.
+        await self._set_parent_id(self.segments, child_segment, parent_segment)
         inner_parameters = self._insertion_parameters(child_segment, at_index)
         update_result: UpdateResult = await self.segments.update_one(
             filter={'_id': parent_segment},
@@ -1051,42 +1332,81 @@ class MongoDBClient:
         self.assert_update_was_successful(update_result)
         self.log(f'set_heading_text for heading {{{title}}} in page {{{page_id}}}')
 
-    async def set_page_references(self, page_id: ObjectId, references: List):
-        update_result: UpdateResult = await self.pages.update_one(
-            filter={'_id': page_id},
-            update={
-                '$set': {
-                    'references': references,
-                }
-            }
-        )
-        self.assert_update_was_successful(update_result)
-        self.log(f'set_page_references {{{page_id}}}')
-
-    async def get_wiki(self, wiki_id: ObjectId) -> Dict:
-        result = await self.wikis.find_one({'_id': wiki_id})
+    async def get_wiki(self, wiki_id: ObjectId, projection=None) -> Dict:
+        result = await self.wikis.find_one({'_id': wiki_id}, projection=projection)
         if result is None:
             self.log(f'get_wiki {{{wiki_id}}} FAILED')
             raise NoMatchError
         self.log(f'get_wiki {{{wiki_id}}}')
         return result
 
-    async def get_segment(self, segment_id: ObjectId) -> Dict:
-        result = await self.segments.find_one({'_id': segment_id})
+    async def get_wikis(self, wiki_ids: List[ObjectId], projection=None) -> List[Dict]:
+        results = await self.wikis.find({'_id': {'$in': wiki_ids}}, projection=projection).to_list(None)
+        self.log(f'get_wikis; found {len(results)} of {len(wiki_ids)}')
+        return results
+
+    async def get_segment(self, segment_id: ObjectId, projection=None) -> Dict:
+        result = await self.segments.find_one({'_id': segment_id}, projection=projection)
         if result is None:
             self.log(f'get_segment {{{segment_id}}} FAILED')
             raise NoMatchError
         self.log(f'get_segment {{{segment_id}}}')
         return result
 
-    async def get_page(self, page_id: ObjectId) -> Dict:
-        result = await self.pages.find_one({'_id': page_id})
+    async def get_segments(self, segment_ids: List[ObjectId], projection=None) -> List[Dict]:
+        results = await self.segments.find({'_id': {'$in': segment_ids}}, projection=projection).to_list(None)
+        self.log(f'get_segments; found {len(results)} of {len(segment_ids)}')
+        return results
+
+    async def get_segment_subtree(self, segment_id: ObjectId, fields: List[str]) -> Dict[ObjectId, Dict]:
+        """
+        Return the segment and all of the segments below it, keyed by ID, with a single aggregation. Each document
+        holds only its `_id` and the given fields.
+        """
+        results = await self.segments.aggregate([
+            {'$match': {'_id': segment_id}},
+            {'$graphLookup': {
+                'from':             self.segments.name,
+                'startWith':        '$segments',
+                'connectFromField': 'segments',
+                'connectToField':   '_id',
+                'as':               'descendants',
+            }},
+            {'$project': dict({field: 1 for field in fields},
+                              **{f'descendants.{field}': 1 for field in ['_id'] + list(fields)})},
+        ]).to_list(None)
+        if not results:
+            self.log(f'get_segment_subtree {{{segment_id}}} FAILED')
+            raise NoMatchError
+        segment = results[0]
+        descendants = segment.pop('descendants')
+        subtree = {segment['_id']: segment}
+        subtree.update((descendant['_id'], descendant) for descendant in descendants)
+        self.log(f'get_segment_subtree {{{segment_id}}}; found {len(subtree)} segments')
+        return subtree
+
+    async def get_segment_ancestor_ids(self, segment_id: ObjectId) -> List[ObjectId]:
+        try:
+            ancestor_ids = await self._get_ancestor_ids(self.segments, segment_id, self.SUBSEGMENT_FIELDS)
+        except NoMatchError:
+            self.log(f'get_segment_ancestor_ids {{{segment_id}}} FAILED')
+            raise
+        self.log(f'get_segment_ancestor_ids {{{segment_id}}}')
+        return ancestor_ids
+
+    async def get_page(self, page_id: ObjectId, projection=None) -> Dict:
+        result = await self.pages.find_one({'_id': page_id}, projection=projection)
         if result is None:
             self.log(f'get_page {{{page_id}}} FAILED')
             raise NoMatchError
         self.log(f'get_page {{{page_id}}}')
         return result
 
+    async def get_pages(self, page_ids: List[ObjectId], projection=None) -> List[Dict]:
+        results = await self.pages.find({'_id': {'$in': page_ids}}, projection=projection).to_list(None)
+        self.log(f'get_pages; found {len(results)} of {len(page_ids)}')
+        return results
+
     async def get_template_heading(self, title: str, segment_id: ObjectId):
         result = await self.segments.find_one({
             '_id':                     segment_id,
@@ -1135,25 +1455,6 @@ class MongoDBClient:
         self.log(f'get_summaries_of_stories_using_wiki {{{wiki_id}}}')
         return results
 
-    async def get_pages_with_object_id_in_references(self, encoded_object_id: str):
-        # Create index to search for passive link in the text of the references
-        await self.pages.create_index([('references.context.text', 'text')])
-        query_filter = {
-            '$text': {
-                '$search': encoded_object_id
-            }
-        }
-        pages = []
-        async for doc in self.pages.find(query_filter):
-            if doc is None:
-                self.log(f'get_pages_with_object_id_in_references {{{encoded_object_id}}} FAILED')
-                await self.pages.drop_indexes()
-                raise NoMatchError
-            pages.append(doc)
-        await self.pages.drop_indexes()
-        self.log(f'get_pages_with_object_id_in_references {{{encoded_object_id}}}')
-        return pages
-
     async def delete_wiki(self, wiki_id: ObjectId):
         parent_update_result: UpdateResult = await self.users.update_many(
             filter={},
@@ -1179,17 +1480,14 @@ class MongoDBClient:
         self.log(f'delete_segment {{{segment_id}}}')
 
     async def remove_segment_from_parent(self, segment_id: ObjectId):
-        parent_update_result: UpdateResult = await self.segments.update_many(
-            filter={},
-            update={
-                '$pull': {
-                    'segments': segment_id
-                }
-            }
-        )
-        self.assert_update_was_successful(parent_update_result)
+        await self._remove_child_from_parent(self.segments, self.SUBSEGMENT_FIELDS, segment_id)
         self.log(f'remove_segment_from_parent {{{segment_id}}}')
 
+    async def move_segment(self, segment_id: ObjectId, to_parent_segment: ObjectId, at_index=None):
+        await self._move_child(self.segments, self.SUBSEGMENT_FIELDS, segment_id, to_parent_segment, 'segments',
+                               at_index)
+        self.log(f'move_segment {{{segment_id}}} to parent {{{to_parent_segment}}} at index {{{at_index}}}')
+
     async def delete_template_heading(self, template_heading_title: str, segment_id: ObjectId):
         update_result: UpdateResult = await self.segments.update_one(
             filter={'_id': segment_id},
@@ -1210,6 +1508,9 @@ class MongoDBClient:
             filter={'_id': page_id}
         )
         self.assert_delete_one_successful(delete_result)
+        await self.references.delete_many(
+            filter={'page_id': page_id}
+        )
         self.log(f'delete_page {{{page_id}}}')
 
     async def remove_page_from_parent(self, page_id: ObjectId):
@@ -1282,6 +1583,23 @@ class MongoDBClient:
         self.log(f'create_link to page {{{page_id}}} for alias {{{alias_id}}}; inserted ID {{{result.inserted_id}}}')
         return result.inserted_id
 
+    async def create_links(self, links: List[Tuple[ObjectId, ObjectId, ObjectId, ObjectId]], section_id=None,
+                           paragraph_id=None):
+        """
+        Insert several links from one paragraph in a single round trip. Each link is given as an
+        `(_id, alias_id, page_id, story_id)` tuple, with its ID allocated by the caller.
+        """
+        documents = [{
+            '_id':      _id,
+            'context':  self._build_link_context(story_id, section_id, paragraph_id, None),
+            'alias_id': alias_id,
+            'page_id':  page_id,
+        } for _id, alias_id, page_id, story_id in links]
+        result: InsertManyResult = await self.links.insert_many(documents)
+        self.log(f'create_links in paragraph {{{paragraph_id}}} in section {{{section_id}}}; '
+                 f'inserted {len(result.inserted_ids)}')
+        return result.inserted_ids
+
     async def get_link(self, link_id: ObjectId):
         result = await self.links.find_one({'_id': link_id})
         if result is None:
@@ -1290,6 +1608,11 @@ class MongoDBClient:
         self.log(f'get_link {{{link_id}}}')
         return result
 
+    async def get_links(self, link_ids: List[ObjectId], projection=None) -> List[Dict]:
+        results = await self.links.find({'_id': {'$in': link_ids}}, projection=projection).to_list(None)
+        self.log(f'get_links; found {len(results)} of {len(link_ids)}')
+        return results
+
     async def get_links_in_paragraph(self, paragraph_id: ObjectId, section_id: ObjectId):
         section_projection = await self.sections.find_one(
             filter={'_id': section_id, 'links.paragraph_id': paragraph_id},
@@ -1332,25 +1655,6 @@ class MongoDBClient:
         self.assert_update_was_successful(update_result)
         self.log(f'update_link_context {{{link_id}}}')
 
-    async def insert_reference_to_page(self, page_id: ObjectId, link_id: ObjectId, story_id: ObjectId,
-                                       section_id: ObjectId, paragraph_id: ObjectId, text=None, index=None):
-        context = self._build_link_context(story_id, section_id, paragraph_id, text)
-        reference = {
-            'link_id': link_id,
-            'context': context,
-        }
-        parameters = self._insertion_parameters(reference, index)
-        update_result: UpdateResult = await self.pages.update_one(
-            filter={'_id': page_id},
-            update={
-                '$push': {
-                    'references': parameters,
-                }
-            }
-        )
-        self.assert_update_was_successful(update_result)
-        self.log(f'insert_reference_to_page {{{page_id}}} with link {{{link_id}}}')
-
     async def insert_links_for_paragraph(self, paragraph_id: ObjectId, links: List[ObjectId], in_section_id: ObjectId,
                                          at_index=None):
         inner_parameters = self._insertion_parameters({
@@ -1381,26 +1685,218 @@ class MongoDBClient:
         self.assert_update_was_successful(update_result)
         self.log(f'set_links_in_section {{{section_id}}}')
 
-    async def remove_reference_from_page(self, link_id: ObjectId, page_id: ObjectId):
-        update_result: UpdateResult = await self.pages.update_one(
-            filter={'_id': page_id},
+    async def delete_link(self, link_id: ObjectId):
+        delete_result: DeleteResult = await self.links.delete_one(
+            filter={'_id': link_id}
+        )
+        self.assert_delete_one_successful(delete_result)
+        self.log(f'delete_link {{{link_id}}}')
+
+    async def delete_links(self, link_ids: List[ObjectId]):
+        delete_result: DeleteResult = await self.links.delete_many(
+            filter={'_id': {'$in': link_ids}}
+        )
+        if delete_result.deleted_count < len(set(link_ids)):
+            raise NoMatchError                  # pragma: no cover
+        self.log(f'delete_links; deleted {delete_result.deleted_count} of {len(link_ids)}')
+
+    ###########################################################################
+    #
+    # Reference Methods
+    #
+    ###########################################################################
+
+    async def create_reference_indexes(self):
+        await self.references.create_index([('page_id', ASCENDING), ('_id', ASCENDING)])
+        await self.references.create_index([('link_id', ASCENDING)], unique=True)
+        await self.references.create_index([('context.story_id', ASCENDING), ('context.section_id', ASCENDING)])
+        await self.references.create_index([('context.paragraph_id', ASCENDING)])
+        self._reference_indexes_created = True
+        self.log('create_reference_indexes')
+
+    async def _ensure_reference_indexes(self):
+        if not self._reference_indexes_created:
+            await self.create_reference_indexes()
+
+    async def insert_reference_to_page(self, page_id: ObjectId, link_id: ObjectId, story_id: ObjectId,
+                                       section_id: ObjectId, paragraph_id: ObjectId, text=None):
+        context = self._build_link_context(story_id, section_id, paragraph_id, text)
+        await self.upsert_reference(page_id, link_id, context)
+        self.log(f'insert_reference_to_page {{{page_id}}} with link {{{link_id}}}')
+
+    async def insert_references_to_pages(self, references_by_page: Dict[ObjectId, List[Tuple[ObjectId, ObjectId]]],
+                                         section_id: ObjectId, paragraph_id: ObjectId):
+        """
+        Insert references to several pages with a single insert. Each page's references are given as
+        `(link_id, story_id)` tuples, in the order they should appear.
+        """
+        if not references_by_page:
+            return
+        await self._ensure_reference_indexes()
+        result: InsertManyResult = await self.references.insert_many([{
+            'page_id': page_id,
+            'link_id': link_id,
+            'context': self._build_link_context(story_id, section_id, paragraph_id, None),
+        } for page_id, references in references_by_page.items() for link_id, story_id in references])
+        self.log(f'insert_references_to_pages for {len(references_by_page)} pages; inserted '
+                 f'{len(result.inserted_ids)} references')
+
+    async def upsert_reference(self, page_id: ObjectId, link_id: ObjectId, context: Dict):
+        await self._ensure_reference_indexes()
+        await self.references.update_one(
+            filter={'link_id': link_id},
             update={
-                '$pull': {
-                    'references': {
-                        'link_id': link_id,
+                '$set': {
+                    'page_id': page_id,
+                    'context': context,
+                }
+            },
+            upsert=True
+        )
+        self.log(f'upsert_reference for link {{{link_id}}} to page {{{page_id}}}')
+
+    async def set_reference_contexts(self, contexts_by_link: Dict[ObjectId, Dict]):
+        """
+        Set the context of the reference made by each link, using one update per reference sent in a single bulk
+        write.
+        """
+        if not contexts_by_link:
+            return
+        bulk_result: BulkWriteResult = await self.references.bulk_write([
+            UpdateOne(
+                filter={'link_id': link_id},
+                update={
+                    '$set': {
+                        'context': context,
                     }
                 }
-            }
+            ) for link_id, context in contexts_by_link.items()
+        ], ordered=False)
+        self.assert_bulk_update_was_successful(bulk_result, len(contexts_by_link))
+        self.log(f'set_reference_contexts for {len(contexts_by_link)} links')
+
+    async def get_page_references(self, page_id: ObjectId, skip=None, limit=None) -> List[Dict]:
+        """
+        Return the references to a page in the order they were made, each as a `{'link_id', 'context'}` dictionary,
+        skipping the first `skip` and returning at most `limit` of them.
+        """
+        if limit == 0:
+            # MongoDB treats a limit of 0 as no limit at all.
+            return []
+        cursor = self.references.find({'page_id': page_id}, projection={'_id': 0, 'link_id': 1, 'context': 1})
+        cursor = cursor.sort('_id', ASCENDING)
+        if skip:
+            cursor = cursor.skip(skip)
+        if limit is not None:
+            cursor = cursor.limit(limit)
+        results = await cursor.to_list(None)
+        self.log(f'get_page_references {{{page_id}}}; skipped {skip}, found {len(results)}')
+        return results
+
+    async def get_page_reference_count(self, page_id: ObjectId) -> int:
+        results = await self.references.aggregate([
+            {'$match': {'page_id': page_id}},
+            {'$count': 'count'},
+        ]).to_list(None)
+        count = results[0]['count'] if results else 0
+        self.log(f'get_page_reference_count {{{page_id}}}; counted {count}')
+        return count
+
+    async def get_page_references_in_story(self, page_id: ObjectId, story_id: ObjectId) -> List[Dict]:
+        results = await self.references.find(
+            filter={'page_id': page_id, 'context.story_id': story_id},
+            projection={'_id': 0, 'link_id': 1, 'context': 1}
+        ).to_list(None)
+        self.log(f'get_page_references_in_story {{{page_id}}} in story {{{story_id}}}; found {len(results)}')
+        return results
+
+    async def get_reference_section_counts(self, story_id: ObjectId,
+                                           page_ids: List[ObjectId]) -> List[Tuple[ObjectId, ObjectId, int]]:
+        """
+        Count the references from the story to each of the pages by the section they are in, with a single
+        aggregation. Returns `(page_id, section_id, count)` tuples for the pairs with at least one reference.
+        """
+        results = await self.references.aggregate([
+            {'$match': {'context.story_id': story_id, 'page_id': {'$in': page_ids}}},
+            {'$group': {
+                '_id':   {'page_id': '$page_id', 'section_id': '$context.section_id'},
+                'count': {'$sum': 1},
+            }},
+        ]).to_list(None)
+        self.log(f'get_reference_section_counts in story {{{story_id}}} for {len(page_ids)} pages; found '
+                 f'{len(results)}')
+        return [(result['_id']['page_id'], result['_id']['section_id'], result['count']) for result in results]
+
+    async def get_references_in_paragraphs(self, paragraph_ids: List[ObjectId]) -> List[Dict]:
+        """
+        Return the references made from any of the paragraphs, each as a `{'link_id', 'context'}` dictionary.
+        """
+        if not paragraph_ids:
+            return []
+        results = await self.references.find(
+            filter={'context.paragraph_id': {'$in': paragraph_ids}},
+            projection={'_id': 0, 'link_id': 1, 'context': 1}
+        ).to_list(None)
+        self.log(f'get_references_in_paragraphs for {len(paragraph_ids)} paragraphs; found {len(results)}')
+        return results
+
+    async def remove_reference(self, link_id: ObjectId):
+        delete_result: DeleteResult = await self.references.delete_one(
+            filter={'link_id': link_id}
         )
-        self.assert_update_was_successful(update_result)
-        self.log(f'remove_reference_from_page {{{link_id}}} from page {{{page_id}}}')
+        self.assert_delete_one_successful(delete_result)
+        self.log(f'remove_reference for link {{{link_id}}}')
 
-    async def delete_link(self, link_id: ObjectId):
-        delete_result: DeleteResult = await self.links.delete_one(
-            filter={'_id': link_id}
+    async def remove_reference_from_page(self, link_id: ObjectId, page_id: ObjectId):
+        delete_result: DeleteResult = await self.references.delete_one(
+            filter={'link_id': link_id, 'page_id': page_id}
         )
         self.assert_delete_one_successful(delete_result)
-        self.log(f'delete_link {{{link_id}}}')
+        self.log(f'remove_reference_from_page {{{link_id}}} from page {{{page_id}}}')
+
+    async def remove_references_from_pages(self, link_ids_by_page: Dict[ObjectId, List[ObjectId]]):
+        if not link_ids_by_page:
+            return
+        delete_result: DeleteResult = await self.references.delete_many(
+            filter={'link_id': {'$in': list(chain.from_iterable(link_ids_by_page.values()))}}
+        )
+        self.log(f'remove_references_from_pages for {len(link_ids_by_page)} pages; deleted '
+                 f'{delete_result.deleted_count} references')
+
+    async def migrate_page_references_to_collection(self) -> int:
+        """
+        Move the `references` array embedded in each page document of an older database into the `references`
+        collection, keeping their order. Returns the number of pages migrated.
+
+        References are upserted by link ID, so the migration can be run again after it was interrupted.
+        """
+        await self._ensure_reference_indexes()
+        migrated = 0
+        async for page in self.pages.find({'references': {'$exists': True}}, projection={'references': 1}):
+            if page['references']:
+                await self.references.bulk_write([
+                    UpdateOne(
+                        filter={'link_id': reference['link_id']},
+                        update={
+                            '$set': {
+                                'page_id': page['_id'],
+                                'context': reference['context'],
+                            }
+                        },
+                        upsert=True
+                    ) for reference in page['references']
+                ])
+            await self.pages.update_one(
+                filter={'_id': page['_id']},
+                update={
+                    '$unset': {
+                        'references': '',
+                    }
+                }
+            )
+            migrated += 1
+        self.log(f'migrate_page_references_to_collection; migrated {migrated} pages')
+        return migrated
 
     ###########################################################################
     #
@@ -1432,6 +1928,43 @@ class MongoDBClient:
                  f'inserted ID {{{result.inserted_id}}}')
         return result.inserted_id
     
+    async def create_passive_links(self, passive_links: List[Tuple[ObjectId, ObjectId, ObjectId]], section_id=None,
+                                   paragraph_id=None):
+        """
+        Insert several passive links sharing one context in a single round trip. Each passive link is given as an
+        `(_id, alias_id, page_id)` tuple, with its ID allocated by the caller.
+        """
+        context = self._build_passive_link_context(section_id, paragraph_id)
+        documents = [{
+            '_id':      _id,
+            'context':  dict(context),
+            'alias_id': alias_id,
+            'page_id':  page_id,
+            'pending':  True,
+        } for _id, alias_id, page_id in passive_links]
+        result: InsertManyResult = await self.passive_links.insert_many(documents)
+        self.log(f'create_passive_links in paragraph {{{paragraph_id}}} in section {{{section_id}}}; '
+                 f'inserted {len(result.inserted_ids)}')
+        return result.inserted_ids
+
+    async def create_passive_links_in_section(self, section_id: ObjectId,
+                                              passive_links: Dict[ObjectId, List[Tuple[ObjectId, ObjectId, ObjectId]]]):
+        """
+        Insert the passive links of several paragraphs of a section in a single round trip. The passive links are given
+        by paragraph ID, each as an `(_id, alias_id, page_id)` tuple as for `create_passive_links`.
+        """
+        documents = [{
+            '_id':      _id,
+            'context':  self._build_passive_link_context(section_id, paragraph_id),
+            'alias_id': alias_id,
+            'page_id':  page_id,
+            'pending':  True,
+        } for paragraph_id, paragraph_passive_links in passive_links.items()
+            for _id, alias_id, page_id in paragraph_passive_links]
+        result: InsertManyResult = await self.passive_links.insert_many(documents)
+        self.log(f'create_passive_links_in_section {{{section_id}}}; inserted {len(result.inserted_ids)}')
+        return result.inserted_ids
+
     async def get_passive_link(self, passive_link_id: ObjectId):
         result = await self.passive_links.find_one({'_id': passive_link_id})
         if result is None:
@@ -1440,6 +1973,11 @@ class MongoDBClient:
         self.log(f'get_passive_link {{{passive_link_id}}}')
         return result
 
+    async def get_passive_links(self, passive_link_ids: List[ObjectId], projection=None) -> List[Dict]:
+        results = await self.passive_links.find({'_id': {'$in': passive_link_ids}}, projection=projection).to_list(None)
+        self.log(f'get_passive_links; found {len(results)} of {len(passive_link_ids)}')
+        return results
+
     async def get_passive_links_in_paragraph(self, paragraph_id: ObjectId, section_id: ObjectId):
         section_projection = await self.sections.find_one(
             filter={'_id': section_id, 'passive_links.paragraph_id': paragraph_id},
@@ -1475,6 +2013,19 @@ class MongoDBClient:
         self.assert_update_was_successful(update_result)
         self.log(f'reject_passive_link {{{passive_link_id}}}')
 
+    async def reject_passive_links(self, passive_link_ids: List[ObjectId]):
+        update_result: UpdateResult = await self.passive_links.update_many(
+            filter={'_id': {'$in': passive_link_ids}},
+            update={
+                '$set': {
+                    'pending': False,
+                }
+            }
+        )
+        if update_result.matched_count < len(set(passive_link_ids)):
+            raise NoMatchError                  # pragma: no cover
+        self.log(f'reject_passive_links; rejected {update_result.matched_count} of {len(passive_link_ids)}')
+
     async def insert_passive_links_for_paragraph(self, paragraph_id: ObjectId, passive_links: List[ObjectId],
                                                  in_section_id: ObjectId, at_index=None):
         inner_parameters = self._insertion_parameters({
@@ -1513,6 +2064,14 @@ class MongoDBClient:
         self.assert_delete_one_successful(delete_result)
         self.log(f'delete_passive_link {{{passive_link_id}}}')
 
+    async def delete_passive_links(self, passive_link_ids: List[ObjectId]):
+        delete_result: DeleteResult = await self.passive_links.delete_many(
+            filter={'_id': {'$in': passive_link_ids}}
+        )
+        if delete_result.deleted_count < len(set(passive_link_ids)):
+            raise NoMatchError                  # pragma: no cover
+        self.log(f'delete_passive_links; deleted {delete_result.deleted_count} of {len(passive_link_ids)}')
+
     ###########################################################################
     #
     # Alias Methods
@@ -1532,6 +2091,21 @@ class MongoDBClient:
         self.log(f'create_alias {{{name}}} in page {{{page_id}}}; inserted ID {{{result.inserted_id}}}')
         return result.inserted_id
 
+    async def create_aliases(self, aliases: List[Tuple[ObjectId, str, ObjectId]]):
+        """
+        Insert several aliases in a single round trip. Each alias is given as an `(_id, name, page_id)` tuple.
+        """
+        documents = [{
+            '_id':           _id,
+            'name':          name,
+            'page_id':       page_id,
+            'links':         list(),
+            'passive_links': list(),
+        } for _id, name, page_id in aliases]
+        result: InsertManyResult = await self.aliases.insert_many(documents)
+        self.log(f'create_aliases; inserted {len(result.inserted_ids)}')
+        return result.inserted_ids
+
     async def set_alias_name(self, name: str, alias_id: ObjectId):
         update_result: UpdateResult = await self.aliases.update_one(
             filter={'_id': alias_id},
@@ -1568,6 +2142,14 @@ class MongoDBClient:
         self.assert_update_was_successful(update_result)
         self.log(f'insert_passive_link_to_alias {{{passive_link_id}}} to alias {{{alias_id}}}')
 
+    async def insert_passive_links_to_aliases(self, passive_link_ids_by_alias: Dict[ObjectId, List[ObjectId]]):
+        await self._bulk_push_by_id(self.aliases, 'passive_links', passive_link_ids_by_alias)
+        self.log(f'insert_passive_links_to_aliases for {len(passive_link_ids_by_alias)} aliases')
+
+    async def insert_links_to_aliases(self, link_ids_by_alias: Dict[ObjectId, List[ObjectId]]):
+        await self._bulk_push_by_id(self.aliases, 'links', link_ids_by_alias)
+        self.log(f'insert_links_to_aliases for {len(link_ids_by_alias)} aliases')
+
     async def get_alias(self, alias_id: ObjectId):
         result = await self.aliases.find_one({'_id': alias_id})
         if result is None:
@@ -1576,6 +2158,11 @@ class MongoDBClient:
         self.log(f'get_alias {{{alias_id}}}')
         return result
 
+    async def get_aliases(self, alias_ids: List[ObjectId], projection=None) -> List[Dict]:
+        results = await self.aliases.find({'_id': {'$in': alias_ids}}, projection=projection).to_list(None)
+        self.log(f'get_aliases; found {len(results)} of {len(alias_ids)}')
+        return results
+
     async def insert_alias_to_page(self, page_id: ObjectId, name: str, alias_id: ObjectId):
         update_result: UpdateResult = await self.pages.update_one(
             filter={'_id': page_id},
@@ -1588,6 +2175,18 @@ class MongoDBClient:
         self.assert_update_was_successful(update_result)
         self.log(f'insert_alias_to_page {{{alias_id}}} to page {{{page_id}}}')
 
+    async def insert_aliases_to_pages(self, aliases_by_page: Dict[ObjectId, Dict[str, ObjectId]]):
+        bulk_result: BulkWriteResult = await self.pages.bulk_write([
+            UpdateOne(
+                filter={'_id': page_id},
+                update={
+                    '$set': {'aliases.{}'.format(name): alias_id for name, alias_id in aliases.items()},
+                }
+            ) for page_id, aliases in aliases_by_page.items()
+        ], ordered=False)
+        self.assert_bulk_update_was_successful(bulk_result, len(aliases_by_page))
+        self.log(f'insert_aliases_to_pages for {len(aliases_by_page)} pages')
+
     async def update_alias_name_in_page(self, page_id: ObjectId, old_name: str, new_name: str):
         update_result: UpdateResult = await self.pages.update_one(
             filter={'_id': page_id},
@@ -1628,6 +2227,18 @@ class MongoDBClient:
         else:
             return results[0]
 
+    async def get_aliases_in_pages(self, page_ids: List[ObjectId]) -> Dict[ObjectId, Dict[str, ObjectId]]:
+        cursor = self.pages.find(
+            filter={'_id': {'$in': page_ids}},
+            projection={'aliases': 1}
+        )
+        results = {page['_id']: page['aliases'] async for page in cursor}
+        if len(results) < len(set(page_ids)):
+            self.log(f'get_aliases_in_pages FAILED')
+            raise NoMatchError
+        self.log(f'get_aliases_in_pages for {len(results)} pages')
+        return results
+
     async def remove_alias_from_page(self, alias_name: str, page_id: ObjectId):
         update_result: UpdateResult = await self.pages.update_one(
             filter={'_id': page_id},
@@ -1640,6 +2251,20 @@ class MongoDBClient:
         self.assert_update_was_successful(update_result)
         self.log(f'remove_alias_from_page {{{alias_name}}} from page {{{page_id}}}')
 
+    async def remove_aliases_from_pages(self, alias_names_by_page: Dict[ObjectId, List[str]]):
+        if not alias_names_by_page:
+            return
+        bulk_result: BulkWriteResult = await self.pages.bulk_write([
+            UpdateOne(
+                filter={'_id': page_id},
+                update={
+                    '$unset': {'aliases.{}'.format(alias_name): '' for alias_name in alias_names}
+                }
+            ) for page_id, alias_names in alias_names_by_page.items()
+        ], ordered=False)
+        self.assert_bulk_update_was_successful(bulk_result, len(alias_names_by_page))
+        self.log(f'remove_aliases_from_pages; updated {len(alias_names_by_page)} pages')
+
     async def remove_link_from_alias(self, link_id: ObjectId, alias_id: ObjectId):
         update_result: UpdateResult = await self.aliases.update_one(
             filter={'_id': alias_id},
@@ -1652,6 +2277,18 @@ class MongoDBClient:
         self.assert_update_was_successful(update_result)
         self.log(f'remove_link_from_alias {{{link_id}}} from alias {{{alias_id}}}')
 
+    async def remove_links_from_alias(self, link_ids: List[ObjectId], alias_id: ObjectId):
+        update_result: UpdateResult = await self.aliases.update_one(
+            filter={'_id': alias_id},
+            update={
+                '$pullAll': {
+                    'links': link_ids,
+                }
+            }
+        )
+        self.assert_update_was_successful(update_result)
+        self.log(f'remove_links_from_alias {len(link_ids)} links from alias {{{alias_id}}}')
+
     async def remove_passive_link_from_alias(self, passive_link_id: ObjectId, alias_id: ObjectId):
         update_result: UpdateResult = await self.aliases.update_one(
             filter={'_id': alias_id},
@@ -1664,6 +2301,18 @@ class MongoDBClient:
         self.assert_update_was_successful(update_result)
         self.log(f'remove_link_from_alias {{{passive_link_id}}} from alias {{{alias_id}}}')
 
+    async def remove_passive_links_from_alias(self, passive_link_ids: List[ObjectId], alias_id: ObjectId):
+        update_result: UpdateResult = await self.aliases.update_one(
+            filter={'_id': alias_id},
+            update={
+                '$pullAll': {
+                    'passive_links': passive_link_ids,
+                }
+            }
+        )
+        self.assert_update_was_successful(update_result)
+        self.log(f'remove_passive_links_from_alias {len(passive_link_ids)} passive links from alias {{{alias_id}}}')
+
     async def delete_alias(self, alias_id: ObjectId):
         delete_result: DeleteResult = await self.aliases.delete_one(
             filter={'_id': alias_id}
@@ -1671,6 +2320,75 @@ class MongoDBClient:
         self.assert_delete_one_successful(delete_result)
         self.log(f'delete_alias {{{alias_id}}}')
 
+    async def delete_aliases(self, alias_ids: List[ObjectId]):
+        delete_result: DeleteResult = await self.aliases.delete_many(
+            filter={'_id': {'$in': alias_ids}}
+        )
+        if delete_result.deleted_count < len(set(alias_ids)):
+            raise NoMatchError                  # pragma: no cover
+        self.log(f'delete_aliases; deleted {delete_result.deleted_count} of {len(alias_ids)}')
+
+    ###########################################################################
+    #
+    # Job Methods
+    #
+    ###########################################################################
+
+    async def create_job(self, action: str, message: Dict, user_id: ObjectId, uuid: str, message_id,
+                         story_id: Union[ObjectId, None], wiki_id: Union[ObjectId, None], _id=None) -> ObjectId:
+        job = {
+            'action':     action,
+            'message':    message,
+            'user_id':    user_id,
+            'uuid':       uuid,
+            'message_id': message_id,
+            'story_id':   story_id,
+            'wiki_id':    wiki_id,
+            'status':     'queued',
+        }
+        if _id is not None:
+            job['_id'] = _id
+        result = await self.jobs.insert_one(job)
+        self.log(f'create_job {{{action}}} for user {{{user_id}}}; inserted ID {{{result.inserted_id}}}')
+        return result.inserted_id
+
+    async def set_job_status(self, job_id: ObjectId, status: str):
+        update_result: UpdateResult = await self.jobs.update_one(
+            filter={'_id': job_id},
+            update={
+                '$set': {
+                    'status': status
+                }
+            }
+        )
+        self.assert_update_was_successful(update_result)
+        self.log(f'set_job_status {{{job_id}}} to {{{status}}}')
+
+    async def set_job_progress(self, job_id: ObjectId, progress: Dict):
+        update_result: UpdateResult = await self.jobs.update_one(
+            filter={'_id': job_id},
+            update={
+                '$set': {
+                    'progress': progress
+                }
+            }
+        )
+        self.assert_update_was_successful(update_result)
+        self.log(f'set_job_progress {{{job_id}}}')
+
+    async def get_jobs_with_statuses(self, statuses: List[str]) -> List[Dict]:
+        cursor = self.jobs.find({'status': {'$in': statuses}}).sort('_id', ASCENDING)
+        jobs = await cursor.to_list(None)
+        self.log(f'get_jobs_with_statuses {statuses}; found {len(jobs)} jobs')
+        return jobs
+
+    async def delete_job(self, job_id: ObjectId):
+        delete_result: DeleteResult = await self.jobs.delete_one(
+            filter={'_id': job_id}
+        )
+        self.assert_delete_one_successful(delete_result)
+        self.log(f'delete_job {{{job_id}}}')
+
 
 class MongoDBMotorTornadoClient(MongoDBClient):  # pragma: no cover
     def __init__(self, db_name='inkweaver', db_host='localhost', db_port=27017, db_user=None, db_pass=None):
@@ -0,0 +1,372 @@
+from .mongodb_clients import MongoDBMotorTornadoClient, MongoDBMotorAsyncioClient, NoMatchError
+
+from bson.objectid import ObjectId
+from motor.core import AgnosticCollection
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+from pymongo.results import BulkWriteResult, DeleteResult, UpdateResult
+from typing import Dict, List, Tuple
+
+
+class ParagraphDocumentsMixin:
+    """
+    Stores each paragraph of a section as its own document in the `paragraphs` collection, instead of in the `content`,
+    `links`, `passive_links`, and `notes` arrays of the section document.
+
+    A paragraph document holds its text, statistics, links, passive links, and note, along with the `section_id` it
+    belongs to and an `order` used to sort the section's paragraphs. Method signatures are those of `MongoDBClient`, and
+    `get_section` rebuilds the arrays of the original layout when they are asked for, so the interface cannot tell the
+    two layouts apart.
+
+    Mix this in ahead of a `MongoDBClient` subclass.
+    """
+    # The section fields that are stored in paragraph documents in this layout.
+    PARAGRAPH_FIELDS = ('content', 'links', 'passive_links', 'notes')
+
+    # The paragraph document fields needed to rebuild each section field.
+    PARAGRAPH_PROJECTIONS = {
+        'content':       {'text': 1, 'statistics': 1},
+        'links':         {'links': 1},
+        'passive_links': {'passive_links': 1},
+        'notes':         {'note': 1},
+    }
+
+    _paragraph_indexes_created = False
+
+    @property
+    def paragraphs(self) -> AgnosticCollection:
+        return self.database.paragraphs
+
+    @property
+    def collections(self) -> List[AgnosticCollection]:
+        return super().collections + [self.paragraphs]
+
+    async def create_paragraph_indexes(self):
+        await self.paragraphs.create_index([('section_id', ASCENDING), ('order', ASCENDING)])
+        self._paragraph_indexes_created = True
+        self.log('create_paragraph_indexes')
+
+    ###########################################################################
+    #
+    # Story Methods
+    #
+    ###########################################################################
+
+    async def create_section(self, title: str, _id=None) -> ObjectId:
+        section = {
+            'title':                  title,
+            'parent_id':              None,
+            'preceding_subsections':  list(),
+            'inner_subsections':      list(),
+            'succeeding_subsections': list(),
+            'statistics':             {'word_frequency': {}, 'word_count': 0},
+        }
+        if _id is not None:
+            section['_id'] = _id
+        result = await self.sections.insert_one(section)
+        self.log(f'create_section {{{title}}}; inserted ID {{{result.inserted_id}}}')
+        return result.inserted_id
+
+    async def _get_paragraph_order(self, section_id: ObjectId, at_index=None) -> int:
+        """
+        Return the `order` for a paragraph inserted at `at_index` in the section, shifting the paragraphs at and after
+        that position up by one. Appends when `at_index` is None or past the end.
+        """
+        if at_index is not None:
+            cursor = self.paragraphs.find({'section_id': section_id}, projection={'order': 1})
+            at_position = await cursor.sort('order', ASCENDING).skip(at_index).limit(1).to_list(None)
+            if at_position:
+                order = at_position[0]['order']
+                await self.paragraphs.update_many(
+                    filter={'section_id': section_id, 'order': {'$gte': order}},
+                    update={'$inc': {'order': 1}}
+                )
+                return order
+        cursor = self.paragraphs.find({'section_id': section_id}, projection={'order': 1})
+        last = await cursor.sort('order', DESCENDING).limit(1).to_list(None)
+        return last[0]['order'] + 1 if last else 0
+
+    async def insert_paragraph(self, paragraph_id: ObjectId, text: str, to_section_id, at_index=None):
+        if not self._paragraph_indexes_created:
+            await self.create_paragraph_indexes()
+        if await self.sections.find_one({'_id': to_section_id}, projection={'_id': 1}) is None:
+            self.log(f'insert_paragraph {{{paragraph_id}}} to section {{{to_section_id}}} FAILED')
+            raise NoMatchError
+        order = await self._get_paragraph_order(to_section_id, at_index)
+        await self.paragraphs.insert_one({
+            '_id':           paragraph_id,
+            'section_id':    to_section_id,
+            'order':         order,
+            'text':          text,
+            'statistics':    {'word_frequency': {}, 'word_count': 0},
+            'links':         list(),
+            'passive_links': list(),
+            'note':          None,
+        })
+        self.log(f'insert_paragraph {{{paragraph_id}}} to section {{{to_section_id}}} at index {{{at_index}}}')
+
+    async def insert_paragraphs(self, to_section_id: ObjectId, paragraphs: List[Dict]):
+        if not self._paragraph_indexes_created:
+            await self.create_paragraph_indexes()
+        if await self.sections.find_one({'_id': to_section_id}, projection={'_id': 1}) is None:
+            self.log(f'insert_paragraphs to section {{{to_section_id}}} FAILED')
+            raise NoMatchError
+        first_order = await self._get_paragraph_order(to_section_id)
+        await self.paragraphs.insert_many([{
+            '_id':           paragraph['_id'],
+            'section_id':    to_section_id,
+            'order':         order,
+            'text':          paragraph['text'],
+            'statistics':    paragraph['statistics'],
+            'links':         paragraph['links'],
+            'passive_links': paragraph['passive_links'],
+            'note':          paragraph['note'],
+        } for order, paragraph in enumerate(paragraphs, first_order)])
+        self.log(f'insert_paragraphs to section {{{to_section_id}}}; inserted {len(paragraphs)}')
+
+    async def _set_paragraph_fields(self, section_id: ObjectId, paragraph_id: ObjectId, fields: Dict):
+        update_result: UpdateResult = await self.paragraphs.update_one(
+            filter={'_id': paragraph_id, 'section_id': section_id},
+            update={
+                '$set': fields
+            }
+        )
+        self.assert_update_was_successful(update_result)
+
+    async def insert_note_for_paragraph(self, paragraph_id: ObjectId, in_section_id, note=None, at_index=None):
+        # The paragraph document already holds its own position, so `at_index` is not needed.
+        await self._set_paragraph_fields(in_section_id, paragraph_id, {'note': note})
+        self.log(f'insert_note_for_paragraph {{{paragraph_id}}} in section {{{in_section_id}}} at index {{{at_index}}}')
+
+    async def set_paragraph_text(self, paragraph_id: ObjectId, text: str, in_section_id: ObjectId):
+        await self._set_paragraph_fields(in_section_id, paragraph_id, {'text': text})
+        self.log(f'set_paragraph_text {{{paragraph_id}}} in section {{{in_section_id}}}')
+
+    async def set_paragraph_texts(self, texts: List[Tuple[ObjectId, ObjectId, str]]):
+        if not texts:
+            return
+        bulk_result: BulkWriteResult = await self.paragraphs.bulk_write([
+            UpdateOne(
+                filter={'_id': paragraph_id, 'section_id': section_id},
+                update={
+                    '$set': {
+                        'text': text
+                    }
+                }
+            ) for section_id, paragraph_id, text in texts
+        ], ordered=False)
+        self.assert_bulk_update_was_successful(bulk_result, len(texts))
+        self.log(f'set_paragraph_texts; set {len(texts)} paragraphs')
+
+    async def set_paragraph_statistics(self, paragraph_id: ObjectId, wf_table: dict, word_count: int,
+                                       in_section_id: ObjectId):
+        await self._set_paragraph_fields(in_section_id, paragraph_id, {
+            'statistics.word_frequency': wf_table,
+            'statistics.word_count':     word_count,
+        })
+        self.log(f'set_paragraph_statistics {{{paragraph_id}}} in section {{{in_section_id}}}')
+
+    async def set_note(self, section_id: ObjectId, paragraph_id: ObjectId, text: str):
+        await self._set_paragraph_fields(section_id, paragraph_id, {'note': text})
+        self.log(f'set_note for paragraph {{{paragraph_id}}} in section {{{section_id}}}')
+
+    async def get_section(self, section_id: ObjectId, projection=None) -> Dict:
+        section = await super().get_section(section_id, projection)
+        fields = [field for field in self.PARAGRAPH_FIELDS if projection is None or projection.get(field)]
+        if fields:
+            section.update(await self._get_section_arrays(section_id, fields))
+        return section
+
+    async def _get_section_arrays(self, section_id: ObjectId, fields: List[str]) -> Dict[str, List]:
+        """
+        Build the named section fields of the original layout from the section's paragraph documents.
+        """
+        projection = {}
+        for field in fields:
+            projection.update(self.PARAGRAPH_PROJECTIONS[field])
+        arrays = {field: [] for field in fields}
+        cursor = self.paragraphs.find({'section_id': section_id}, projection=projection).sort('order', ASCENDING)
+        async for paragraph in cursor:
+            paragraph_id = paragraph['_id']
+            if 'content' in arrays:
+                arrays['content'].append({
+                    '_id':        paragraph_id,
+                    'text':       paragraph['text'],
+                    'statistics': paragraph['statistics'],
+                })
+            if 'links' in arrays:
+                arrays['links'].append({'paragraph_id': paragraph_id, 'links': paragraph['links']})
+            if 'passive_links' in arrays:
+                arrays['passive_links'].append({
+                    'paragraph_id':  paragraph_id,
+                    'passive_links': paragraph['passive_links'],
+                })
+            if 'notes' in arrays:
+                arrays['notes'].append({'paragraph_id': paragraph_id, 'note': paragraph['note']})
+        return arrays
+
+    async def get_paragraph_ids(self, section_id: ObjectId):
+        cursor = self.paragraphs.find({'section_id': section_id}, projection={'_id': 1}).sort('order', ASCENDING)
+        results = [paragraph['_id'] async for paragraph in cursor]
+        self.log(f'get_paragraph_ids for section {{{section_id}}}')
+        return results
+
+    async def _get_paragraph_field(self, query: str, section_id: ObjectId, paragraph_id: ObjectId, field: str):
+        paragraph = await self.paragraphs.find_one(
+            filter={'_id': paragraph_id, 'section_id': section_id},
+            projection={field: 1, '_id': 0}
+        )
+        if paragraph is None:
+            self.log(f'{query} {{{paragraph_id}}} in section {{{section_id}}} FAILED')
+            raise NoMatchError
+        self.log(f'{query} {{{paragraph_id}}} in section {{{section_id}}}')
+        return paragraph[field]
+
+    async def get_paragraph_text(self, section_id: ObjectId, paragraph_id: ObjectId):
+        return await self._get_paragraph_field('get_paragraph_text', section_id, paragraph_id, 'text')
+
+    async def get_paragraph_texts(self, paragraphs: List[Tuple[ObjectId, ObjectId]]) -> Dict[ObjectId, str]:
+        if not paragraphs:
+            return {}
+        section_ids = {paragraph_id: section_id for section_id, paragraph_id in paragraphs}
+        texts = {}
+        async for paragraph in self.paragraphs.find({'_id': {'$in': list(section_ids)}},
+                                                    projection={'section_id': 1, 'text': 1}):
+            if paragraph['section_id'] == section_ids[paragraph['_id']]:
+                texts[paragraph['_id']] = paragraph['text']
+        if len(texts) < len(section_ids):
+            self.log(f'get_paragraph_texts; found {len(texts)} of {len(paragraphs)} FAILED')
+            raise NoMatchError
+        self.log(f'get_paragraph_texts; found {len(texts)} of {len(paragraphs)}')
+        return texts
+
+    async def get_paragraph_statistics(self, section_id: ObjectId, paragraph_id: ObjectId):
+        return await self._get_paragraph_field('get_paragraph_statistics', section_id, paragraph_id, 'statistics')
+
+    async def delete_section(self, section_id: ObjectId):
+        await super().delete_section(section_id)
+        delete_result: DeleteResult = await self.paragraphs.delete_many(
+            filter={'section_id': section_id}
+        )
+        self.log(f'delete_section {{{section_id}}}; deleted {delete_result.deleted_count} paragraphs')
+
+    async def delete_paragraph(self, section_id: ObjectId, paragraph_id: ObjectId):
+        if await self.sections.find_one({'_id': section_id}, projection={'_id': 1}) is None:
+            self.log(f'delete_paragraph {{{paragraph_id}}} in section {{{section_id}}} FAILED')
+            raise NoMatchError
+        await self.paragraphs.delete_one(
+            filter={'_id': paragraph_id, 'section_id': section_id}
+        )
+        self.log(f'delete_paragraph {{{paragraph_id}}} in section {{{section_id}}}')
+
+    ###########################################################################
+    #
+    # Link Methods
+    #
+    ###########################################################################
+
+    async def get_links_in_paragraph(self, paragraph_id: ObjectId, section_id: ObjectId):
+        return await self._get_paragraph_field('get_links_in_paragraph', section_id, paragraph_id, 'links')
+
+    async def insert_links_for_paragraph(self, paragraph_id: ObjectId, links: List[ObjectId], in_section_id: ObjectId,
+                                         at_index=None):
+        await self._set_paragraph_fields(in_section_id, paragraph_id, {'links': links})
+        self.log(f'insert_links_for_paragraph {{{paragraph_id}}} in section {{{in_section_id}}} at index '
+                 f'{{{at_index}}}')
+
+    async def set_links_in_section(self, section_id: ObjectId, links: List[ObjectId], paragraph_id: ObjectId):
+        await self._set_paragraph_fields(section_id, paragraph_id, {'links': links})
+        self.log(f'set_links_in_section {{{section_id}}}')
+
+    ###########################################################################
+    #
+    # Passive Link Methods
+    #
+    ###########################################################################
+
+    async def get_passive_links_in_paragraph(self, paragraph_id: ObjectId, section_id: ObjectId):
+        return await self._get_paragraph_field('get_passive_links_in_paragraph', section_id, paragraph_id,
+                                               'passive_links')
+
+    async def insert_passive_links_for_paragraph(self, paragraph_id: ObjectId, passive_links: List[ObjectId],
+                                                 in_section_id: ObjectId, at_index=None):
+        await self._set_paragraph_fields(in_section_id, paragraph_id, {'passive_links': passive_links})
+        self.log(f'insert_passive_links_for_paragraph {{{paragraph_id}}} in section {{{in_section_id}}} at index '
+                 f'{{{at_index}}}')
+
+    async def set_passive_links_in_section(self, section_id: ObjectId, passive_links: List[ObjectId],
+                                           paragraph_id: ObjectId):
+        await self._set_paragraph_fields(section_id, paragraph_id, {'passive_links': passive_links})
+        self.log(f'set_passive_links_in_section {{{section_id}}}')
+
+    ###########################################################################
+    #
+    # Migration Methods
+    #
+    ###########################################################################
+
+    async def migrate_sections_to_paragraph_documents(self) -> int:
+        """
+        Move the paragraphs of every section still in the original layout into paragraph documents, and return how many
+        sections were migrated. Sections are migrated one at a time, so an interrupted run can simply be repeated.
+        """
+        await self.create_paragraph_indexes()
+        migrated = 0
+        async for section in self.sections.find({'content': {'$exists': True}},
+                                                projection={field: 1 for field in self.PARAGRAPH_FIELDS}):
+            section_id = section['_id']
+            links = {entry['paragraph_id']: entry['links'] for entry in section.get('links', [])}
+            passive_links = {
+                entry['paragraph_id']: entry['passive_links'] for entry in section.get('passive_links', [])
+            }
+            notes = {entry['paragraph_id']: entry['note'] for entry in section.get('notes', [])}
+            paragraphs = [{
+                '_id':           paragraph['_id'],
+                'section_id':    section_id,
+                'order':         order,
+                'text':          paragraph['text'],
+                'statistics':    paragraph['statistics'],
+                'links':         links.get(paragraph['_id'], []),
+                'passive_links': passive_links.get(paragraph['_id'], []),
+                'note':          notes.get(paragraph['_id']),
+            } for order, paragraph in enumerate(section['content'])]
+            # Remove anything left behind by an earlier run that stopped partway through this section.
+            await self.paragraphs.delete_many({'section_id': section_id})
+            if paragraphs:
+                await self.paragraphs.insert_many(paragraphs)
+            await self.sections.update_one(
+                filter={'_id': section_id},
+                update={
+                    '$unset': {field: '' for field in self.PARAGRAPH_FIELDS}
+                }
+            )
+            migrated += 1
+            self.log(f'migrate_sections_to_paragraph_documents section {{{section_id}}}; {len(paragraphs)} paragraphs')
+        return migrated
+
+    async def migrate_paragraph_documents_to_sections(self) -> int:
+        """
+        Move paragraph documents back into the arrays of their sections, and return how many sections were migrated.
+        """
+        migrated = 0
+        async for section in self.sections.find({'content': {'$exists': False}}, projection={'_id': 1}):
+            section_id = section['_id']
+            arrays = await self._get_section_arrays(section_id, list(self.PARAGRAPH_FIELDS))
+            await self.sections.update_one(
+                filter={'_id': section_id},
+                update={
+                    '$set': arrays
+                }
+            )
+            await self.paragraphs.delete_many({'section_id': section_id})
+            migrated += 1
+            self.log(f'migrate_paragraph_documents_to_sections section {{{section_id}}}; '
+                     f'{len(arrays["content"])} paragraphs')
+        return migrated
+
+
+class MongoDBMotorTornadoParagraphsClient(ParagraphDocumentsMixin, MongoDBMotorTornadoClient):  # pragma: no cover
+    pass
+
+
+class MongoDBMotorAsyncioParagraphsClient(ParagraphDocumentsMixin, MongoDBMotorAsyncioClient):  # pragma: no cover
+    pass
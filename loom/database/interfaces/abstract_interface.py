@@ -107,6 +107,10 @@ class AbstractDBInterface(ABC):
     async def add_paragraph(self, wiki_id, section_id, text, succeeding_paragraph_id=None):
         pass
 
+    @abstractmethod
+    async def add_paragraphs(self, wiki_id, section_id, texts):
+        pass
+
     @abstractmethod
     async def add_bookmark(self, name, story_id, section_id, paragraph_id, index=None):
         pass
@@ -116,7 +120,7 @@ class AbstractDBInterface(ABC):
         pass
 
     @abstractmethod
-    async def get_story(self, story_id):
+    async def get_story(self, story_id, projection=None):
         pass
 
     @abstractmethod
@@ -147,6 +151,10 @@ class AbstractDBInterface(ABC):
     async def set_paragraph_text(self, wiki_id, section_id, text, paragraph_id):
         pass
 
+    @abstractmethod
+    async def apply_paragraph_delta(self, wiki_id, section_id, operations, paragraph_id):
+        pass
+
     @abstractmethod
     async def set_bookmark_name(self, story_id, bookmark_id, new_name):
         pass
@@ -198,7 +206,7 @@ class AbstractDBInterface(ABC):
     ###########################################################################
 
     @abstractmethod
-    async def create_wiki(self, user_id, title, summary):
+    async def create_wiki(self, user_id, title, summary, template=None):
         pass
 
     @abstractmethod
@@ -226,7 +234,7 @@ class AbstractDBInterface(ABC):
         pass
 
     @abstractmethod
-    async def get_wiki(self, wiki_id):
+    async def get_wiki(self, wiki_id, projection=None):
         pass
 
     @abstractmethod
@@ -250,7 +258,7 @@ class AbstractDBInterface(ABC):
         pass
 
     @abstractmethod
-    async def get_page_for_frontend(self, page_id):
+    async def get_page_for_frontend(self, page_id, references_offset=None, references_limit=None):
         pass
 
     @abstractmethod
@@ -289,6 +297,10 @@ class AbstractDBInterface(ABC):
     async def delete_wiki(self, user_id, wiki_id):
         pass
 
+    @abstractmethod
+    async def delete_wiki_segments(self, wiki_id, segment_id):
+        pass
+
     @abstractmethod
     async def delete_segment(self, wiki_id, segment_id):
         pass
@@ -335,6 +347,10 @@ class AbstractDBInterface(ABC):
     async def create_link(self, story_id, section_id, paragraph_key, name, page_id):
         pass
 
+    @abstractmethod
+    async def create_links(self, section_id, paragraph_id, links):
+        pass
+
     @abstractmethod
     async def get_link(self, link_id):
         pass
@@ -353,6 +369,10 @@ class AbstractDBInterface(ABC):
     async def create_passive_link(self, section_id, paragraph_id, alias_id, page_id):
         pass
 
+    @abstractmethod
+    async def create_passive_links(self, section_id, paragraph_id, passive_links):
+        pass
+
     @abstractmethod
     async def get_passive_link(self, passive_link_id):
         pass
@@ -365,6 +385,14 @@ class AbstractDBInterface(ABC):
     async def reject_passive_link(self, passive_link_id):
         pass
 
+    @abstractmethod
+    async def approve_passive_links(self, passive_link_ids, story_id, wiki_id):
+        pass
+
+    @abstractmethod
+    async def reject_passive_links(self, passive_link_ids):
+        pass
+
     @abstractmethod
     async def delete_passive_link(self, passive_link_id):
         pass
@@ -412,3 +440,33 @@ class AbstractDBInterface(ABC):
     @abstractmethod
     async def get_page_frequencies_in_story(self, story_id, wiki_id):
         pass
+
+    ###########################################################################
+    #
+    # Job Methods
+    #
+    ###########################################################################
+
+    @abstractmethod
+    async def create_job(self, action, message, user_id, uuid, message_id, story_id=None, wiki_id=None):
+        pass
+
+    @abstractmethod
+    async def start_job(self, job_id):
+        pass
+
+    @abstractmethod
+    async def save_job_progress(self, job_id, progress):
+        pass
+
+    @abstractmethod
+    async def fail_job(self, job_id):
+        pass
+
+    @abstractmethod
+    async def finish_job(self, job_id):
+        pass
+
+    @abstractmethod
+    async def get_unfinished_jobs(self):
+        pass
@@ -0,0 +1,242 @@
+from loom.database.clients import MongoDBClient
+
+import inspect
+
+from bson import BSON
+from bson.objectid import ObjectId
+from collections import OrderedDict
+from functools import wraps
+from typing import Dict, Iterable, Tuple, Union
+
+
+class DocumentCache:
+    """
+    A least-recently-used cache of whole documents, keyed by collection name and `_id` and capped by total size.
+
+    Documents are stored BSON-encoded, which both measures their size and means every hit decodes a fresh copy that
+    callers are free to modify.
+    """
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        # (collection, _id) -> encoded document, from least to most recently used.
+        self._entries = OrderedDict()
+        self._size = 0
+        # Bumped on every invalidation, so that a read which overlapped a write does not cache what it read.
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {
+            'entries':       len(self._entries),
+            'bytes':         self._size,
+            'hits':          self.hits,
+            'misses':        self.misses,
+            'evictions':     self.evictions,
+            'invalidations': self.invalidations,
+        }
+
+    def get(self, collection: str, _id: ObjectId) -> Union[Dict, None]:
+        key = (collection, _id)
+        encoded = self._entries.get(key)
+        if encoded is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return BSON(encoded).decode()
+
+    def put(self, collection: str, _id: ObjectId, document: Dict, generation: int):
+        if generation != self.generation:
+            return
+        encoded = BSON.encode(document)
+        if len(encoded) > self.max_bytes:
+            return
+        self._discard((collection, _id))
+        self._entries[(collection, _id)] = encoded
+        self._size += len(encoded)
+        while self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+            self.evictions += 1
+
+    def invalidate(self, collections: Iterable[str], ids: Iterable[ObjectId]):
+        self.generation += 1
+        for _id in ids:
+            for collection in collections:
+                if self._discard((collection, _id)):
+                    self.invalidations += 1
+
+    def invalidate_collection(self, collection: str):
+        self.generation += 1
+        for key in [key for key in self._entries if key[0] == collection]:
+            self._discard(key)
+            self.invalidations += 1
+
+    def clear(self):
+        self.generation += 1
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+        self._size = 0
+
+    def _discard(self, key: Tuple[str, ObjectId]) -> bool:
+        encoded = self._entries.pop(key, None)
+        if encoded is None:
+            return False
+        self._size -= len(encoded)
+        return True
+
+
+def _find_object_ids(value, found: set):
+    if isinstance(value, ObjectId):
+        found.add(value)
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            _find_object_ids(key, found)
+            _find_object_ids(item, found)
+    elif isinstance(value, (list, tuple, set)):
+        for item in value:
+            _find_object_ids(item, found)
+    return found
+
+
+def _projected_fields(projection) -> Union[set, None, bool]:
+    """
+    Return the top-level fields an inclusion projection keeps, `None` for no projection, or `False` for a projection
+    that cannot be applied to a cached document.
+    """
+    if projection is None:
+        return None
+    fields = {'_id'}
+    for field, include in projection.items():
+        if field == '_id':
+            if not include:
+                fields.discard('_id')
+        elif include in (1, True):
+            if '.' in field:
+                return False
+            fields.add(field)
+        else:
+            return False
+    return fields
+
+
+class DocumentCachingClient:
+    """
+    Wraps a `MongoDBClient` so that whole-document reads of the cached collections are served from a `DocumentCache`.
+
+    Every client method that is not a read is treated as a mutation: any cached document whose ID appears among its
+    arguments is dropped both before and after it runs. Methods that update documents matched by something other than
+    the IDs they are given drop the affected collections entirely.
+    """
+    CACHED_READS = {
+        'get_story':   'stories',
+        'get_section': 'sections',
+        'get_wiki':    'wikis',
+        'get_segment': 'segments',
+        'get_page':    'pages',
+    }
+
+    CACHED_COLLECTIONS = tuple(CACHED_READS.values())
+
+    READ_PREFIXES = ('get_', 'find_')
+
+    READS = {
+        'username_exists',
+        'email_exists',
+    }
+
+    # Checked before the read prefixes, since the ancestor lookups record any missing parent IDs as they go.
+    BROAD_MUTATIONS = {
+        'get_section_ancestor_ids':             ('sections',),
+        'get_segment_ancestor_ids':             ('segments',),
+        'remove_section_from_parent':           ('sections',),
+        'move_subsection':                      ('sections',),
+        'delete_section':                       ('sections',),
+        'delete_bookmark_by_id':                ('stories',),
+        'remove_user_from_stories_with_wiki_id': ('stories',),
+        'remove_segment_from_parent':           ('segments',),
+        'move_segment':                         ('segments',),
+        'delete_segment':                       ('segments',),
+        'remove_page_from_parent':              ('segments',),
+        'delete_page':                          ('segments',),
+        'drop_database':                        CACHED_COLLECTIONS,
+        'drop_collection':                      CACHED_COLLECTIONS,
+        'drop_all_collections':                 CACHED_COLLECTIONS,
+    }
+
+    def __init__(self, client: MongoDBClient, cache: DocumentCache):
+        self._wrapped_client = client
+        self._document_cache = cache
+        self._methods = {}
+
+    @property
+    def wrapped_client(self) -> MongoDBClient:
+        return self._wrapped_client
+
+    @property
+    def document_cache(self) -> DocumentCache:
+        return self._document_cache
+
+    def __getattr__(self, item):
+        method = self._methods.get(item)
+        if method is not None:
+            return method
+        attribute = getattr(self._wrapped_client, item)
+        if not inspect.iscoroutinefunction(attribute) or item.startswith('_'):
+            return attribute
+        if item in self.CACHED_READS:
+            method = self._cached_read(attribute, self.CACHED_READS[item])
+        elif item in self.BROAD_MUTATIONS:
+            method = self._mutation(attribute, self.BROAD_MUTATIONS[item])
+        elif item.startswith(self.READ_PREFIXES) or item in self.READS:
+            method = attribute
+        else:
+            method = self._mutation(attribute, ())
+        self._methods[item] = method
+        return method
+
+    def _cached_read(self, read, collection):
+        cache = self._document_cache
+
+        @wraps(read)
+        async def cached_read(_id, projection=None):
+            fields = _projected_fields(projection)
+            if fields is False:
+                return await read(_id, projection)
+            document = cache.get(collection, _id)
+            if document is None:
+                if fields is not None:
+                    # A projected read is not a whole document, so it cannot fill the cache.
+                    return await read(_id, projection)
+                generation = cache.generation
+                document = await read(_id)
+                cache.put(collection, _id, document, generation)
+            if fields is not None:
+                document = {field: value for field, value in document.items() if field in fields}
+            return document
+        return cached_read
+
+    def _mutation(self, mutation, broad_collections):
+        cache = self._document_cache
+
+        def invalidate(args, kwargs):
+            cache.invalidate(self.CACHED_COLLECTIONS, _find_object_ids((args, kwargs), set()))
+            for collection in broad_collections:
+                cache.invalidate_collection(collection)
+
+        @wraps(mutation)
+        async def invalidating_mutation(*args, **kwargs):
+            invalidate(args, kwargs)
+            try:
+                return await mutation(*args, **kwargs)
+            finally:
+                invalidate(args, kwargs)
+        return invalidating_mutation
@@ -1,9 +1,12 @@
 from .abstract_interface import AbstractDBInterface
+from .document_cache import DocumentCache, DocumentCachingClient
 from .errors import *
 
-from loom.alias_trie import AliasTrie
+from loom.alias_trie import AliasIndex, AliasNormalizer
 from loom.database.clients import *
+from loom.link_cache import LinkResolutionCache
 from loom.serialize import decode_string_to_bson, encode_bson_to_string
+from loom.text_delta import apply_text_operations, diff_text_operations, find_changed_sentences, TextOperationError
 from loom.tokenizer import LoomTokenizer
 
 import re
@@ -12,7 +15,7 @@ from bson.objectid import ObjectId
 from collections import Counter, defaultdict
 from itertools import chain
 from string import punctuation
-from typing import ClassVar
+from typing import ClassVar, Dict, Iterable, List, Tuple, Union
 
 CREATE_LINK_REGEX = re.compile(r'{#\|(.*?)\|#}')
 
@@ -25,7 +28,8 @@ def generate_create_link_encoding(story_id: ObjectId, page_id: ObjectId, text: s
 
 def generate_link_format_regex():
     o = ObjectId()
-    inner_regex = r'[a-f\d]{24}'
+    # The ObjectId's hex string is captured so that IDs can be extracted without decoding the JSON.
+    inner_regex = r'([a-f\d]{24})'
     bson_string = encode_bson_to_string(o)
     # Strip the whitespace in the encoding and allow one or more spaces.
     # Note: re.escape also escapes spaces, which is why the replace looks for '\\ '.
@@ -33,17 +37,60 @@ def generate_link_format_regex():
     return re.compile(pattern)
 
 
+LINK_FORMAT_REGEX = generate_link_format_regex()
+
+
 class MongoDBInterface(AbstractDBInterface):
-    def __init__(self, db_client_class: ClassVar, db_name, db_host, db_port, db_user=None, db_pass=None):
+    # Seconds before a wiki's cache of resolved link IDs is discarded.
+    LINK_RESOLUTION_CACHE_TTL = 60
+
+    # The most replacement wikis `delete_wiki` creates at once.
+    REPLACEMENT_WIKI_CONCURRENCY = 8
+
+    # The segments a new wiki starts with. Each may list child `segments` of its own, and each starts with its parent's
+    # template headings followed by its own.
+    DEFAULT_WIKI_TEMPLATE = [
+        {'title': 'Characters', 'template_headings': ['Biography']},
+        {'title': 'Locations',  'template_headings': ['History']},
+        {'title': 'Events',     'template_headings': ['Summary', 'Background', 'Timeline']},
+    ]
+
+    # The fields needed to walk the section tree, which leave out the paragraphs and their statistics.
+    SUBSECTIONS_PROJECTION = {
+        'preceding_subsections':  1,
+        'inner_subsections':      1,
+        'succeeding_subsections': 1,
+    }
+
+    def __init__(self, db_client_class: ClassVar, db_name, db_host, db_port, db_user=None, db_pass=None,
+                 alias_normalizer: AliasNormalizer = None, document_cache_bytes=0):
         if not issubclass(db_client_class, MongoDBClient):
             raise ValueError("invalid MongoDB client class: {}".format(db_client_class.__name__))  # pragma: no cover
         self._client = db_client_class(db_name, db_host, db_port, db_user, db_pass)
-        self._link_format_regex = generate_link_format_regex()
+        # Whole stories, sections, wikis, segments, and pages are read through a bounded cache, which every other client
+        # call invalidates by the IDs it is given.
+        self._document_cache = DocumentCache(document_cache_bytes) if document_cache_bytes > 0 else None
+        if self._document_cache is not None:
+            self._client = DocumentCachingClient(self._client, self._document_cache)
+        self._link_format_regex = LINK_FORMAT_REGEX
+        self._alias_normalizer = alias_normalizer if alias_normalizer is not None else AliasNormalizer()
+        # Passive-link indexes are built once per wiki and discarded whenever any alias changes.
+        self._alias_indexes: Dict[ObjectId, AliasIndex] = {}
+        # Link IDs found in paragraph text are resolved through a short-lived per-wiki cache, which is also discarded
+        # whenever a link, passive link, or alias is deleted or renamed. Each cache belongs to a generation, which moves
+        # on both before and after such a change is written, so that nothing looked up while it was being written is
+        # used afterwards.
+        self._link_resolution_caches: Dict[ObjectId, LinkResolutionCache] = {}
+        self._link_resolution_generation = 0
 
     @property
     def client(self) -> MongoDBClient:
         return self._client
 
+    @property
+    def document_cache(self) -> Union[DocumentCache, None]:
+        return self._document_cache
+
     @property
     def host(self):
         return self.client.host
@@ -56,6 +103,17 @@ class MongoDBInterface(AbstractDBInterface):
     def link_format_regex(self):
         return self._link_format_regex
 
+    @property
+    def alias_normalizer(self) -> AliasNormalizer:
+        return self._alias_normalizer
+
+    def gather(self, awaitables):
+        """
+        Return an awaitable of the results of the awaitables, run concurrently, in the order given. Each subclass
+        supplies the function of its event loop.
+        """
+        raise NotImplementedError  # pragma: no cover
+
     @staticmethod
     def tokenize_paragraph(paragraph):
         return LoomTokenizer.sent_tokenize(paragraph)
@@ -64,6 +122,21 @@ class MongoDBInterface(AbstractDBInterface):
     def tokenize_sentence(sentence):
         return LoomTokenizer.word_tokenize(sentence)
 
+    @staticmethod
+    def span_tokenize_paragraph(paragraph):
+        return LoomTokenizer.sent_span_tokenize(paragraph)
+
+    @staticmethod
+    def span_tokenize_sentence(sentence):
+        return LoomTokenizer.word_span_tokenize(sentence)
+
+    def find_link_ids(self, text) -> List[Tuple[int, int, ObjectId]]:
+        """
+        Return the `(start, end, object_id)` of every encoded ObjectId in the text, in order.
+        """
+        return [(match.start(), match.end(), ObjectId(match.group(1)))
+                for match in self.link_format_regex.finditer(text)]
+
     @staticmethod
     def encode_object_id(object_id: ObjectId) -> str:
         # Strip spaces to handle the front-end's poor life choices regarding link IDs.
@@ -147,12 +220,23 @@ class MongoDBInterface(AbstractDBInterface):
             return preferences
 
     async def get_user_stories_and_wikis(self, user_id):
-        story_ids_and_positions = await self._get_user_stories_and_positions(user_id)
-        wiki_ids = await self._get_user_wiki_ids(user_id)
+        story_ids_and_positions, wiki_ids = await self.gather([
+            self._get_user_stories_and_positions(user_id),
+            self._get_user_wiki_ids(user_id),
+        ])
+        story_ids = [story_id_and_pos['story_id'] for story_id_and_pos in story_ids_and_positions]
+        # Only the fields used below are fetched, and only the requesting user's entry in each `users` list.
+        user_projection = {'$elemMatch': {'user_id': user_id}}
+        wikis_by_id, stories_by_id = await self.gather([
+            self._get_documents_by_id('get_wiki', self.client.get_wikis, wiki_ids,
+                                      {'title': 1, 'users': user_projection}),
+            self._get_documents_by_id('get_story', self.client.get_stories, story_ids,
+                                      {'title': 1, 'wiki_id': 1, 'users': user_projection}),
+        ])
         wiki_ids_to_titles = {}
         wikis = []
         for wiki_id in wiki_ids:
-            wiki = await self.get_wiki(wiki_id)
+            wiki = wikis_by_id[wiki_id]
             wiki_ids_to_titles[wiki_id] = wiki['title']
             access_level = self._get_current_user_access_level_in_object(user_id, wiki)
             wikis.append({
@@ -164,13 +248,28 @@ class MongoDBInterface(AbstractDBInterface):
         for story_id_and_pos in story_ids_and_positions:
             story_id = story_id_and_pos['story_id']
             last_pos = story_id_and_pos['position_context']
-            story = await self.get_story(story_id)
+            story = stories_by_id[story_id]
             access_level = self._get_current_user_access_level_in_object(user_id, story)
             wiki_title = wiki_ids_to_titles[story['wiki_id']]
             story_description = self._build_story_description(story, wiki_title, access_level, last_pos)
             stories.append(story_description)
         return {'stories': stories, 'wikis': wikis}
 
+    @staticmethod
+    async def _get_documents_by_id(query, get_documents, ids, projection, missing_ok=False):
+        if not ids:
+            return {}
+        try:
+            documents = await get_documents(ids, projection)
+        except ClientError:
+            raise BadValueError(query=query, value=ids)
+        documents_by_id = {document['_id']: document for document in documents}
+        if not missing_ok:
+            for _id in ids:
+                if _id not in documents_by_id:
+                    raise BadValueError(query=query, value=_id)
+        return documents_by_id
+
     async def _get_user_stories_and_positions(self, user_id):
         try:
             story_ids_and_positions = await self.client.get_user_stories(user_id)
@@ -189,7 +288,8 @@ class MongoDBInterface(AbstractDBInterface):
 
     @staticmethod
     def _get_current_user_access_level_in_object(user_id, obj):
-        for user in obj['users']:
+        # A projection that matches no user omits the `users` field.
+        for user in obj.get('users', []):
             if user['user_id'] == user_id:
                 return user['access_level']
 
@@ -205,8 +305,8 @@ class MongoDBInterface(AbstractDBInterface):
         return wiki_id in user['wikis']
 
     async def get_story_description(self, user_id, story_id):
-        story = await self.get_story(story_id)
-        wiki = await self.get_wiki(story['wiki_id'])
+        story = await self.get_story(story_id, {'title': 1, 'wiki_id': 1, 'users': 1})
+        wiki = await self.get_wiki(story['wiki_id'], {'title': 1})
         access_level = self._get_current_user_access_level_in_object(user_id, story)
         # This makes an assumption that the position_context has not been set for the user.
         story_description = self._build_story_description(story, wiki['title'], access_level)
@@ -390,6 +490,73 @@ class MongoDBInterface(AbstractDBInterface):
             aliases_created = []
         return text, paragraph_id, links_created, passive_links_created, aliases_created
 
+    async def add_paragraphs(self, wiki_id, section_id, texts: List[str]):
+        """
+        Append paragraphs to the end of a section, giving the same result as calling `add_paragraph` for each text in
+        turn. The text, links, passive links, and statistics of every paragraph are worked out in memory first, and
+        then the paragraphs, passive links, and section statistics are stored with one write each.
+
+        Returns the `(text, paragraph_id, links_created, passive_links_created, aliases_created)` of each paragraph,
+        as `add_paragraph` does.
+        """
+        section_stats = await self.get_section_statistics(section_id)
+        section_wf = Counter(section_stats['word_frequency'])
+        paragraphs = []
+        passive_links_by_paragraph = {}
+        passive_link_ids_by_alias = defaultdict(list)
+        link_contexts = []  # (paragraph_id, sentences_and_links)
+        results = []
+        for text in texts:
+            paragraph_id = ObjectId()
+            text, links_created, aliases_created = await self._find_and_create_links_in_paragraph(section_id,
+                                                                                                  paragraph_id, text)
+            text, passive_links = await self._find_passive_links_in_text(wiki_id, text)
+            unsaved_passive_links = {}
+            for passive_link_id, alias_id, page_id in passive_links:
+                passive_link_ids_by_alias[alias_id].append(passive_link_id)
+                unsaved_passive_links[passive_link_id] = {
+                    '_id':      passive_link_id,
+                    'context':  {'section_id': section_id, 'paragraph_id': paragraph_id},
+                    'alias_id': alias_id,
+                    'page_id':  page_id,
+                    'pending':  True,
+                }
+            if passive_links:
+                passive_links_by_paragraph[paragraph_id] = passive_links
+            sentences_and_links, word_frequencies = await self._get_links_and_word_counts_from_paragraph(
+                wiki_id, text, unsaved_passive_links)
+            if sentences_and_links:
+                link_contexts.append((paragraph_id, sentences_and_links))
+            section_wf.update(word_frequencies)
+            paragraphs.append({
+                '_id':           paragraph_id,
+                'text':          text,
+                'statistics':    {'word_frequency': word_frequencies, 'word_count': sum(word_frequencies.values())},
+                'links':         [link['_id'] for _, links, _ in sentences_and_links for link in links],
+                'passive_links': [passive_link['_id'] for _, _, passive_links_in_sentence in sentences_and_links
+                                  for passive_link in passive_links_in_sentence],
+                'note':          None,
+            })
+            passive_links_created = [(passive_link_id, alias_id) for passive_link_id, alias_id, _ in passive_links]
+            results.append((text, paragraph_id, links_created, passive_links_created, aliases_created))
+        if not paragraphs:
+            return results
+        try:
+            await self.client.insert_paragraphs(section_id, paragraphs)
+            if passive_links_by_paragraph:
+                await self.client.create_passive_links_in_section(section_id, passive_links_by_paragraph)
+                await self.client.insert_passive_links_to_aliases(passive_link_ids_by_alias)
+        except ClientError:
+            # The unsaved passive links were put in the link resolution cache, and may never have been stored.
+            self._invalidate_link_resolution_caches()
+            raise FailedUpdateError(query='add_paragraphs')
+        # This also sets the context of passive links that share a sentence with a link, so they must be stored first.
+        for paragraph_id, sentences_and_links in link_contexts:
+            await self._update_link_contexts(wiki_id, section_id, paragraph_id, sentences_and_links)
+        self._remove_unused_words(section_wf)
+        await self.set_section_statistics(section_id, section_wf, sum(section_wf.values()))
+        return results
+
     async def add_bookmark(self, name, story_id, section_id, paragraph_id, index=None):
         bookmark_id = ObjectId()
         try:
@@ -410,7 +577,7 @@ class MongoDBInterface(AbstractDBInterface):
         user_description = self._build_user_description(user_id, user['name'], 'collaborator')
         await self._add_user_description_to_story(user_description, story_id, index=None)
         # Check if user has access to wiki, if not add access
-        story = await self.get_story(story_id)
+        story = await self.get_story(story_id, {'wiki_id': 1})
         # Return the wiki_id if user did not have access previously
         wiki_id = story['wiki_id']
         if not self._user_has_access_to_wiki(user, wiki_id):
@@ -433,9 +600,9 @@ class MongoDBInterface(AbstractDBInterface):
         except ClientError:
             raise FailedUpdateError(query='_add_user_description_to_wiki')
 
-    async def get_story(self, story_id):
+    async def get_story(self, story_id, projection=None):
         try:
-            story = await self.client.get_story(story_id)
+            story = await self.client.get_story(story_id, projection)
         except ClientError:
             raise BadValueError(query='get_story', value=story_id)
         else:
@@ -451,7 +618,7 @@ class MongoDBInterface(AbstractDBInterface):
 
     async def get_story_bookmarks(self, story_id):
         try:
-            story = await self.client.get_story(story_id)
+            story = await self.client.get_story(story_id, {'bookmarks': 1})
         except ClientError:
             raise BadValueError(query='get_story_bookmarks', value=story_id)
         else:
@@ -459,7 +626,7 @@ class MongoDBInterface(AbstractDBInterface):
 
     async def get_story_hierarchy(self, story_id):
         try:
-            story = await self.get_story(story_id)
+            story = await self.get_story(story_id, {'section_id': 1})
         except ClientError:
             raise BadValueError(query='get_story_hierarchy', value=story_id)
         section_id = story['section_id']
@@ -467,7 +634,7 @@ class MongoDBInterface(AbstractDBInterface):
 
     async def get_section_hierarchy(self, section_id):
         try:
-            section = await self.client.get_section(section_id)
+            section = await self.client.get_section(section_id, dict(self.SUBSECTIONS_PROJECTION, title=1))
         except ClientError:
             raise BadValueError(query='get_section_hierarchy', value=section_id)
         hierarchy = {
@@ -484,7 +651,7 @@ class MongoDBInterface(AbstractDBInterface):
 
     async def get_section_content(self, section_id):
         try:
-            section = await self.client.get_section(section_id)
+            section = await self.client.get_section(section_id, {'content': 1, 'notes': 1})
         except ClientError:
             raise BadValueError(query='get_section_content', value=section_id)
         paragraphs = []
@@ -497,7 +664,7 @@ class MongoDBInterface(AbstractDBInterface):
 
     async def set_story_title(self, story_id, title):
         try:
-            story = await self.client.get_story(story_id)
+            story = await self.client.get_story(story_id, {'section_id': 1})
         except ClientError:
             raise BadValueError(query='set_story_title', value=story_id)
         try:
@@ -516,12 +683,113 @@ class MongoDBInterface(AbstractDBInterface):
             raise FailedUpdateError(query='set_section_title')
 
     async def set_paragraph_text(self, wiki_id, section_id, text, paragraph_id):
+        (
+            text,
+            links_created,
+            passive_links_created,
+            aliases_created
+        ) = await self._create_links_in_text(wiki_id, section_id, paragraph_id, text)
+        sentences_and_links, word_frequencies = await self._get_links_and_word_counts_from_paragraph(wiki_id, text)
+        section_links, section_passive_links = await self._update_link_contexts(wiki_id, section_id, paragraph_id,
+                                                                                sentences_and_links)
+        await self._set_links_in_paragraph(section_id, paragraph_id, section_links, section_passive_links)
+        await self._set_paragraph_text(section_id, text, paragraph_id)
+        await self._update_paragraph_statistics(section_id, paragraph_id, word_frequencies)
+        return text, links_created, passive_links_created, aliases_created
+
+    async def apply_paragraph_delta(self, wiki_id, section_id, operations, paragraph_id):
+        """
+        Apply text operations to a paragraph's stored text, processing only the sentences they changed.
+
+        Returns the operations that turn the previously stored text into the new stored text, along with any links,
+        passive links, and aliases that were created. These are the client's own operations, followed by operations
+        against their result when creating links rewrote the changed text.
+        """
+        try:
+            old_text = await self.client.get_paragraph_text(section_id, paragraph_id)
+        except ClientError:
+            raise BadValueError(query='apply_paragraph_delta', value=paragraph_id)
+        try:
+            new_text = apply_text_operations(old_text, operations)
+        except TextOperationError:
+            raise BadValueError(query='apply_paragraph_delta', value=operations)
+        old_start, old_end, new_start, new_end = find_changed_sentences(old_text,
+                                                                        self.span_tokenize_paragraph(old_text),
+                                                                        new_text,
+                                                                        self.span_tokenize_paragraph(new_text))
+        (
+            new_region,
+            links_created,
+            passive_links_created,
+            aliases_created
+        ) = await self._create_links_in_text(wiki_id, section_id, paragraph_id, new_text[new_start:new_end])
+        if new_region != new_text[new_start:new_end]:
+            # The sender has already applied their own operations, so the rewrite is sent as operations on the result.
+            edited_text = new_text
+            new_text = new_text[:new_start] + new_region + new_text[new_end:]
+            operations = operations + diff_text_operations(edited_text, new_text)
+        old_region = old_text[old_start:old_end]
+        try:
+            stored_links, stored_passive_links, paragraph_statistics = await self.gather([
+                self.client.get_links_in_paragraph(paragraph_id, section_id),
+                self.client.get_passive_links_in_paragraph(paragraph_id, section_id),
+                self.client.get_paragraph_statistics(section_id, paragraph_id),
+            ])
+        except ClientError:
+            raise BadValueError(query='apply_paragraph_delta', value=paragraph_id)
+        sentences_and_links, new_region_word_frequencies = await self._get_links_and_word_counts_from_paragraph(
+            wiki_id, new_region)
+        await self._update_link_contexts(wiki_id, section_id, paragraph_id, sentences_and_links)
+        # The links outside the changed sentences are unchanged, so only those in the changed sentences are replaced.
+        old_region_ids = {_id for _, _, _id in self.find_link_ids(old_region)}
+        new_region_links, new_region_passive_links = await self._get_link_ids_in_text(wiki_id, new_region)
+        new_region_end = new_start + len(new_region)
+        section_links = self._replace_link_ids(stored_links, old_region_ids, new_region_links, new_text, new_region_end)
+        section_passive_links = self._replace_link_ids(stored_passive_links, old_region_ids, new_region_passive_links,
+                                                       new_text, new_region_end)
+        await self._set_links_in_paragraph(section_id, paragraph_id, section_links, section_passive_links)
+        await self._set_paragraph_text(section_id, new_text, paragraph_id)
+        # The stored statistics are updated by the difference between the changed sentences' old and new words. Words
+        # the old sentences no longer count the same way, such as alias names that have changed since they were stored,
+        # are left as they were rather than dropping below zero.
+        _, old_region_word_frequencies = await self._get_links_and_word_counts_from_paragraph(wiki_id, old_region)
+        previous_word_frequencies = Counter(paragraph_statistics['word_frequency'])
+        word_frequencies = previous_word_frequencies.copy()
+        word_frequencies.subtract(old_region_word_frequencies)
+        word_frequencies.update(new_region_word_frequencies)
+        await self._update_paragraph_statistics(section_id, paragraph_id, +word_frequencies,
+                                                previous_word_frequencies)
+        return operations, links_created, passive_links_created, aliases_created
+
+    def _replace_link_ids(self, stored_ids, old_ids, new_ids, text, region_end):
+        """
+        Replace the IDs of a paragraph's links that were in a changed part of its text with the IDs of those now in it.
+
+        The stored IDs are in the order of the text, so the new IDs take the place of the first old one, or else go
+        before the first stored ID that follows the changed part, which ends at `region_end` in `text`.
+        """
+        kept_ids = [_id for _id in stored_ids if _id not in old_ids]
+        index = next((index for index, _id in enumerate(stored_ids) if _id in old_ids), None)
+        if index is None:
+            index = len(kept_ids)
+            kept_indices = {_id: kept_index for kept_index, _id in enumerate(kept_ids)}
+            for match in self.link_format_regex.finditer(text, region_end):
+                kept_index = kept_indices.get(ObjectId(match.group(1)))
+                if kept_index is not None:
+                    index = kept_index
+                    break
+        return kept_ids[:index] + new_ids + kept_ids[index:]
+
+    async def _create_links_in_text(self, wiki_id, section_id, paragraph_id, text):
         text, links_created, aliases_created = await self._find_and_create_links_in_paragraph(section_id, paragraph_id,
                                                                                               text)
         text, passive_links_created = await self._find_and_create_passive_links_in_paragraph(section_id, paragraph_id,
                                                                                              wiki_id, text)
-        sentences_and_links, word_frequencies = await self._get_links_and_word_counts_from_paragraph(text)
-        page_updates = {}
+        return text, links_created, passive_links_created, aliases_created
+
+    async def _update_link_contexts(self, wiki_id, section_id, paragraph_id, sentences_and_links):
+        link_resolution_cache = self._get_link_resolution_cache(wiki_id)
+        reference_contexts = {}
         section_links = []
         section_passive_links = []
         for sentence, links, passive_links in sentences_and_links:
@@ -535,14 +803,10 @@ class MongoDBInterface(AbstractDBInterface):
                 try:
                     await self.client.set_link_context(link_id, context)
                 except ClientError:
-                    raise FailedUpdateError(query='set_paragraph_text')
-                # Get page ID from link and add its context to `page_updates`.
-                page_id = link['page_id']
-                link_updates = page_updates.get(page_id)
-                if link_updates is None:
-                    link_updates = {}
-                    page_updates[page_id] = link_updates
-                link_updates[link_id] = context
+                    raise FailedUpdateError(query='_update_link_contexts')
+                link_resolution_cache.set_context(link_id, context)
+                # The link's reference in its page gets the same context.
+                reference_contexts[link_id] = context
                 # Add link to `section_links` to update the links for the paragraph.
                 section_links.append(link_id)
             for passive_link in passive_links:
@@ -554,34 +818,44 @@ class MongoDBInterface(AbstractDBInterface):
                 try:
                     await self.client.set_passive_link_context(passive_link_id, context)
                 except ClientError:
-                    raise FailedUpdateError(query='set_paragraph_text')
+                    raise FailedUpdateError(query='_update_link_contexts')
+                link_resolution_cache.set_context(passive_link_id, context)
                 # Add passive_link to `section_passive_links` to update the passive_links for the paragraph.
                 section_passive_links.append(passive_link_id)
-        # Apply updates to references in pages.
-        for page_id, updates in page_updates.items():
-            page = await self._get_page(page_id)
-            references = page['references']
-            for link_id, context in updates.items():
-                self._update_link_in_references_with_context(references, link_id, context)
-            await self._set_page_references(page_id, references)
+        try:
+            await self.client.set_reference_contexts(reference_contexts)
+        except ClientError:
+            raise FailedUpdateError(query='_update_link_contexts')
+        return section_links, section_passive_links
+
+    async def _set_links_in_paragraph(self, section_id, paragraph_id, section_links, section_passive_links):
         # Update links for this paragraph for the section.
         try:
             await self.client.set_links_in_section(section_id, section_links, paragraph_id)
         except ClientError:
-            raise FailedUpdateError(query='set_paragraph_text')
+            raise FailedUpdateError(query='_set_links_in_paragraph')
         try:
             await self.client.set_passive_links_in_section(section_id, section_passive_links, paragraph_id)
         except ClientError:
-            raise FailedUpdateError(query='set_paragraph_text')
-        await self._set_paragraph_text(section_id, text, paragraph_id)
+            raise FailedUpdateError(query='_set_links_in_paragraph')
+
+    async def _update_paragraph_statistics(self, section_id, paragraph_id, word_frequencies,
+                                           previous_word_frequencies=None):
         # Get statistics for section and paragraph
         section_stats = await self.get_section_statistics(section_id)
         section_wf = Counter(section_stats['word_frequency'])
-        paragraph_stats = await self.get_paragraph_statistics(section_id, paragraph_id)
-        paragraph_wf = Counter(paragraph_stats['word_frequency'])
+        if previous_word_frequencies is None:
+            paragraph_stats = await self.get_paragraph_statistics(section_id, paragraph_id)
+            previous_word_frequencies = Counter(paragraph_stats['word_frequency'])
         # Update statistics for section and paragraph
-        section_wf.subtract(paragraph_wf)
+        section_wf.subtract(previous_word_frequencies)
         section_wf.update(word_frequencies)
+        self._remove_unused_words(section_wf)
+        await self.set_section_statistics(section_id, section_wf, sum(section_wf.values()))
+        await self.set_paragraph_statistics(paragraph_id, word_frequencies, sum(word_frequencies.values()), section_id)
+
+    @staticmethod
+    def _remove_unused_words(section_wf: Counter):
         # Remove words with frequencies of 0 in section word frequencies
         for word, frequency in reversed(section_wf.most_common()):
             if frequency == 0:
@@ -589,9 +863,6 @@ class MongoDBInterface(AbstractDBInterface):
             # We can stop iterating after finding a non-zero frequency because we are iterating from least common.
             else:
                 break
-        await self.set_section_statistics(section_id, section_wf, sum(section_wf.values()))
-        await self.set_paragraph_statistics(paragraph_id, word_frequencies, sum(word_frequencies.values()), section_id)
-        return text, links_created, passive_links_created, aliases_created
 
     async def _set_paragraph_text(self, section_id, text, paragraph_id):
         try:
@@ -599,137 +870,185 @@ class MongoDBInterface(AbstractDBInterface):
         except ClientError:
             raise FailedUpdateError(query='_set_paragraph_text')
 
-    async def _set_page_references(self, page_id: ObjectId, references: list):
-        try:
-            await self.client.set_page_references(page_id, references)
-        except ClientError:
-            raise FailedUpdateError(query='_set_page_references')
-
-    @staticmethod
-    def _update_link_in_references_with_context(references, link_id, context):
-        for reference in references:
-            if reference['link_id'] == link_id:
-                reference['context'] = context
-                break
-
-    async def _get_links_and_word_counts_from_paragraph(self, paragraph_text):
+    async def _get_links_and_word_counts_from_paragraph(self, wiki_id, paragraph_text, unsaved_passive_links=None):
         # TODO: Support languages other than English.
-        sentences = self.tokenize_paragraph(paragraph_text)
+        link_matches = self.find_link_ids(paragraph_text)
+        links, passive_links, alias_names = await self._resolve_link_ids(wiki_id, {_id for _, _, _id in link_matches},
+                                                                         unsaved_passive_links)
         word_counts = Counter()
         results = []
-        for sentence in sentences:
+        match_index = 0
+        for sentence_start, sentence_end in self.span_tokenize_paragraph(paragraph_text):
             sentence_links = []
             sentence_passive_links = []
-            sentence_with_links_replaced = sentence
-            link_matches = re.findall(self.link_format_regex, sentence)
-            for match in link_matches:
-                potential_id = decode_string_to_bson(match)
-                try:
-                    link = await self.get_link(potential_id)
+            # Buffer used for efficiently joining the sentence back together with the links replaced.
+            buffer = []
+            prev_end = sentence_start
+            while match_index < len(link_matches) and link_matches[match_index][0] < sentence_end:
+                start, end, potential_id = link_matches[match_index]
+                match_index += 1
+                if end > sentence_end:
+                    # The match was split across sentences, so neither sentence contains the whole link.
+                    continue
+                link = links.get(potential_id)
+                if link is not None:
                     alias_id = link['alias_id']
-                    sentence_links.append(link)
-                except InterfaceError:
-                    # `potential_id` looked like a link, but it did not correspond to any legitimate link.
-                    # Now we check if it's a passive link.
-                    try:
-                        passive_link = await self.get_passive_link(potential_id)
-                        alias_id = passive_link['alias_id']
-                    except InterfaceError:
+                    sentence_links.append(LinkResolutionCache.copy_document(link))
+                else:
+                    passive_link = passive_links.get(potential_id)
+                    if passive_link is None:
                         # `potential_id` looked like a link, but it did not correspond to any legitimate link.
                         continue
-                    sentence_passive_links.append(passive_link)
-                try:
-                    alias = await self.client.get_alias(alias_id)
-                except ClientError:
+                    alias_id = passive_link['alias_id']
+                    sentence_passive_links.append(LinkResolutionCache.copy_document(passive_link))
+                replacement = alias_names.get(alias_id)
+                if replacement is None:
                     raise BadValueError(query='get_links_and_word_counts_from_paragraph', value=potential_id)
-                replacement = alias['name']
-                sentence_with_links_replaced = sentence_with_links_replaced.replace(match, replacement)
+                buffer.append(paragraph_text[prev_end:start])
+                buffer.append(replacement)
+                prev_end = end
+            buffer.append(paragraph_text[prev_end:sentence_end])
+            sentence_with_links_replaced = ''.join(buffer)
             # Mongo does not support '$' or '.' in key name, so we replace them with their unicode equivalents.
             words = [token.replace('.', '').replace('$', '').lower() for token in
                      self.tokenize_sentence(sentence_with_links_replaced) if token not in punctuation]
             word_counts.update(words)
             if sentence_links:
-                sentence_tuple = (sentence, sentence_links, sentence_passive_links)
+                sentence_tuple = (paragraph_text[sentence_start:sentence_end], sentence_links, sentence_passive_links)
                 results.append(sentence_tuple)
         return results, word_counts
 
+    def _get_link_resolution_cache(self, wiki_id) -> LinkResolutionCache:
+        cache = self._link_resolution_caches.get(wiki_id)
+        if cache is None or cache.expired or cache.generation != self._link_resolution_generation:
+            cache = LinkResolutionCache(self.LINK_RESOLUTION_CACHE_TTL, self._link_resolution_generation)
+            self._link_resolution_caches[wiki_id] = cache
+        return cache
+
+    def _invalidate_link_resolution_caches(self):
+        # A lookup still running keeps the cache it started with, which is never handed out again.
+        self._link_resolution_generation += 1
+        self._link_resolution_caches.clear()
+
+    async def _get_link_ids_in_text(self, wiki_id, text):
+        link_ids = [_id for _, _, _id in self.find_link_ids(text)]
+        links, passive_links, _ = await self._resolve_link_ids(wiki_id, set(link_ids))
+        return [_id for _id in link_ids if _id in links], [_id for _id in link_ids if _id in passive_links]
+
+    async def _resolve_link_ids(self, wiki_id, potential_ids, unsaved_passive_links=None):
+        """
+        Look up IDs found in paragraph text as links and then as passive links, along with the names of their aliases,
+        fetching whatever the wiki's cache is missing with one query per collection.
+
+        `unsaved_passive_links` maps the IDs of passive links that are about to be stored to their documents, so that
+        they resolve before they reach the database.
+        """
+        cache = self._get_link_resolution_cache(wiki_id)
+        if unsaved_passive_links:
+            for _id, passive_link in unsaved_passive_links.items():
+                cache.links[_id] = None
+                cache.passive_links[_id] = passive_link
+        try:
+            unknown_ids = [_id for _id in potential_ids if _id not in cache.links]
+            if unknown_ids:
+                found = {link['_id']: link for link in await self.client.get_links(unknown_ids)}
+                for _id in unknown_ids:
+                    cache.links[_id] = found.get(_id)
+            unknown_ids = [_id for _id in potential_ids
+                           if cache.links[_id] is None and _id not in cache.passive_links]
+            if unknown_ids:
+                found = {link['_id']: link for link in await self.client.get_passive_links(unknown_ids)}
+                for _id in unknown_ids:
+                    cache.passive_links[_id] = found.get(_id)
+            links = {_id: cache.links[_id] for _id in potential_ids if cache.links[_id] is not None}
+            passive_links = {_id: cache.passive_links[_id] for _id in potential_ids
+                             if _id not in links and cache.passive_links[_id] is not None}
+            unknown_ids = list({link['alias_id'] for link in chain(links.values(), passive_links.values())
+                                if link['alias_id'] not in cache.alias_names})
+            if unknown_ids:
+                for alias in await self.client.get_aliases(unknown_ids, projection={'name': 1}):
+                    cache.alias_names[alias['_id']] = alias['name']
+        except ClientError:
+            raise BadValueError(query='get_links_and_word_counts_from_paragraph', value=potential_ids)
+        return links, passive_links, cache.alias_names
+
     async def _find_and_create_links_in_paragraph(self, section_id, paragraph_id, text):
+        # Parse every encoded request first so that the links can be created together.
+        spans = []
+        requested_links = []  # (story_id, page_id, name)
+        for match in CREATE_LINK_REGEX.finditer(text):
+            start, end = match.span()
+            # Split the match into story_id, page_id, and name, and convert oids from strings to ObjectId.
+            story_id, page_id, name = tuple(text[start:end].split('|')[1:4])
+            spans.append((start, end))
+            requested_links.append((decode_string_to_bson(story_id), decode_string_to_bson(page_id), name))
+        created_links = await self.create_links(section_id, paragraph_id, requested_links)
         prev_end = 0
         links_created = []  # (link_id, alias_id)
         aliases_created = []  # (alias_id, page_id, name)
         # Buffer used for efficiently joining the string back together.
         buffer = []
-        # Iterate through each encoded request and replace with a link_id.
-        for match in CREATE_LINK_REGEX.finditer(text):
-            start, end = match.span()
-            link_id, alias_id, alias_info = await self._create_link_and_replace_text(section_id, paragraph_id, text,
-                                                                                     start, end)
+        # Replace each encoded request with its link_id.
+        for (start, end), (_, page_id, name), (link_id, alias_id, alias_was_created) in zip(spans, requested_links,
+                                                                                           created_links):
             links_created.append((link_id, alias_id))
-            if alias_info is not None:
-                aliases_created.append(alias_info)
-            encoded_link_id = self.encode_object_id(link_id)
+            if alias_was_created:
+                aliases_created.append((alias_id, page_id, name))
             # Add the previous text and link_id to the buffer.
             buffer.append(text[prev_end:start])
-            buffer.append(encoded_link_id)
+            buffer.append(self.encode_object_id(link_id))
             prev_end = end
         # Don't forget to add the rest of the string.
         buffer.append(text[prev_end:])
         return ''.join(buffer), links_created, aliases_created
 
+    async def _get_alias_index(self, wiki_id):
+        alias_index = self._alias_indexes.get(wiki_id)
+        if alias_index is None:
+            alias_index = AliasIndex(self.alias_normalizer)
+            aliases = await self.get_wiki_alias_list(wiki_id)
+            for alias in aliases:
+                alias_index.add_alias(self.tokenize_sentence(alias['alias_name']), alias['page_id'], alias['alias_id'])
+            self._alias_indexes[wiki_id] = alias_index
+        return alias_index
+
+    def _invalidate_alias_indexes(self):
+        self._alias_indexes.clear()
+
     async def _find_and_create_passive_links_in_paragraph(self, section_id, paragraph_id, wiki_id, text):
-        # Build a trie of the alias names to parse paragraph text.
-        trie = AliasTrie()
-        aliases = await self.get_wiki_alias_list(wiki_id)
-        for alias in aliases:
-            path = self.tokenize_sentence(alias['alias_name'])
-            trie.add_path(path, alias['page_id'], alias['alias_id'])
-        # Parse the text.
+        text, passive_links = await self._find_passive_links_in_text(wiki_id, text)
+        await self.create_passive_links(section_id, paragraph_id, passive_links)
+        # Create passive link message requires the passive_link_id and the alias_id
+        return text, [(passive_link_id, alias_id) for passive_link_id, alias_id, _ in passive_links]
+
+    async def _find_passive_links_in_text(self, wiki_id, text):
+        """
+        Replace each alias of the wiki found in the text with the ID of a new passive link, returning the rewritten text
+        and the `(passive_link_id, alias_id, page_id)` of each passive link. The passive links are not stored.
+        """
+        # Match the normalized tokens of the text against the wiki's alias index.
+        alias_index = await self._get_alias_index(wiki_id)
         passive_links = []
-        sentences_buffer = []
-        sentences = self.tokenize_paragraph(text)
-        for sentence in sentences:
-            tokens = self.tokenize_sentence(sentence)
-            buffer = []
-            sent_index = 0
-            token_index = 0
-            while token_index < len(tokens):
-                while sentence[sent_index] == ' ':
-                    buffer.append(' ')
-                    sent_index += 1
-                match = trie.find_longest_match_in_tokens(tokens, from_index=token_index)
-                if match is not None:
-                    passive_link_id = await self.create_passive_link(section_id, paragraph_id, match.alias_id,
-                                                                     match.page_id)
-                    # Create passive link message requires the passive_link_id and the alias_id
-                    passive_links.append((passive_link_id, match.alias_id))
-                    encoded_link_id = self.encode_object_id(passive_link_id)
-                    for j in range(match.length):
-                        sent_index += len(tokens[token_index])
-                        if j < match.length - 1:
-                            while sentence[sent_index] == ' ':
-                                sent_index += 1
-                        token_index += 1
-                    buffer.append(encoded_link_id)
-                else:
-                    token = tokens[token_index]
-                    sent_index += len(token)
-                    buffer.append(token)
-                    token_index += 1
-            sentences_buffer.append(''.join(buffer))
-        return ' '.join(sentences_buffer), passive_links
-
-    async def _create_link_and_replace_text(self, section_id, paragraph_id, text, start, end):
-        # Get the match and split it into story_id, page_id, and name.
-        tokens = text[start:end].split('|')[1:4]
-        story_id, page_id, name = tuple(tokens)
-        # Convert oids from strings to ObjectId.
-        story_id = decode_string_to_bson(story_id)
-        page_id = decode_string_to_bson(page_id)
-        link_id, alias_id, alias_was_created = await self.create_link(story_id, section_id, paragraph_id, name, page_id)
-        alias_info = None
-        if alias_was_created:
-            alias_info = (alias_id, page_id, name)
-        return link_id, alias_id, alias_info
+        prev_end = 0
+        # Buffer used for efficiently joining the string back together.
+        buffer = []
+        for sentence_start, sentence_end in self.span_tokenize_paragraph(text):
+            sentence = text[sentence_start:sentence_end]
+            token_spans = self.span_tokenize_sentence(sentence)
+            tokens = [sentence[start:end] for start, end in token_spans]
+            for token_index, match in alias_index.find_all_matches_in_tokens(tokens):
+                # IDs are allocated here so the text can be rewritten before the passive links are stored.
+                passive_link_id = ObjectId()
+                passive_links.append((passive_link_id, match.alias_id, match.page_id))
+                # Replace everything from the first matched token to the last, keeping the text around it untouched.
+                start = sentence_start + token_spans[token_index][0]
+                end = sentence_start + token_spans[token_index + match.length - 1][1]
+                buffer.append(text[prev_end:start])
+                buffer.append(self.encode_object_id(passive_link_id))
+                prev_end = end
+        # Don't forget to add the rest of the string.
+        buffer.append(text[prev_end:])
+        return ''.join(buffer), passive_links
 
     async def set_section_statistics(self, section_id: ObjectId, word_frequency_table: dict, word_count: int):
         try:
@@ -758,7 +1077,7 @@ class MongoDBInterface(AbstractDBInterface):
 
     async def delete_story(self, story_id, user_id):
         try:
-            story = await self.get_story(story_id)
+            story = await self.get_story(story_id, {'section_id': 1, 'users': 1})
         except ClientError:
             raise BadValueError(query='delete_story', value=story_id)
         # Verify this user is allowed to delete the story (is an owner).
@@ -766,7 +1085,8 @@ class MongoDBInterface(AbstractDBInterface):
             raise BadValueError(query='delete_story', value=user_id)
         # The user is allowed to delete the story, so delete it.
         section_id = story['section_id']
-        await self._recur_delete_section_and_subsections(section_id)
+        # The sections are deleted before the story, so they may already be gone if a deletion was interrupted.
+        await self._recur_delete_section_and_subsections(section_id, missing_ok=True)
         user_ids = []
         for user in story['users']:
             user_id = user['user_id']
@@ -780,13 +1100,13 @@ class MongoDBInterface(AbstractDBInterface):
 
     async def delete_section(self, section_id, story_id=None):
         if story_id is not None:
-            story = await self.get_story(story_id)
+            story = await self.get_story(story_id, {'bookmarks': 1})
         else:
             story = None
         deleted_bookmarks = await self._recur_delete_section_and_subsections(section_id, story)
         return deleted_bookmarks
 
-    async def _recur_delete_section_and_subsections(self, section_id, story=None):
+    async def _recur_delete_section_and_subsections(self, section_id, story=None, missing_ok=False):
         deleted_bookmarks = []
         if story is not None:
             for bookmark in story['bookmarks']:
@@ -797,22 +1117,29 @@ class MongoDBInterface(AbstractDBInterface):
                     except ClientError:
                         raise FailedUpdateError(query='recur_delete_section_and_subsections')
         try:
-            section = await self.client.get_section(section_id)
+            section = await self.client.get_section(section_id,
+                                                    dict(self.SUBSECTIONS_PROJECTION, links=1, passive_links=1))
         except ClientError:
+            if missing_ok:
+                return deleted_bookmarks
             raise BadValueError(query='recur_delete_section_and_subsections', value=section_id)
+        # Each section is deleted after the sections below it, so a subsection that is gone was deleted along with
+        # everything below it by an earlier deletion that was interrupted.
         for subsection_id in chain(section['preceding_subsections'],
                                    section['inner_subsections'],
                                    section['succeeding_subsections']):
-            section_deleted_bookmarks = await self._recur_delete_section_and_subsections(subsection_id)
+            section_deleted_bookmarks = await self._recur_delete_section_and_subsections(subsection_id, missing_ok=True)
             deleted_bookmarks.extend(section_deleted_bookmarks)
-        for link_summary in section['links']:
-            link_ids = link_summary['links']
-            for link_id in link_ids:
-                await self.delete_link(link_id)
-        for passive_link_summary in section['passive_links']:
-            passive_link_ids = passive_link_summary['passive_links']
-            for passive_link_id in passive_link_ids:
-                await self.delete_passive_link(passive_link_id)
+        # The sections keep the IDs of links that have since been deleted, which are skipped.
+        link_ids = list(chain.from_iterable(link_summary['links'] for link_summary in section['links']))
+        links = await self._get_documents_by_id('get_link', self.client.get_links, link_ids,
+                                                {'alias_id': 1, 'page_id': 1}, missing_ok=True)
+        await self._delete_links(links.values())
+        passive_link_ids = list(chain.from_iterable(passive_link_summary['passive_links']
+                                                    for passive_link_summary in section['passive_links']))
+        passive_links = await self._get_documents_by_id('get_passive_link', self.client.get_passive_links,
+                                                        passive_link_ids, {'alias_id': 1}, missing_ok=True)
+        await self._delete_passive_links(passive_links.values())
         try:
             await self.client.delete_section(section['_id'])
         except ClientError:
@@ -820,7 +1147,7 @@ class MongoDBInterface(AbstractDBInterface):
         return deleted_bookmarks
 
     async def delete_paragraph(self, story_id, section_id, paragraph_id):
-        story = await self.get_story(story_id)
+        story = await self.get_story(story_id, {'bookmarks': 1})
         deleted_bookmarks = []
         for bookmark in story['bookmarks']:
             if bookmark['paragraph_id'] == paragraph_id:
@@ -868,8 +1195,8 @@ class MongoDBInterface(AbstractDBInterface):
 
     async def remove_story_collaborator(self, story_id, user_id):
         user = await self._get_user_for_user_id(user_id)
-        story = await self.get_story(story_id)
-        wiki = await self.get_wiki(story['wiki_id'])
+        story = await self.get_story(story_id, {'wiki_id': 1, 'users': 1})
+        wiki = await self.get_wiki(story['wiki_id'], {'users': 1})
         if self._get_current_user_access_level_in_object(user_id, story) == 'owner':
             raise BadValueError(query='remove_story_collaborator', value=user_id)
         if self._get_current_user_access_level_in_object(user_id, wiki) == 'owner':
@@ -901,11 +1228,7 @@ class MongoDBInterface(AbstractDBInterface):
         if await self._section_is_ancestor_of_candidate(section_id, to_parent_id):
             raise BadValueError(query='move_subsection_as_preceding', value=to_parent_id)
         try:
-            await self.client.remove_section_from_parent(section_id)
-        except ClientError:
-            raise FailedUpdateError(query='move_subsection_as_preceding')
-        try:
-            await self.client.insert_preceding_subsection(section_id, to_section_id=to_parent_id, at_index=to_index)
+            await self.client.move_subsection(section_id, to_parent_id, 'preceding_subsections', at_index=to_index)
         except ClientError:
             raise FailedUpdateError(query='move_subsection_as_preceding')
 
@@ -913,11 +1236,7 @@ class MongoDBInterface(AbstractDBInterface):
         if await self._section_is_ancestor_of_candidate(section_id, to_parent_id):
             raise BadValueError(query='move_subsection_as_inner', value=to_parent_id)
         try:
-            await self.client.remove_section_from_parent(section_id)
-        except ClientError:
-            raise FailedUpdateError(query='move_subsection_as_inner')
-        try:
-            await self.client.insert_inner_subsection(section_id, to_section_id=to_parent_id, at_index=to_index)
+            await self.client.move_subsection(section_id, to_parent_id, 'inner_subsections', at_index=to_index)
         except ClientError:
             raise FailedUpdateError(query='move_subsection_as_inner')
 
@@ -925,27 +1244,19 @@ class MongoDBInterface(AbstractDBInterface):
         if await self._section_is_ancestor_of_candidate(section_id, to_parent_id):
             raise BadValueError(query='move_subsection_as_succeeding', value=to_parent_id)
         try:
-            await self.client.remove_section_from_parent(section_id)
-        except ClientError:
-            raise FailedUpdateError(query='move_subsection_as_succeeding')
-        try:
-            await self.client.insert_succeeding_subsection(section_id, to_section_id=to_parent_id, at_index=to_index)
+            await self.client.move_subsection(section_id, to_parent_id, 'succeeding_subsections', at_index=to_index)
         except ClientError:
             raise FailedUpdateError(query='move_subsection_as_succeeding')
 
     async def _section_is_ancestor_of_candidate(self, section_id, candidate_section_id):
         if section_id == candidate_section_id:
             return True
+        # Walk up from the candidate along the parent IDs, which is only as deep as the tree.
         try:
-            section = await self.client.get_section(section_id)
+            ancestor_ids = await self.client.get_section_ancestor_ids(candidate_section_id)
         except ClientError:
-            raise BadValueError(query='_section_is_ancestor_of_candidate', value=section_id)
-        for subsection_id in chain(section['preceding_subsections'],
-                                   section['inner_subsections'],
-                                   section['succeeding_subsections']):
-            if await self._section_is_ancestor_of_candidate(subsection_id, candidate_section_id):
-                return True
-        return False
+            raise BadValueError(query='_section_is_ancestor_of_candidate', value=candidate_section_id)
+        return section_id in ancestor_ids
 
     ###########################################################################
     #
@@ -953,24 +1264,29 @@ class MongoDBInterface(AbstractDBInterface):
     #
     ###########################################################################
 
-    async def create_wiki(self, user_id, title, summary):
+    async def create_wiki(self, user_id, title, summary, template=None):
         user = await self.get_user_preferences(user_id)
         user_description = self._build_user_description(user_id, user['name'], 'owner')
-        segment_id = await self.create_segment(title)
+        # The root segment and the segments of the template are built here and written with a single insert.
+        segment_id = ObjectId()
+        template = self.DEFAULT_WIKI_TEMPLATE if template is None else template
+        await self.client.create_segments(self._build_wiki_segments(segment_id, title, None, [], template, []))
         wiki_id = await self.client.create_wiki(title, user_description, summary, segment_id)
         await self._add_wiki_id_to_user(user_id, wiki_id)
-        await self._create_default_wiki_setup(wiki_id, segment_id)
         return wiki_id
 
-    async def _create_default_wiki_setup(self, wiki_id, segment_id):
-        characters_segment_id = await self.add_child_segment(wiki_id, "Characters", segment_id)
-        await self.add_template_heading("Biography", characters_segment_id)
-        locations_segment_id = await self.add_child_segment(wiki_id, "Locations", segment_id)
-        await self.add_template_heading("History", locations_segment_id)
-        events_segment_id = await self.add_child_segment(wiki_id, "Events", segment_id)
-        await self.add_template_heading("Summary", events_segment_id)
-        await self.add_template_heading("Background", events_segment_id)
-        await self.add_template_heading("Timeline", events_segment_id)
+    @classmethod
+    def _build_wiki_segments(cls, segment_id, title, parent_id, template_headings, template, segments):
+        child_segment_ids = [ObjectId() for _ in template]
+        segments.append((segment_id, title, parent_id, child_segment_ids, template_headings))
+        for child_segment_id, child_template in zip(child_segment_ids, template):
+            child_template_headings = list(template_headings)
+            for heading_title in child_template.get('template_headings', []):
+                if heading_title not in child_template_headings:
+                    child_template_headings.append(heading_title)
+            cls._build_wiki_segments(child_segment_id, child_template['title'], segment_id, child_template_headings,
+                                     child_template.get('segments', []), segments)
+        return segments
 
     async def create_segment(self, title):
         inserted_id = await self.client.create_segment(title)
@@ -978,7 +1294,10 @@ class MongoDBInterface(AbstractDBInterface):
 
     async def create_page(self, wiki_id, title, in_parent_segment):
         # Create the page and include the `template_headings` from the parent
-        parent_segment = await self.get_segment(in_parent_segment)
+        try:
+            parent_segment = await self.client.get_segment(in_parent_segment, {'template_headings': 1})
+        except ClientError:
+            raise BadValueError(query='get_segment', value=in_parent_segment)
         template_headings = parent_segment['template_headings']
         page_id = await self.client.create_page(title, template_headings)
         # Create an alias for the page with the title as the alias name
@@ -993,7 +1312,7 @@ class MongoDBInterface(AbstractDBInterface):
 
     async def add_child_segment(self, wiki_id, title, parent_id):
         try:
-            parent_segment = await self.client.get_segment(parent_id)
+            parent_segment = await self.client.get_segment(parent_id, {'template_headings': 1})
         except ClientError:
             raise BadValueError(query='add_child_segment', value='parent_id')
         template_headings = parent_segment['template_headings']
@@ -1050,9 +1369,9 @@ class MongoDBInterface(AbstractDBInterface):
         await self._add_user_description_to_wiki(user_description, wiki_id, index=None)
         return user_id, user['name']
 
-    async def get_wiki(self, wiki_id):
+    async def get_wiki(self, wiki_id, projection=None):
         try:
-            wiki = await self.client.get_wiki(wiki_id)
+            wiki = await self.client.get_wiki(wiki_id, projection)
         except ClientError:
             raise BadValueError(query='get_wiki', value=wiki_id)
         else:
@@ -1060,7 +1379,7 @@ class MongoDBInterface(AbstractDBInterface):
 
     async def get_wiki_alias_list(self, wiki_id):
         try:
-            wiki = await self.get_wiki(wiki_id)
+            wiki = await self.get_wiki(wiki_id, {'segment_id': 1})
         except ClientError:
             raise BadValueError(query='get_wiki_alias_list', value=wiki_id)
         segment_id = wiki['segment_id']
@@ -1068,7 +1387,7 @@ class MongoDBInterface(AbstractDBInterface):
 
     async def _get_segment_alias_list(self, segment_id):
         try:
-            segment = await self.client.get_segment(segment_id)
+            segment = await self.client.get_segment(segment_id, {'pages': 1, 'segments': 1})
         except ClientError:
             raise BadValueError(query='_get_segment_alias_lis', value=segment_id)
         # Get all the alias information for the pages at the current level.
@@ -1083,7 +1402,7 @@ class MongoDBInterface(AbstractDBInterface):
         return segment_alias_list
 
     async def _get_page_alias_list(self, page_id):
-        page = await self._get_page(page_id)
+        page = await self._get_page(page_id, {'aliases': 1})
         alias_list = []
         for alias_name, alias_id in page['aliases'].items():
             try:
@@ -1109,78 +1428,100 @@ class MongoDBInterface(AbstractDBInterface):
         return passive_link_object
 
     async def get_wiki_hierarchy(self, wiki_id):
-        wiki = await self.get_wiki(wiki_id)
+        wiki = await self.get_wiki(wiki_id, {'segment_id': 1})
         segment_id = wiki['segment_id']
         return await self.get_segment_hierarchy(segment_id)
 
     async def get_segment_hierarchy(self, segment_id):
+        """
+        Load the segment's whole subtree with one query and the titles of all of its pages with another, then
+        assemble the nested hierarchy from them.
+        """
         try:
-            segment = await self.client.get_segment(segment_id)
+            segments = await self.client.get_segment_subtree(segment_id, ['title', 'segments', 'pages'])
         except ClientError:
             raise BadValueError(query='get_segment_hierarchy', value=segment_id)
-        hierarchy = {
-            'title':      segment['title'],
-            'segment_id': segment_id,
-            'segments':   [],
-            'pages':      [],
-        }
-        segments = hierarchy['segments']
-        pages = hierarchy['pages']
-        # Iterate through the segments, popping out the `links` field and inserting them into the top-level `links`.
-        for segment_id in segment['segments']:
-            inner_segment = await self.get_segment_hierarchy(segment_id)
-            segments.append(inner_segment)
-        # Iterate through the pages, pulling the links from the aliases inside of each.
-        for page_id in segment['pages']:
-            page = await self.get_page_summary(page_id)
-            pages.append(page)
-        return hierarchy
+        page_ids = list(chain.from_iterable(segment['pages'] for segment in segments.values()))
+        pages = await self._get_documents_by_id('_get_page', self.client.get_pages, page_ids, {'title': 1})
+
+        def build_hierarchy(hierarchy_segment_id):
+            segment = segments.get(hierarchy_segment_id)
+            if segment is None:
+                raise BadValueError(query='get_segment_hierarchy', value=hierarchy_segment_id)
+            return {
+                'title':      segment['title'],
+                'segment_id': hierarchy_segment_id,
+                'segments':   [build_hierarchy(child_id) for child_id in segment['segments']],
+                'pages':      [self._page_summary(pages[page_id]) for page_id in segment['pages']],
+            }
+        return build_hierarchy(segment_id)
 
     async def get_segment(self, segment_id):
         try:
             segment = await self.client.get_segment(segment_id)
         except ClientError:
             raise BadValueError(query='get_segment', value=segment_id)
-        segment['segments'] = [await self.get_segment_summary(child_id) for child_id in segment['segments']]
-        segment['pages'] = [await self.get_page_summary(page_id) for page_id in segment['pages']]
+        child_segments, pages = await self.gather([
+            self._get_documents_by_id('get_segment_summary', self.client.get_segments, segment['segments'],
+                                      {'title': 1}),
+            self._get_documents_by_id('_get_page', self.client.get_pages, segment['pages'], {'title': 1}),
+        ])
+        segment['segments'] = [self._segment_summary(child_segments[child_id]) for child_id in segment['segments']]
+        segment['pages'] = [self._page_summary(pages[page_id]) for page_id in segment['pages']]
         return segment
 
     async def get_segment_summary(self, segment_id):
         try:
-            segment = await self.client.get_segment(segment_id)
+            segment = await self.client.get_segment(segment_id, {'title': 1})
         except ClientError:
             raise BadValueError(query='get_segment_summary', value=segment_id)
         else:
-            return {
-                'segment_id': segment_id,
-                'title':      segment['title'],
-            }
+            return self._segment_summary(segment)
+
+    @staticmethod
+    def _segment_summary(segment):
+        return {
+            'segment_id': segment['_id'],
+            'title':      segment['title'],
+        }
 
-    async def get_page_for_frontend(self, page_id):
+    async def get_page_for_frontend(self, page_id, references_offset=None, references_limit=None):
+        for value in (references_offset, references_limit):
+            if value is not None and (not isinstance(value, int) or value < 0):
+                raise BadValueError(query='get_page_for_frontend', value=value)
         page = await self._get_page(page_id)
+        try:
+            page['references'] = await self.client.get_page_references(page_id, references_offset, references_limit)
+            page['reference_count'] = await self.client.get_page_reference_count(page_id)
+        except ClientError:
+            raise BadValueError(query='get_page_for_frontend', value=page_id)
         for reference in page['references']:
             # Take the context from inside the reference and push it to the next level up.
             reference.update(reference.pop('context'))
         return page
 
-    async def _get_page(self, page_id):
+    async def _get_page(self, page_id, projection=None):
         try:
-            page = await self.client.get_page(page_id)
+            page = await self.client.get_page(page_id, projection)
         except ClientError:
             raise BadValueError(query='_get_page', value=page_id)
         else:
             return page
 
     async def get_page_summary(self, page_id):
-        page = await self._get_page(page_id)
+        page = await self._get_page(page_id, {'title': 1})
+        return self._page_summary(page)
+
+    @staticmethod
+    def _page_summary(page):
         return {
-            'page_id':   page_id,
+            'page_id':   page['_id'],
             'title':     page['title'],
         }
 
     async def set_wiki_title(self, title, wiki_id):
         try:
-            wiki = await self.client.get_wiki(wiki_id)
+            wiki = await self.client.get_wiki(wiki_id, {'segment_id': 1})
         except ClientError:
             raise BadValueError(query='set_wiki_title', value=wiki_id)
         try:
@@ -1211,7 +1552,7 @@ class MongoDBInterface(AbstractDBInterface):
             raise FailedUpdateError(query='set_template_heading_text')
 
     async def set_page_title(self, wiki_id, new_title, page_id):
-        page = await self._get_page(page_id)
+        page = await self._get_page(page_id, {'title': 1, 'aliases': 1})
         old_title = page['title']
         alias_id = page['aliases'][old_title]
         # It's important that we change the page title before renaming the alias
@@ -1246,9 +1587,13 @@ class MongoDBInterface(AbstractDBInterface):
             raise FailedUpdateError(query='set_heading_text')
 
     async def delete_wiki(self, user_id, wiki_id):
+        """
+        Give each story using the wiki a new wiki of its own, then delete the wiki and return the ID of its root
+        segment. The segments themselves are left for `delete_wiki_segments`.
+        """
         # TODO: Is this the best way to handle this? Should all stories use one new wiki? Should this be an option?
         try:
-            wiki = await self.client.get_wiki(wiki_id)
+            wiki = await self.client.get_wiki(wiki_id, {'segment_id': 1, 'users': 1})
         except ClientError:
             raise BadValueError(query='delete_wiki', value=wiki_id)
         # Verify this user is allowed to delete this wiki (they are an owner).
@@ -1259,27 +1604,74 @@ class MongoDBInterface(AbstractDBInterface):
             story_summaries = await self.client.get_summaries_of_stories_using_wiki(wiki_id)
         except ClientError:
             raise BadValueError(query='delete_wiki', value=wiki_id)
-        for summary in story_summaries:
-            story_id = summary['_id']
-            title = summary['title']
-            wiki_title = f"{title} Wiki"
-            wiki_summary = f"A wiki for {title}."
-            # Create the new wiki and set it for the story.
-            new_wiki_id = await self.create_wiki(user_id, wiki_title, wiki_summary)
-            try:
-                await self.client.set_story_wiki(story_id, new_wiki_id)
-            except ClientError:
-                raise FailedUpdateError(query='delete_wiki')
-        # Recursively delete all segments in the wiki.
-        segment_id = wiki['segment_id']
-        deleted_link_ids, deleted_passive_link_ids, deleted_alias_ids = await self.delete_segment(wiki_id, segment_id)
-        # Delete the wiki proper.
+        new_wiki_ids = []
+        for start in range(0, len(story_summaries), self.REPLACEMENT_WIKI_CONCURRENCY):
+            new_wiki_ids.extend(await self.gather([
+                self.create_wiki(user_id, f"{summary['title']} Wiki", f"A wiki for {summary['title']}.")
+                for summary in story_summaries[start:start + self.REPLACEMENT_WIKI_CONCURRENCY]
+            ]))
+        try:
+            await self.client.set_stories_wikis({
+                summary['_id']: new_wiki_id for summary, new_wiki_id in zip(story_summaries, new_wiki_ids)
+            })
+        except ClientError:
+            raise FailedUpdateError(query='delete_wiki')
+        # Delete the wiki proper, which also removes it from its users.
         try:
             await self.client.delete_wiki(wiki_id)
         except ClientError:
             raise FailedUpdateError(query='delete_wiki')
         else:
-            return deleted_link_ids, deleted_passive_link_ids, deleted_alias_ids
+            return wiki['segment_id']
+
+    async def delete_wiki_segments(self, wiki_id, segment_id):
+        """
+        Delete the segments of a deleted wiki one at a time, each after the segments below it. After each segment, yield
+        the number deleted so far, the total number, and the IDs of the links, passive links, and aliases removed with
+        it.
+
+        The segments and pages already deleted by an earlier call that was interrupted are skipped, so the deletion can
+        be carried on by calling this again.
+        """
+        try:
+            subtree = await self.client.get_segment_subtree(segment_id, ['segments', 'pages'])
+        except ClientError:
+            # The root segment is deleted last, so there is nothing left to delete.
+            return
+        try:
+            remaining_pages = await self.client.get_pages(
+                list(chain.from_iterable(segment['pages'] for segment in subtree.values())), {'_id': 1})
+        except ClientError:
+            raise BadValueError(query='delete_wiki_segments', value=segment_id)
+        remaining_page_ids = {page['_id'] for page in remaining_pages}
+
+        def post_order(current_segment_id):
+            for subsegment_id in subtree[current_segment_id]['segments']:
+                # A deleted segment is left in the list of its parent, which is deleted after it.
+                if subsegment_id in subtree:
+                    yield from post_order(subsegment_id)
+            yield current_segment_id
+
+        for segments_deleted, current_segment_id in enumerate(post_order(segment_id), 1):
+            deleted_link_ids = []
+            deleted_passive_link_ids = []
+            deleted_alias_ids = []
+            for page_id in subtree[current_segment_id]['pages']:
+                if page_id not in remaining_page_ids:
+                    continue
+                (
+                    page_deleted_link_ids,
+                    page_deleted_passive_link_ids,
+                    page_deleted_alias_ids
+                ) = await self.delete_page(wiki_id, page_id)
+                deleted_link_ids.extend(page_deleted_link_ids)
+                deleted_passive_link_ids.extend(page_deleted_passive_link_ids)
+                deleted_alias_ids.extend(page_deleted_alias_ids.values())
+            try:
+                await self.client.delete_segment(current_segment_id)
+            except ClientError:
+                raise FailedUpdateError(query='delete_wiki_segments')
+            yield segments_deleted, len(subtree), deleted_link_ids, deleted_passive_link_ids, deleted_alias_ids
 
     async def delete_segment(self, wiki_id, segment_id):
         (
@@ -1291,7 +1683,7 @@ class MongoDBInterface(AbstractDBInterface):
 
     async def _recur_delete_segment_and_subsegments(self, wiki_id, segment_id):
         try:
-            segment = await self.client.get_segment(segment_id)
+            segment = await self.client.get_segment(segment_id, {'segments': 1, 'pages': 1})
         except ClientError:
             raise BadValueError(query='recur_delete_segment_and_subsegments', value=segment_id)
         deleted_link_ids = []
@@ -1314,7 +1706,7 @@ class MongoDBInterface(AbstractDBInterface):
             ) = await self.delete_page(wiki_id, page_id)
             deleted_link_ids.extend(page_deleted_link_ids)
             deleted_passive_link_ids.extend(page_deleted_passive_link_ids)
-            deleted_alias_ids.extend(page_deleted_link_ids)
+            deleted_alias_ids.extend(page_deleted_alias_ids.values())
         try:
             await self.client.delete_segment(segment_id)
         except ClientError:
@@ -1329,14 +1721,9 @@ class MongoDBInterface(AbstractDBInterface):
             raise BadValueError(query='delete_template_heading', value=title)
 
     async def delete_page(self, wiki_id, page_id):
-        page = await self._get_page(page_id)
-        deleted_link_ids = []
-        deleted_passive_link_ids = []
-        for alias_id in page['aliases'].values():
-            page_deleted_link_ids, page_deleted_passive_link_ids = await self._delete_alias_no_replace(wiki_id,
-                                                                                                       alias_id)
-            deleted_link_ids.extend(page_deleted_link_ids)
-            deleted_passive_link_ids.extend(page_deleted_passive_link_ids)
+        page = await self._get_page(page_id, {'aliases': 1})
+        alias_ids = list(page['aliases'].values())
+        deleted_link_ids, deleted_passive_link_ids = await self._delete_aliases_no_replace(wiki_id, alias_ids)
         try:
             await self.client.delete_page(page_id)
         except ClientError:
@@ -1352,7 +1739,7 @@ class MongoDBInterface(AbstractDBInterface):
 
     async def remove_wiki_collaborator(self, wiki_id, user_id):
         user = await self._get_user_for_user_id(user_id)
-        wiki = await self.get_wiki(wiki_id)
+        wiki = await self.get_wiki(wiki_id, {'users': 1})
         # Cannot remove the wiki owner from collaborating
         if self._get_current_user_access_level_in_object(user_id, wiki) == 'owner':
             raise BadValueError(query='remove_wiki_collaborator', value=user_id)
@@ -1386,25 +1773,19 @@ class MongoDBInterface(AbstractDBInterface):
         if await self._segment_is_ancestor_of_candidate(segment_id, to_parent_id):
             raise BadValueError(query='move_segment', value=to_parent_id)
         try:
-            await self.client.remove_segment_from_parent(segment_id)
-        except ClientError:
-            raise FailedUpdateError(query='move_segment')
-        try:
-            await self.client.insert_segment_to_parent_segment(segment_id, to_parent_id, to_index)
+            await self.client.move_segment(segment_id, to_parent_id, at_index=to_index)
         except ClientError:
             raise FailedUpdateError(query='move_segment')
 
     async def _segment_is_ancestor_of_candidate(self, segment_id, candidate_segment_id):
         if segment_id == candidate_segment_id:
             return True
+        # Walk up from the candidate along the parent IDs, which is only as deep as the tree.
         try:
-            segment = await self.client.get_segment(segment_id)
+            ancestor_ids = await self.client.get_segment_ancestor_ids(candidate_segment_id)
         except ClientError:
-            raise BadValueError(query='_segment_is_ancestor_of_candidate', value=segment_id)
-        for subsegment_id in segment['segments']:
-            if await self._segment_is_ancestor_of_candidate(subsegment_id, candidate_segment_id):
-                return True
-        return False
+            raise BadValueError(query='_segment_is_ancestor_of_candidate', value=candidate_segment_id)
+        return segment_id in ancestor_ids
 
     async def move_template_heading(self, segment_id, template_heading_title, to_index):
         try:
@@ -1463,6 +1844,54 @@ class MongoDBInterface(AbstractDBInterface):
         else:
             return link_id, alias_id, alias_was_created
 
+    async def create_links(self, section_id: ObjectId, paragraph_id: ObjectId,
+                           links: List[Tuple[ObjectId, ObjectId, str]]) -> List[Tuple[ObjectId, ObjectId, bool]]:
+        """
+        Create the `(story_id, page_id, name)` links found in one paragraph, returning a
+        `(link_id, alias_id, alias_was_created)` tuple for each in the same order.
+
+        This gives the same result as calling `create_link` for each in turn, but it looks up each page's aliases once
+        and writes the new aliases, links, and references with one bulk operation each.
+        """
+        if not links:
+            return []
+        try:
+            aliases_by_page = await self.client.get_aliases_in_pages(list({page_id for _, page_id, _ in links}))
+        except ClientError:
+            raise FailedUpdateError(query='create_links')
+        new_aliases = []  # (alias_id, name, page_id)
+        new_aliases_by_page = defaultdict(dict)
+        new_links = []  # (link_id, alias_id, page_id, story_id)
+        link_ids_by_alias = defaultdict(list)
+        references_by_page = defaultdict(list)
+        results = []
+        for story_id, page_id, name in links:
+            page_aliases = aliases_by_page[page_id]
+            alias_id = page_aliases.get(name)
+            alias_was_created = alias_id is None
+            if alias_was_created:
+                alias_id = ObjectId()
+                # Later links with the same name find this alias, just as they would have in the database.
+                page_aliases[name] = alias_id
+                new_aliases.append((alias_id, name, page_id))
+                new_aliases_by_page[page_id][name] = alias_id
+            link_id = ObjectId()
+            new_links.append((link_id, alias_id, page_id, story_id))
+            link_ids_by_alias[alias_id].append(link_id)
+            references_by_page[page_id].append((link_id, story_id))
+            results.append((link_id, alias_id, alias_was_created))
+        try:
+            if new_aliases:
+                self._invalidate_alias_indexes()
+                await self.client.create_aliases(new_aliases)
+                await self.client.insert_aliases_to_pages(new_aliases_by_page)
+            await self.client.create_links(new_links, section_id, paragraph_id)
+            await self.client.insert_links_to_aliases(link_ids_by_alias)
+            await self.client.insert_references_to_pages(references_by_page, section_id, paragraph_id)
+        except ClientError:
+            raise FailedUpdateError(query='create_links')
+        return results
+
     async def get_link(self, link_id):
         try:
             link = await self.client.get_link(link_id)
@@ -1473,6 +1902,7 @@ class MongoDBInterface(AbstractDBInterface):
 
     async def delete_link(self, link_id):
         link = await self.get_link(link_id)
+        self._invalidate_link_resolution_caches()
         alias_id = link['alias_id']
         page_id = link['page_id']
         try:
@@ -1487,18 +1917,31 @@ class MongoDBInterface(AbstractDBInterface):
             await self.client.delete_link(link_id)
         except ClientError:
             raise FailedUpdateError(query='delete_link')
-
-    async def _comprehensive_remove_link(self, wiki_id: ObjectId, link_id: ObjectId, replacement_text: str):
-        link = await self.get_link(link_id)
-        context = link['context']
-        try:
-            text = await self.client.get_paragraph_text(context['section_id'], context['paragraph_id'])
-        except ClientError:
-            raise BadValueError(query='comprehensive_remove_link', value=link_id)
-        encoded_link_id = self.encode_object_id(link_id)
-        updated_text = text.replace(encoded_link_id, replacement_text)
-        await self._set_paragraph_text(context['section_id'], updated_text, context['paragraph_id'])
-        await self.delete_link(link_id)
+        self._invalidate_link_resolution_caches()
+
+    async def _delete_links(self, links: Iterable[Dict]):
+        """
+        Remove the given link documents from their aliases, with one update per alias, and delete them and their page
+        references at once.
+        """
+        link_ids = []
+        link_ids_by_alias = defaultdict(list)
+        link_ids_by_page = defaultdict(list)
+        for link in links:
+            link_ids.append(link['_id'])
+            link_ids_by_alias[link['alias_id']].append(link['_id'])
+            link_ids_by_page[link['page_id']].append(link['_id'])
+        if not link_ids:
+            return
+        self._invalidate_link_resolution_caches()
+        try:
+            for alias_id, alias_link_ids in link_ids_by_alias.items():
+                await self.client.remove_links_from_alias(alias_link_ids, alias_id)
+            await self.client.remove_references_from_pages(link_ids_by_page)
+            await self.client.delete_links(link_ids)
+        except ClientError:
+            raise FailedUpdateError(query='delete_links')
+        self._invalidate_link_resolution_caches()
 
     ###########################################################################
     #
@@ -1516,6 +1959,23 @@ class MongoDBInterface(AbstractDBInterface):
         else:
             return passive_link_id
 
+    async def create_passive_links(self, section_id: ObjectId, paragraph_id: ObjectId,
+                                   passive_links: List[Tuple[ObjectId, ObjectId, ObjectId]]):
+        """
+        Store the `(passive_link_id, alias_id, page_id)` passive links found in one paragraph with a single insert,
+        then add them to their aliases with one update per alias in a single bulk write.
+        """
+        if not passive_links:
+            return
+        passive_link_ids_by_alias = defaultdict(list)
+        for passive_link_id, alias_id, _ in passive_links:
+            passive_link_ids_by_alias[alias_id].append(passive_link_id)
+        try:
+            await self.client.create_passive_links(passive_links, section_id, paragraph_id)
+            await self.client.insert_passive_links_to_aliases(passive_link_ids_by_alias)
+        except ClientError:
+            raise FailedUpdateError(query='create_passive_links')
+
     async def get_passive_link(self, passive_link_id: ObjectId):
         try:
             passive_link = await self.client.get_passive_link(passive_link_id)
@@ -1525,19 +1985,72 @@ class MongoDBInterface(AbstractDBInterface):
             return passive_link
 
     async def approve_passive_link(self, passive_link_id: ObjectId, story_id: ObjectId, wiki_id: ObjectId):
-        passive_link = await self.get_passive_link(passive_link_id)
-        section_id = passive_link['context']['section_id']
-        paragraph_id = passive_link['context']['paragraph_id']
-        alias_id = passive_link['alias_id']
-        page_id = passive_link['page_id']
-        alias = await self.get_alias(alias_id)
-        alias_name = alias['name']
-        create_link_encoding = generate_create_link_encoding(story_id, page_id, alias_name)
-        links_created = await self._approve_and_remove_passive_link(wiki_id, passive_link_id, create_link_encoding)
-        if len(links_created) != 1:
-            raise FailedUpdateError(query='approve_passive_link')
-        paragraph_text = await self.client.get_paragraph_text(section_id, paragraph_id)
-        return passive_link_id, section_id, paragraph_id, links_created[0], paragraph_text
+        approved_links, paragraphs = await self.approve_passive_links([passive_link_id], story_id, wiki_id)
+        if not approved_links:
+            raise BadValueError(query='approve_passive_link', value=passive_link_id)
+        (_, link_id, alias_id), = approved_links
+        (section_id, paragraph_id, paragraph_text), = paragraphs
+        return passive_link_id, section_id, paragraph_id, (link_id, alias_id), paragraph_text
+
+    async def approve_passive_links(self, passive_link_ids: List[ObjectId], story_id: ObjectId, wiki_id: ObjectId):
+        """
+        Turn each passive link into a link to its page. All of the approvals in a paragraph are made with one rewrite
+        of its text, which is then processed once.
+
+        Returns the `(passive_link_id, link_id, alias_id)` of each approval, in the order given, and the
+        `(section_id, paragraph_id, text)` of each paragraph that was rewritten.
+
+        Passive links that are already gone are skipped, as are those no longer in their paragraph's text, which are
+        deleted. Both are left by an approval that was interrupted, which can be finished by calling this again.
+        """
+        passive_link_ids = list(dict.fromkeys(passive_link_ids))
+        passive_links = await self._get_documents_by_id('get_passive_link', self.client.get_passive_links,
+                                                        passive_link_ids, None, missing_ok=True)
+        alias_ids = list({passive_link['alias_id'] for passive_link in passive_links.values()})
+        aliases = await self._get_documents_by_id('get_alias', self.client.get_aliases, alias_ids, {'name': 1})
+        passive_links_by_paragraph = defaultdict(list)
+        for passive_link in passive_links.values():
+            context = passive_link['context']
+            passive_links_by_paragraph[(context['section_id'], context['paragraph_id'])].append(passive_link)
+        created_links = {}
+        paragraphs = []
+        for (section_id, paragraph_id), paragraph_passive_links in passive_links_by_paragraph.items():
+            try:
+                text = await self.client.get_paragraph_text(section_id, paragraph_id)
+            except ClientError:
+                raise BadValueError(query='approve_passive_links', value=paragraph_passive_links[0]['_id'])
+            paragraph_passive_links_by_id = {passive_link['_id']: passive_link
+                                             for passive_link in paragraph_passive_links}
+            # One scan of the text finds the passive links still in it and rewrites them. Links are created in the
+            # order they appear in the text, which is how they are matched to their approvals.
+            pending_passive_links = {}
+            buffer = []
+            prev_end = 0
+            for start, end, _id in self.find_link_ids(text):
+                passive_link = paragraph_passive_links_by_id.get(_id)
+                if passive_link is None:
+                    continue
+                pending_passive_links.setdefault(_id, passive_link)
+                alias_name = aliases[passive_link['alias_id']]['name']
+                buffer.append(text[prev_end:start])
+                buffer.append(generate_create_link_encoding(story_id, passive_link['page_id'], alias_name))
+                prev_end = end
+            if pending_passive_links:
+                buffer.append(text[prev_end:])
+                text = ''.join(buffer)
+                pending_passive_links = list(pending_passive_links.values())
+                text, links_created, _, _ = await self.set_paragraph_text(wiki_id, section_id, text, paragraph_id)
+                if len(links_created) != len(pending_passive_links):
+                    raise FailedUpdateError(query='approve_passive_links')
+                for passive_link, created_link in zip(pending_passive_links, links_created):
+                    created_links[passive_link['_id']] = created_link
+            # The paragraph's passive links are deleted as soon as its text no longer holds them, so that a failure in a
+            # later paragraph does not leave them behind.
+            await self._delete_passive_links(paragraph_passive_links)
+            paragraphs.append((section_id, paragraph_id, text))
+        approved_links = [(passive_link_id, *created_links[passive_link_id])
+                          for passive_link_id in passive_link_ids if passive_link_id in created_links]
+        return approved_links, paragraphs
 
     async def reject_passive_link(self, passive_link_id: ObjectId):
         try:
@@ -1545,8 +2058,15 @@ class MongoDBInterface(AbstractDBInterface):
         except ClientError:
             raise FailedUpdateError(query='reject_passive_link')
 
+    async def reject_passive_links(self, passive_link_ids: List[ObjectId]):
+        try:
+            await self.client.reject_passive_links(passive_link_ids)
+        except ClientError:
+            raise FailedUpdateError(query='reject_passive_links')
+
     async def delete_passive_link(self, passive_link_id: ObjectId):
         passive_link = await self.get_passive_link(passive_link_id)
+        self._invalidate_link_resolution_caches()
         alias_id = passive_link['alias_id']
         try:
             await self.client.remove_passive_link_from_alias(passive_link_id, alias_id)
@@ -1556,31 +2076,58 @@ class MongoDBInterface(AbstractDBInterface):
             await self.client.delete_passive_link(passive_link_id)
         except ClientError:
             raise FailedUpdateError(query='delete_passive_link')
-
-    async def _get_text_with_passive_link_replaced_for_removal(self, passive_link_id: ObjectId, replacement_text: str):
-        passive_link = await self.get_passive_link(passive_link_id)
-        context = passive_link['context']
-        try:
-            text = await self.client.get_paragraph_text(context['section_id'], context['paragraph_id'])
-        except ClientError:
-            raise BadValueError(query='comprehensive_remove_passive_link', value=passive_link_id)
-        encoded_passive_link_id = self.encode_object_id(passive_link_id)
-        updated_text = text.replace(encoded_passive_link_id, replacement_text)
-        return context['section_id'], context['paragraph_id'], updated_text
-
-    async def _comprehensive_remove_passive_link(self, passive_link_id: ObjectId, replacement_text: str):
-        section_id, paragraph_id, text = await self._get_text_with_passive_link_replaced_for_removal(passive_link_id,
-                                                                                                     replacement_text)
-        await self._set_paragraph_text(section_id, text, paragraph_id)
-        await self.delete_passive_link(passive_link_id)
-
-    async def _approve_and_remove_passive_link(self, wiki_id: ObjectId, passive_link_id: ObjectId,
-                                               replacement_text: str):
-        section_id, paragraph_id, text = await self._get_text_with_passive_link_replaced_for_removal(passive_link_id,
-                                                                                                     replacement_text)
-        _, links_created, _, _ = await self.set_paragraph_text(wiki_id, section_id, text, paragraph_id)
-        await self.delete_passive_link(passive_link_id)
-        return links_created
+        self._invalidate_link_resolution_caches()
+
+    async def _comprehensive_remove_passive_links(self, passive_link_ids: List[ObjectId], replacement_text: str):
+        """
+        Replace each passive link in its paragraph's text with `replacement_text` and delete it.
+
+        Each affected paragraph is rewritten once, and the passive links are removed from their aliases and the database
+        in bulk.
+        """
+        if not passive_link_ids:
+            return
+        try:
+            passive_links = await self.client.get_passive_links(passive_link_ids)
+        except ClientError:
+            raise BadValueError(query='get_passive_links', value=passive_link_ids)
+        found_passive_link_ids = {passive_link['_id'] for passive_link in passive_links}
+        for passive_link_id in passive_link_ids:
+            if passive_link_id not in found_passive_link_ids:
+                raise BadValueError(query='get_passive_link', value=passive_link_id)
+        passive_link_ids_by_paragraph = defaultdict(list)
+        for passive_link in passive_links:
+            context = passive_link['context']
+            passive_link_ids_by_paragraph[(context['section_id'], context['paragraph_id'])].append(passive_link['_id'])
+        for (section_id, paragraph_id), paragraph_passive_link_ids in passive_link_ids_by_paragraph.items():
+            try:
+                text = await self.client.get_paragraph_text(section_id, paragraph_id)
+            except ClientError:
+                raise BadValueError(query='comprehensive_remove_passive_link', value=paragraph_passive_link_ids[0])
+            for passive_link_id in paragraph_passive_link_ids:
+                text = text.replace(self.encode_object_id(passive_link_id), replacement_text)
+            await self._set_paragraph_text(section_id, text, paragraph_id)
+        await self._delete_passive_links(passive_links)
+
+    async def _delete_passive_links(self, passive_links: Iterable[Dict]):
+        """
+        Remove the given passive link documents from their aliases, with one update per alias, and delete them at once.
+        """
+        passive_link_ids = []
+        passive_link_ids_by_alias = defaultdict(list)
+        for passive_link in passive_links:
+            passive_link_ids.append(passive_link['_id'])
+            passive_link_ids_by_alias[passive_link['alias_id']].append(passive_link['_id'])
+        if not passive_link_ids:
+            return
+        self._invalidate_link_resolution_caches()
+        try:
+            for alias_id, alias_passive_link_ids in passive_link_ids_by_alias.items():
+                await self.client.remove_passive_links_from_alias(alias_passive_link_ids, alias_id)
+            await self.client.delete_passive_links(passive_link_ids)
+        except ClientError:
+            raise FailedUpdateError(query='delete_passive_links')
+        self._invalidate_link_resolution_caches()
 
     ###########################################################################
     #
@@ -1601,6 +2148,7 @@ class MongoDBInterface(AbstractDBInterface):
         return alias_id, alias_was_created
 
     async def _create_alias(self, page_id: ObjectId, name: str):
+        self._invalidate_alias_indexes()
         alias_id = await self.client.create_alias(name, page_id)
         try:
             await self.client.insert_alias_to_page(page_id, name, alias_id)
@@ -1610,36 +2158,46 @@ class MongoDBInterface(AbstractDBInterface):
             return alias_id
 
     async def change_alias_name(self, wiki_id: ObjectId, alias_id: ObjectId, new_name: str):
+        """
+        Rename the alias, replacing its passive links with its old name, and recreate the page's primary alias if it
+        was the one renamed. The alias keeps its old name until everything else is done, so a rename that was
+        interrupted can be finished by calling this again.
+        """
         # Retrieve alias.
         try:
             alias = await self.client.get_alias(alias_id)
         except ClientError:
             raise BadValueError(query='change_alias_name', value=alias_id)
-        # Update name in alias.
         page_id = alias['page_id']
         old_name = alias['name']
-        page = await self._get_page(page_id)
-        # Prevent users from renaming an alias into an existing one
-        if page['aliases'].get(new_name) is not None:
+        page = await self._get_page(page_id, {'title': 1, 'aliases': 1})
+        # Prevent users from renaming an alias into an existing one. The page already has the new name for this alias
+        # if an earlier rename was interrupted.
+        if new_name == old_name or page['aliases'].get(new_name, alias_id) != alias_id:
             raise BadValueError(query='change_alias_name', value=new_name)
-        try:
-            await self.client.set_alias_name(new_name, alias_id)
-        except ClientError:
-            raise FailedUpdateError(query='change_alias_name')
+        # Delete existing passive links to this alias.
+        await self._comprehensive_remove_passive_links(alias['passive_links'], old_name)
+        self._invalidate_alias_indexes()
+        self._invalidate_link_resolution_caches()
         # Update `aliases` in the appropriate page.
+        if page['aliases'].get(new_name) != alias_id:
+            try:
+                await self.client.update_alias_name_in_page(page_id, old_name, new_name)
+            except ClientError:
+                raise FailedUpdateError(query='change_alias_name')
+            page['aliases'].pop(old_name, None)
+            page['aliases'][new_name] = alias_id
+        # Alias with page title renamed, need to recreate primary alias
+        replacement_alias_info = None
+        if not self._page_has_primary_alias(page):
+            replacement_alias_id = await self._create_alias(page_id, page['title'])
+            replacement_alias_info = (replacement_alias_id, page['title'])
+        # Update name in alias.
         try:
-            await self.client.update_alias_name_in_page(page_id, old_name, new_name)
+            await self.client.set_alias_name(new_name, alias_id)
         except ClientError:
             raise FailedUpdateError(query='change_alias_name')
-        # Delete existing passive links to this alias.
-        for passive_link_id in alias['passive_links']:
-            await self._comprehensive_remove_passive_link(passive_link_id, old_name)
-        # Alias with page title renamed, need to recreate primary alias
-        page = await self._get_page(page_id)
-        replacement_alias_id = None
-        if not self._page_has_primary_alias(page):
-            replacement_alias_id = await self._create_alias(page_id, old_name)
-        replacement_alias_info = None if replacement_alias_id is None else (replacement_alias_id, old_name)
+        self._invalidate_link_resolution_caches()
         # Return the deleted passive link IDs and the new alias ID, if one was created.
         return alias['passive_links'], replacement_alias_info
 
@@ -1656,32 +2214,84 @@ class MongoDBInterface(AbstractDBInterface):
         deleted_link_ids, deleted_passive_link_ids = await self._delete_alias_no_replace(wiki_id, alias_id)
         alias_name = alias['name']
         page_id = alias['page_id']
-        page = await self._get_page(page_id)
+        page = await self._get_page(page_id, {'title': 1, 'aliases': 1})
         # Alias with page title deleted, need to recreate primary alias
         if not self._page_has_primary_alias(page):
             await self._create_alias(page_id, alias_name)
         return deleted_link_ids, deleted_passive_link_ids
 
     async def _delete_alias_no_replace(self, wiki_id: ObjectId, alias_id: ObjectId):
-        alias = await self.get_alias(alias_id)
-        alias_name = alias['name']
-        for link_id in alias['links']:
-            await self._comprehensive_remove_link(wiki_id, link_id, alias_name)
-            await self._replace_object_id_in_references_with_text(link_id, alias_name)
-        for passive_link_id in alias['passive_links']:
-            await self._comprehensive_remove_passive_link(passive_link_id, alias_name)
-            await self._replace_object_id_in_references_with_text(passive_link_id, alias_name)
-        page_id = alias['page_id']
-        try:
-            await self.client.remove_alias_from_page(alias_name, page_id)
-        except ClientError:
-            raise FailedUpdateError(query='_delete_alias_no_replace')
-        try:
-            await self.client.delete_alias(alias_id)
-        except ClientError:
-            raise FailedUpdateError(query='_delete_alias_no_replace')
-        else:
-            return alias['links'], alias['passive_links']
+        return await self._delete_aliases_no_replace(wiki_id, [alias_id])
+
+    async def _delete_aliases_no_replace(self, wiki_id: ObjectId, alias_ids: List[ObjectId]):
+        """
+        Delete the aliases with their links and passive links, replacing each link and passive link with the name of
+        its alias in the paragraphs and page references that contain it. Returns the deleted link and passive link IDs.
+
+        This gives the same result as deleting the aliases one at a time, but every paragraph and reference rewrite is
+        worked out up front and then written with one bulk operation per collection.
+
+        Aliases, links, and passive links that are already gone are skipped, and the aliases are removed from their
+        pages only once they are deleted, so a deletion that was interrupted can be finished by calling this again with
+        the same aliases.
+        """
+        if not alias_ids:
+            return [], []
+        aliases = await self._get_documents_by_id('get_alias', self.client.get_aliases, alias_ids, None,
+                                                  missing_ok=True)
+        aliases = [aliases[alias_id] for alias_id in alias_ids if alias_id in aliases]
+        link_ids = list(chain.from_iterable(alias['links'] for alias in aliases))
+        passive_link_ids = list(chain.from_iterable(alias['passive_links'] for alias in aliases))
+        projection = {'alias_id': 1, 'page_id': 1, 'context.section_id': 1, 'context.paragraph_id': 1}
+        links = await self._get_documents_by_id('get_link', self.client.get_links, link_ids, projection,
+                                                missing_ok=True)
+        passive_links = await self._get_documents_by_id('get_passive_link', self.client.get_passive_links,
+                                                        passive_link_ids, projection, missing_ok=True)
+        link_ids = [link_id for link_id in link_ids if link_id in links]
+        passive_link_ids = [passive_link_id for passive_link_id in passive_link_ids if passive_link_id in passive_links]
+        alias_names = {alias['_id']: alias['name'] for alias in aliases}
+        # Encoded link or passive link ID -> the alias name that replaces it.
+        replacement_texts = {}
+        encoded_ids_by_paragraph = defaultdict(list)
+        for link in chain(links.values(), passive_links.values()):
+            encoded_id = self.encode_object_id(link['_id'])
+            replacement_texts[encoded_id] = alias_names[link['alias_id']]
+            context = link['context']
+            encoded_ids_by_paragraph[(context['section_id'], context['paragraph_id'])].append(encoded_id)
+        link_ids_by_page = defaultdict(list)
+        for link in links.values():
+            link_ids_by_page[link['page_id']].append(link['_id'])
+        alias_names_by_page = defaultdict(list)
+        for alias in aliases:
+            alias_names_by_page[alias['page_id']].append(alias['name'])
+        try:
+            texts = await self.client.get_paragraph_texts(list(encoded_ids_by_paragraph))
+        except ClientError:
+            raise BadValueError(query='_delete_aliases_no_replace', value=alias_ids)
+        updated_texts = []
+        for (section_id, paragraph_id), encoded_ids in encoded_ids_by_paragraph.items():
+            text = texts[paragraph_id]
+            for encoded_id in encoded_ids:
+                text = text.replace(encoded_id, replacement_texts[encoded_id])
+            updated_texts.append((section_id, paragraph_id, text))
+        paragraph_ids = [paragraph_id for _, paragraph_id in encoded_ids_by_paragraph]
+        self._invalidate_alias_indexes()
+        self._invalidate_link_resolution_caches()
+        try:
+            await self.client.set_paragraph_texts(updated_texts)
+            await self.client.remove_references_from_pages(link_ids_by_page)
+            await self._replace_object_ids_in_references_with_text(replacement_texts, paragraph_ids)
+            if link_ids:
+                await self.client.delete_links(link_ids)
+            if passive_link_ids:
+                await self.client.delete_passive_links(passive_link_ids)
+            if aliases:
+                await self.client.delete_aliases([alias['_id'] for alias in aliases])
+            await self.client.remove_aliases_from_pages(alias_names_by_page)
+        except ClientError:
+            raise FailedUpdateError(query='_delete_aliases_no_replace')
+        self._invalidate_link_resolution_caches()
+        return link_ids, passive_link_ids
 
     @staticmethod
     def _page_has_primary_alias(page):
@@ -1689,21 +2299,33 @@ class MongoDBInterface(AbstractDBInterface):
         # Not None if the primary alias exists
         return page['aliases'].get(title) is not None
 
-    async def _replace_object_id_in_references_with_text(self, object_id: ObjectId, text: str):
-        encoded_object_id = self.encode_object_id(object_id)
-        pages = await self._get_pages_with_object_id_in_references(encoded_object_id)
-        for page in pages:
-            for reference in page['references']:
-                reference['context']['text'] = reference['context']['text'].replace(encoded_object_id, text)
-            await self._set_page_references(page['_id'], page['references'])
+    async def _replace_object_ids_in_references_with_text(self, replacement_texts: Dict[str, str],
+                                                          paragraph_ids: List[ObjectId]):
+        """
+        Replace each encoded object ID key of `replacement_texts` with its value in the text of every page reference
+        made from the paragraphs, finding the references with one query and writing them with one bulk write.
 
-    async def _get_pages_with_object_id_in_references(self, encoded_object_id: str):
-        try:
-            pages = await self.client.get_pages_with_object_id_in_references(encoded_object_id)
-        except ClientError:
-            raise BadValueError(query='_get_pages_with_object_id_in_references', value=encoded_object_id)
-        else:
-            return pages
+        Only references from the paragraphs that contain the object IDs are read, since a reference's text is the
+        sentence around its own link.
+        """
+        if not replacement_texts:
+            return
+        references = await self.client.get_references_in_paragraphs(paragraph_ids)
+        encoded_object_id_regex = re.compile('|'.join(map(re.escape, replacement_texts)))
+
+        def replace(match):
+            return replacement_texts[match.group(0)]
+
+        reference_contexts = {}
+        for reference in references:
+            context = reference['context']
+            text = context.get('text')
+            if text is None:
+                continue
+            context['text'], replacements = encoded_object_id_regex.subn(replace, text)
+            if replacements:
+                reference_contexts[reference['link_id']] = context
+        await self.client.set_reference_contexts(reference_contexts)
 
     ###########################################################################
     #
@@ -1713,7 +2335,7 @@ class MongoDBInterface(AbstractDBInterface):
 
     async def get_story_statistics(self, story_id):
         try:
-            story = await self.client.get_story(story_id)
+            story = await self.client.get_story(story_id, {'section_id': 1})
         except ClientError:
             raise BadValueError(query='get_story_statistics', value=story_id)
         stats = await self._recur_get_section_statistics(story['section_id'])
@@ -1721,7 +2343,7 @@ class MongoDBInterface(AbstractDBInterface):
 
     async def _recur_get_section_statistics(self, section_id):
         try:
-            section = await self.client.get_section(section_id)
+            section = await self.client.get_section(section_id, dict(self.SUBSECTIONS_PROJECTION, statistics=1))
         except ClientError:
             raise BadValueError(query='_recur_get_section_statistics', value=section_id)
         word_freqs = Counter(section['statistics']['word_frequency'])
@@ -1755,39 +2377,101 @@ class MongoDBInterface(AbstractDBInterface):
 
     async def get_page_frequencies_in_story(self, story_id, wiki_id):
         try:
-            wiki = await self.client.get_wiki(wiki_id)
+            wiki = await self.client.get_wiki(wiki_id, {'segment_id': 1})
         except ClientError:
             raise BadValueError(query='get_page_frequencies_in_story', value=wiki_id)
-        segment_id = wiki['segment_id']
-        return await self._get_page_section_frequencies(story_id, segment_id)
+        page_ids = await self._get_page_ids_in_segment(wiki['segment_id'])
+        try:
+            section_counts = await self.client.get_reference_section_counts(story_id, page_ids)
+        except ClientError:
+            raise BadValueError(query='get_page_frequencies_in_story', value=story_id)
+        frequencies_by_page = {page_id: {} for page_id in page_ids}
+        for page_id, section_id, count in section_counts:
+            frequencies_by_page[page_id][encode_bson_to_string(section_id)] = count
+        return [{'page_id': page_id, 'section_frequencies': frequencies_by_page[page_id]} for page_id in page_ids]
 
-    async def _get_page_section_frequencies(self, story_id, segment_id):
+    async def _get_page_ids_in_segment(self, segment_id):
         try:
-            segment = await self.client.get_segment(segment_id)
+            segments = await self.client.get_segment_subtree(segment_id, ['segments', 'pages'])
         except ClientError:
-            raise BadValueError(query='_get_page_section_frequencies', value=segment_id)
-        pages = []
-        for page_id in segment['pages']:
-            try:
-                page = await self.get_page_for_frontend(page_id)
-            except ClientError:
-                raise BadValueError(query='_get_page_section_frequencies', value=page_id)
-            frequencies = defaultdict(int)
-            for reference in filter(lambda ref: ref['story_id'] == story_id, page['references']):
-                key = encode_bson_to_string(reference['section_id'])
-                frequencies[key] += 1
-            pages.append({'page_id': page_id, 'section_frequencies': frequencies})
-        for child_segment_id in segment['segments']:
-            child_pages = await self._get_page_section_frequencies(story_id, child_segment_id)
-            pages.extend(child_pages)
-        return pages
+            raise BadValueError(query='_get_page_ids_in_segment', value=segment_id)
+        page_ids = []
+
+        def collect_page_ids(collected_segment_id):
+            segment = segments.get(collected_segment_id)
+            if segment is None:
+                raise BadValueError(query='_get_page_ids_in_segment', value=collected_segment_id)
+            page_ids.extend(segment['pages'])
+            for child_segment_id in segment['segments']:
+                collect_page_ids(child_segment_id)
+        collect_page_ids(segment_id)
+        return page_ids
+
+    ###########################################################################
+    #
+    # Job Methods
+    #
+    ###########################################################################
+
+    async def create_job(self, action, message, user_id, uuid, message_id, story_id=None, wiki_id=None):
+        try:
+            return await self.client.create_job(action, message, user_id, uuid, message_id, story_id, wiki_id)
+        except ClientError:
+            raise FailedUpdateError(query='create_job')
+
+    async def start_job(self, job_id):
+        try:
+            await self.client.set_job_status(job_id, 'running')
+        except ClientError:
+            raise BadValueError(query='start_job', value=job_id)
+
+    async def save_job_progress(self, job_id, progress):
+        try:
+            await self.client.set_job_progress(job_id, progress)
+        except ClientError:
+            raise BadValueError(query='save_job_progress', value=job_id)
+
+    async def fail_job(self, job_id):
+        # Failed jobs are kept for inspection, but are not resumed.
+        try:
+            await self.client.set_job_status(job_id, 'failed')
+        except ClientError:
+            raise BadValueError(query='fail_job', value=job_id)
+
+    async def finish_job(self, job_id):
+        try:
+            await self.client.delete_job(job_id)
+        except ClientError:
+            raise BadValueError(query='finish_job', value=job_id)
+
+    async def get_unfinished_jobs(self):
+        """
+        Return the jobs that were queued or running when the server last stopped, oldest first.
+        """
+        return await self.client.get_jobs_with_statuses(['queued', 'running'])
 
 
 class MongoDBTornadoInterface(MongoDBInterface):
-    def __init__(self, db_name, db_host, db_port, db_user=None, db_pass=None):
-        super().__init__(MongoDBMotorTornadoClient, db_name, db_host, db_port, db_user, db_pass)
+    def __init__(self, db_name, db_host, db_port, db_user=None, db_pass=None, alias_normalizer=None,
+                 document_cache_bytes=0, paragraph_documents=False):
+        # Paragraphs are stored in their own documents when `paragraph_documents` is set; see ParagraphDocumentsMixin.
+        client_class = MongoDBMotorTornadoParagraphsClient if paragraph_documents else MongoDBMotorTornadoClient
+        super().__init__(client_class, db_name, db_host, db_port, db_user, db_pass, alias_normalizer,
+                         document_cache_bytes)
+
+    def gather(self, awaitables):
+        from tornado.gen import multi
+        return multi(awaitables)
 
 
 class MongoDBAsyncioInterface(MongoDBInterface):
-    def __init__(self, db_name, db_host, db_port, db_user=None, db_pass=None):
-        super().__init__(MongoDBMotorAsyncioClient, db_name, db_host, db_port, db_user, db_pass)
+    def __init__(self, db_name, db_host, db_port, db_user=None, db_pass=None, alias_normalizer=None,
+                 document_cache_bytes=0, paragraph_documents=False):
+        # Paragraphs are stored in their own documents when `paragraph_documents` is set; see ParagraphDocumentsMixin.
+        client_class = MongoDBMotorAsyncioParagraphsClient if paragraph_documents else MongoDBMotorAsyncioClient
+        super().__init__(client_class, db_name, db_host, db_port, db_user, db_pass, alias_normalizer,
+                         document_cache_bytes)
+
+    def gather(self, awaitables):
+        from asyncio import gather
+        return gather(*awaitables)
@@ -215,13 +215,17 @@ class AbstractDispatcher(ABC):
         pass
 
     @abstractmethod
-    async def get_wiki_page(self, uuid, message_id, page_id):
+    async def get_wiki_page(self, uuid, message_id, page_id, references_offset=None, references_limit=None):
         pass
 
     @abstractmethod
     async def delete_wiki(self, uuid, message_id, user_id, wiki_id):
         pass
 
+    @abstractmethod
+    async def resume_delete_wiki(self, uuid, message_id, user_id, wiki_id, segment_id):
+        pass
+
     @abstractmethod
     async def delete_segment(self, uuid, message_id, wiki_id, segment_id):
         pass
@@ -282,6 +286,14 @@ class AbstractDispatcher(ABC):
     async def reject_passive_link(self, uuid, message_id, passive_link_id):
         pass
 
+    @abstractmethod
+    async def approve_passive_links(self, uuid, message_id, passive_link_ids, story_id, wiki_id):
+        pass
+
+    @abstractmethod
+    async def reject_passive_links(self, uuid, message_id, passive_link_ids):
+        pass
+
     ###########################################################################
     #
     # Alias Methods
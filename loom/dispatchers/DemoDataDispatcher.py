@@ -1,10 +1,13 @@
-from loom.dispatchers.LAWProtocolDispatcher import LAWProtocolDispatcher
+from loom.dispatchers.LAWProtocolDispatcher import LAWProtocolDispatcher, handle_interface_errors
 from loom.messages.outgoing.demo import AddTextToSectionOutgoingMessage
 
 
 class DemoDataDispatcher(LAWProtocolDispatcher):
-    def __init__(self, interface):
+    def __init__(self, interface, bulk=False):
         super().__init__(interface)
+        # Add each section's text with one bulk write instead of one paragraph at a time.
+        self.bulk = bulk
+        self.paragraphs_added = 0
 
     async def add_heading_with_text(self, uuid, message_id, title, text, page_id):
         # Don't care about the return contents, just force execution
@@ -21,12 +24,17 @@ class DemoDataDispatcher(LAWProtocolDispatcher):
         return
         yield
 
+    @handle_interface_errors
     async def add_text_to_section(self, uuid, message_id, wiki_id, text, section_id):
         paragraphs = text.split('\n\n')
-        for paragraph in paragraphs:
-            # Don't care about the return contents, just force execution
-            async for _ in super().add_paragraph(uuid, message_id, wiki_id, section_id, paragraph):
-                continue
+        if self.bulk:
+            await self.db_interface.add_paragraphs(wiki_id, section_id, paragraphs)
+        else:
+            for paragraph in paragraphs:
+                # Don't care about the return contents, just force execution
+                async for _ in super().add_paragraph(uuid, message_id, wiki_id, section_id, paragraph):
+                    continue
+        self.paragraphs_added += len(paragraphs)
         # Async equivalent to `return None`
         return
         yield
@@ -244,6 +244,27 @@ class LAWProtocolDispatcher(AbstractDispatcher):
                                                section_id=section_id,
                                                update=update,
                                                paragraph_id=paragraph_id)
+        elif update['update_type'] == 'apply_delta':
+            operations = update['operations']
+            (
+                operations,
+                links_created,
+                passive_links_created,
+                aliases_created
+            ) = await self.db_interface.apply_paragraph_delta(wiki_id, section_id, paragraph_id=paragraph_id,
+                                                              operations=operations)
+            for alias_id, page_id, name in aliases_created:
+                yield CreateAliasOutgoingMessage(uuid, message_id, alias_id=alias_id, page_id=page_id, alias_name=name)
+            for link_id, alias_id in links_created:
+                yield CreateLinkOutgoingMessage(uuid, message_id, link_id=link_id, alias_id=alias_id)
+            for passive_link_id, alias_id in passive_links_created:
+                yield CreatePassiveLinkOutgoingMessage(uuid, message_id, passive_link_id=passive_link_id,
+                                                       alias_id=alias_id)
+            update['operations'] = operations
+            yield EditParagraphOutgoingMessage(uuid, message_id,
+                                               section_id=section_id,
+                                               update=update,
+                                               paragraph_id=paragraph_id)
         else:
             raise LAWUnimplementedError("invalid `update_type`: {}".format(update['update_type']))
 
@@ -516,25 +537,60 @@ class LAWProtocolDispatcher(AbstractDispatcher):
                                             template_headings=segment['template_headings'])
 
     @handle_interface_errors
-    async def get_wiki_page(self, uuid, message_id, page_id):
-        page = await self.db_interface.get_page_for_frontend(page_id)
+    async def get_wiki_page(self, uuid, message_id, page_id, references_offset=None, references_limit=None):
+        page = await self.db_interface.get_page_for_frontend(page_id, references_offset, references_limit)
         yield GetWikiPageOutgoingMessage(uuid, message_id,
                                          title=page['title'],
                                          aliases=page['aliases'],
                                          references=page['references'],
+                                         reference_count=page['reference_count'],
                                          headings=page['headings'])
 
     @handle_interface_errors
     async def delete_wiki(self, uuid, message_id, user_id, wiki_id):
-        deleted_link_ids, deleted_passive_link_ids, deleted_alias_ids = await self.db_interface.delete_wiki(user_id,
-                                                                                                            wiki_id)
-        for link_id in deleted_link_ids:
-            yield DeleteLinkOutgoingMessage(uuid, message_id, link_id=link_id)
-        for passive_link_id in deleted_passive_link_ids:
-            yield DeletePassiveLinkOutgoingMessage(uuid, message_id, passive_link_id=passive_link_id)
-        for alias_id in deleted_alias_ids:
-            yield DeleteAliasOutgoingMessage(uuid, message_id, alias_id=alias_id)
+        wiki = await self.db_interface.get_wiki(wiki_id, {'segment_id': 1})
+        # The root segment cannot be found once the wiki is deleted, so it is kept for deleting the segments if the job
+        # is interrupted.
+        yield JobProgress({'segment_id': wiki['segment_id']})
+        segment_id = await self.db_interface.delete_wiki(user_id, wiki_id)
+        yield DeleteWikiOutgoingMessage(uuid, message_id, wiki_id=wiki_id)
+        # The segments can take a while to delete, so they are deleted after the request is acknowledged.
+        yield BackgroundResponses(self._delete_wiki_segments(uuid, message_id, wiki_id, segment_id))
+
+    @handle_interface_errors
+    async def resume_delete_wiki(self, uuid, message_id, user_id, wiki_id, segment_id):
+        try:
+            await self.db_interface.get_wiki(wiki_id, {'_id': 1})
+        except BadValueError:
+            # The wiki was deleted before the job was interrupted, which leaves only its segments.
+            pass
+        else:
+            await self.db_interface.delete_wiki(user_id, wiki_id)
         yield DeleteWikiOutgoingMessage(uuid, message_id, wiki_id=wiki_id)
+        yield BackgroundResponses(self._delete_wiki_segments(uuid, message_id, wiki_id, segment_id))
+
+    async def _delete_wiki_segments(self, uuid, message_id, wiki_id, segment_id):
+        try:
+            async for (
+                segments_deleted,
+                segment_count,
+                deleted_link_ids,
+                deleted_passive_link_ids,
+                deleted_alias_ids
+            ) in self.db_interface.delete_wiki_segments(wiki_id, segment_id):
+                for link_id in deleted_link_ids:
+                    yield DeleteLinkOutgoingMessage(uuid, message_id, link_id=link_id)
+                for passive_link_id in deleted_passive_link_ids:
+                    yield DeletePassiveLinkOutgoingMessage(uuid, message_id, passive_link_id=passive_link_id)
+                for alias_id in deleted_alias_ids:
+                    yield DeleteAliasOutgoingMessage(uuid, message_id, alias_id=alias_id)
+                yield DeleteWikiProgressOutgoingMessage(uuid, message_id,
+                                                        wiki_id=wiki_id,
+                                                        segments_deleted=segments_deleted,
+                                                        segment_count=segment_count)
+        except InterfaceError as e:
+            interface_log.error(f'{e.query}: {e.message}')
+            yield LoomErrorOutgoingMessage(uuid, message_id, action='delete_wiki', reason=e.message)
 
     @handle_interface_errors
     async def delete_segment(self, uuid, message_id, wiki_id, segment_id):
@@ -650,6 +706,26 @@ class LAWProtocolDispatcher(AbstractDispatcher):
         await self.db_interface.reject_passive_link(passive_link_id)
         yield RejectPassiveLinkOutgoingMessage(uuid, message_id, passive_link_id=passive_link_id)
 
+    @handle_interface_errors
+    async def approve_passive_links(self, uuid, message_id, passive_link_ids, story_id, wiki_id):
+        approved_links, paragraphs = await self.db_interface.approve_passive_links(passive_link_ids, story_id, wiki_id)
+        yield ApprovePassiveLinksOutgoingMessage(uuid, message_id,
+                                                 approved_links=[{
+                                                     'passive_link_id': passive_link_id,
+                                                     'link_id':         link_id,
+                                                     'alias_id':        alias_id,
+                                                 } for passive_link_id, link_id, alias_id in approved_links],
+                                                 paragraphs=[{
+                                                     'section_id':   section_id,
+                                                     'paragraph_id': paragraph_id,
+                                                     'text':         text,
+                                                 } for section_id, paragraph_id, text in paragraphs])
+
+    @handle_interface_errors
+    async def reject_passive_links(self, uuid, message_id, passive_link_ids):
+        await self.db_interface.reject_passive_links(passive_link_ids)
+        yield RejectPassiveLinksOutgoingMessage(uuid, message_id, passive_link_ids=passive_link_ids)
+
     ###########################################################################
     #
     # Alias Methods
@@ -0,0 +1,36 @@
+import time
+
+from bson.objectid import ObjectId
+from typing import Dict, Union
+
+
+class LinkResolutionCache:
+    """
+    Recently resolved links, passive links, and alias names for one wiki, used when paragraph text is saved.
+
+    A `None` entry records an ID that is known not to exist in that collection. The whole cache expires `ttl` seconds
+    after it is created, so a change made without going through the interface is never trusted for long. The owner's
+    `generation` when the cache was created is kept, so that the owner can tell whether a change has been made since.
+    """
+    def __init__(self, ttl: float, generation=0, clock=time.monotonic):
+        self._clock = clock
+        self._expires_at = clock() + ttl
+        self.generation = generation
+        self.links: Dict[ObjectId, Union[Dict, None]] = {}
+        self.passive_links: Dict[ObjectId, Union[Dict, None]] = {}
+        self.alias_names: Dict[ObjectId, str] = {}
+
+    @property
+    def expired(self) -> bool:
+        return self._clock() >= self._expires_at
+
+    def set_context(self, link_id: ObjectId, context: Dict):
+        for documents in (self.links, self.passive_links):
+            document = documents.get(link_id)
+            if document is not None:
+                document['context'] = dict(context)
+
+    @staticmethod
+    def copy_document(document: Dict) -> Dict:
+        # Callers update the context in place before saving it, so it must not be shared with the cache.
+        return dict(document, context=dict(document['context']))
@@ -79,6 +79,8 @@ APPROVED_MESSAGES = {
     # Passive Links
     'approve_passive_link':            ApprovePassiveLinkMessage,
     'reject_passive_link':             RejectPassiveLinkMessage,
+    'approve_passive_links':           ApprovePassiveLinksMessage,
+    'reject_passive_links':            RejectPassiveLinksMessage,
 
     # Aliases
     'create_alias':                    CreateAliasIncomingMessage,
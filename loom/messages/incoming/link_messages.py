@@ -28,6 +28,27 @@ class RejectPassiveLinkMessage(IncomingMessage):
         return self._dispatcher.reject_passive_link(self.uuid, self.message_id, self.passive_link_id)
 
 
+class ApprovePassiveLinksMessage(IncomingMessage):
+    def __init__(self):
+        super().__init__()
+        self.passive_link_ids = RequiredField()
+        self.story_id = RequiredField()
+        self.wiki_id = RequiredField()
+
+    def dispatch(self):
+        return self._dispatcher.approve_passive_links(self.uuid, self.message_id, self.passive_link_ids, self.story_id,
+                                                      self.wiki_id)
+
+
+class RejectPassiveLinksMessage(IncomingMessage):
+    def __init__(self):
+        super().__init__()
+        self.passive_link_ids = RequiredField()
+
+    def dispatch(self):
+        return self._dispatcher.reject_passive_links(self.uuid, self.message_id, self.passive_link_ids)
+
+
 ###########################################################################
 #
 # Delete Messages
@@ -189,9 +189,12 @@ class GetWikiPageIncomingMessage(IncomingMessage):
     def __init__(self):
         super().__init__()
         self.page_id = RequiredField()
+        self.references_offset = OptionalField()
+        self.references_limit = OptionalField()
 
     def dispatch(self):
-        return self._dispatcher.get_wiki_page(self.uuid, self.message_id, self.page_id)
+        return self._dispatcher.get_wiki_page(self.uuid, self.message_id, self.page_id, self.references_offset,
+                                              self.references_limit)
 
 
 ###########################################################################
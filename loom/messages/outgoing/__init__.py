@@ -3,6 +3,7 @@ from .outgoing_message import *
 from .OGMEncoder import OGMEncoder
 
 from .alias_messages import *
+from .job_messages import *
 from .link_messages import *
 from .passive_link_messages import *
 from .statistics_messages import *
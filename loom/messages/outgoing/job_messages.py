@@ -0,0 +1,29 @@
+from .outgoing_message import UnicastMessage
+
+from bson import ObjectId
+from uuid import UUID
+
+
+class JobQueuedOutgoingMessage(UnicastMessage):
+    """
+    Acknowledges a long-running request, which will be carried out as a job once a worker is free.
+    """
+    def __init__(self, uuid: UUID, message_id: int, *, job_id: ObjectId, action: str):
+        super().__init__(uuid, message_id, 'job_queued')
+        self.job_id = job_id
+        self.action = action
+
+
+class JobStartedOutgoingMessage(UnicastMessage):
+    def __init__(self, uuid: UUID, message_id: int, *, job_id: ObjectId, action: str):
+        super().__init__(uuid, message_id, 'job_started')
+        self.job_id = job_id
+        self.action = action
+
+
+class JobFinishedOutgoingMessage(UnicastMessage):
+    def __init__(self, uuid: UUID, message_id: int, *, job_id: ObjectId, action: str, succeeded: bool):
+        super().__init__(uuid, message_id, 'job_finished')
+        self.job_id = job_id
+        self.action = action
+        self.succeeded = succeeded
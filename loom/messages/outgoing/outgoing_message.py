@@ -1,4 +1,5 @@
 from bson.objectid import ObjectId
+from typing import AsyncIterator, Dict
 from uuid import UUID
 
 
@@ -39,6 +40,25 @@ class WikiBroadcastMessage(BroadcastMessage):
     pass
 
 
+class BackgroundResponses:
+    """
+    Yielded by a dispatcher in place of a message for work that carries on after the request is acknowledged. The router
+    sends the given `responses` as they are produced, and only then moves on to the next message or finishes the job.
+    """
+    def __init__(self, responses: AsyncIterator[OutgoingMessage]):
+        self.responses = responses
+
+
+class JobProgress:
+    """
+    Yielded by a dispatcher in place of a message to record how far an action has got. When the action is run as a job,
+    the router saves the `progress`, and a job interrupted after that is carried on by the dispatcher's
+    `resume_<action>` method, called with the message's fields and the `progress` entries. Otherwise it is ignored.
+    """
+    def __init__(self, progress: Dict):
+        self.progress = progress
+
+
 class OutgoingErrorMessage(UnicastMessage):
     def __init__(self, uuid: UUID, message_id: int, *, error_message: str):
         super().__init__(uuid, message_id, 'error_occurred')
@@ -1,6 +1,7 @@
 from .outgoing_message import StoryBroadcastMessage
 
 from bson import ObjectId
+from typing import Dict, List
 from uuid import UUID
 
 
@@ -27,6 +28,22 @@ class RejectPassiveLinkOutgoingMessage(StoryBroadcastMessage):
         self.passive_link_id = passive_link_id
 
 
+class ApprovePassiveLinksOutgoingMessage(StoryBroadcastMessage):
+    """
+    Reports a batch of approvals at once: the link each passive link became, and the new text of each paragraph.
+    """
+    def __init__(self, uuid: UUID, message_id: int, *, approved_links: List[Dict], paragraphs: List[Dict]):
+        super().__init__(uuid, message_id, 'passive_links_approved')
+        self.approved_links = approved_links
+        self.paragraphs = paragraphs
+
+
+class RejectPassiveLinksOutgoingMessage(StoryBroadcastMessage):
+    def __init__(self, uuid: UUID, message_id: int, *, passive_link_ids: List[ObjectId]):
+        super().__init__(uuid, message_id, 'passive_links_rejected')
+        self.passive_link_ids = passive_link_ids
+
+
 ###########################################################################
 #
 # Delete Messages
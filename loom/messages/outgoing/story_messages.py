@@ -110,6 +110,16 @@ class EditParagraphOutgoingMessage(StoryBroadcastMessage):
         self.paragraph_id = paragraph_id
 
 
+class EditParagraphCoalescedOutgoingMessage(UnicastMessage):
+    """
+    Acknowledges an `edit_paragraph` that was superseded by a later edit to the same paragraph before it was saved.
+    """
+    def __init__(self, uuid: UUID, message_id: int, *, section_id: ObjectId, paragraph_id: ObjectId):
+        super().__init__(uuid, message_id, 'paragraph_edit_coalesced')
+        self.section_id = section_id
+        self.paragraph_id = paragraph_id
+
+
 class EditSectionTitleOutgoingMessage(StoryBroadcastMessage):
     def __init__(self, uuid: UUID, message_id: int, *, section_id: ObjectId, new_title: str):
         super().__init__(uuid, message_id, 'section_title_updated')
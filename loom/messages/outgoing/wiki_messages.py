@@ -155,11 +155,13 @@ class GetWikiSegmentOutgoingMessage(UnicastMessage):
 
     
 class GetWikiPageOutgoingMessage(UnicastMessage):
-    def __init__(self, uuid: UUID, message_id: int, *, title: str, aliases: dict, references: list, headings: list):
+    def __init__(self, uuid: UUID, message_id: int, *, title: str, aliases: dict, references: list,
+                 reference_count: int, headings: list):
         super().__init__(uuid, message_id, 'got_wiki_page')
         self.title = title
         self.aliases = aliases
         self.references = references
+        self.reference_count = reference_count
         self.headings = headings
 
     
@@ -173,6 +175,17 @@ class DeleteWikiOutgoingMessage(WikiBroadcastMessage):
         super().__init__(uuid, message_id, 'wiki_deleted')
         self.wiki_id = wiki_id
 
+
+class DeleteWikiProgressOutgoingMessage(UnicastMessage):
+    """
+    Reports how many of a deleted wiki's segments have been removed so far.
+    """
+    def __init__(self, uuid: UUID, message_id: int, *, wiki_id: ObjectId, segments_deleted: int, segment_count: int):
+        super().__init__(uuid, message_id, 'wiki_deletion_progress')
+        self.wiki_id = wiki_id
+        self.segments_deleted = segments_deleted
+        self.segment_count = segment_count
+
     
 class DeleteSegmentOutgoingMessage(WikiBroadcastMessage):
     def __init__(self, uuid: UUID, message_id: int, *, segment_id: ObjectId):
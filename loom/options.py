@@ -13,12 +13,18 @@ class OptionParser:
         'logging_level':      'INFO',
         'logging_file_level': 'INFO',
         'logging_out_level':  'INFO',
+        'edit_coalescing_ms': 0,
+        'document_cache_mb':  0,
+        'job_workers':        0,
     }
 
     _TYPES = {
         'port':         int,
         'db_port':      int,
         'demo_db_port': int,
+        'edit_coalescing_ms': int,
+        'document_cache_mb':  int,
+        'job_workers':        int,
     }
 
     _CHOICES = {
@@ -78,10 +84,20 @@ class OptionParser:
         ('--logging-level',         'the minimum default logging level'),
         ('--logging-file-level',    'the minimum level to write to log files'),
         ('--logging-out-level',     'the minimum level to write logging information to stdout'),
+        ('--edit-coalescing-ms',    'hold paragraph text edits for this many milliseconds and save only the latest edit '
+                                    'to each paragraph; 0 disables'),
+        ('--document-cache-mb',     'megabytes of stories, sections, wikis, segments, and pages to cache in memory; 0 '
+                                    'disables'),
+        ('--job-workers',           'run long operations such as deleting a story or wiki as saved jobs on this many '
+                                    'workers, apart from other messages; 0 runs them in turn'),
     ]
 
     _ACTIONS = [
         ('--no-logging',            'disable all logging',          'store_true'),
+        ('--normalize-aliases',     'match passive links against alias names regardless of case, possessives, and '
+                                    'surrounding punctuation',      'store_true'),
+        ('--paragraph-documents',   'store each paragraph in its own document; run scripts/migrate_paragraphs.py on an '
+                                    'existing database first',     'store_true'),
     ]
 
     def __init__(self):
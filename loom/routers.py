@@ -1,30 +1,46 @@
+from loom.database.interfaces.errors import InterfaceError
 from loom.dispatchers.LAWProtocolDispatcher import LAWProtocolDispatcher
 from loom.handlers.websockets.LoomHandler import LoomHandler
+from loom.loggers import interface_log
 from loom.messages.incoming import (
     IncomingMessageFactory,
     IncomingMessage, SubscriptionIncomingMessage, SubscribeToStoryIncomingMessage, SubscribeToWikiIncomingMessage,
-    UnsubscribeFromStoryIncomingMessage, UnsubscribeFromWikiIncomingMessage, UserSignOutIncomingMessage
+    UnsubscribeFromStoryIncomingMessage, UnsubscribeFromWikiIncomingMessage, UserSignOutIncomingMessage,
+    EditParagraphIncomingMessage
 )
 from loom.messages.outgoing import (
+    BackgroundResponses, JobProgress,
     UnicastMessage,
     MulticastMessage, UserSpecifiedMulticastMessage,
     StoryBroadcastMessage, WikiBroadcastMessage,
-    OutgoingErrorMessage,
+    OutgoingErrorMessage, LoomErrorOutgoingMessage,
+    JobQueuedOutgoingMessage, JobStartedOutgoingMessage, JobFinishedOutgoingMessage,
     SubscribeToStoryOutgoingMessage, SubscribeToWikiOutgoingMessage,
-    UnsubscribeFromStoryOutgoingMessage, UnsubscribeFromWikiOutgoingMessage
+    UnsubscribeFromStoryOutgoingMessage, UnsubscribeFromWikiOutgoingMessage,
+    EditParagraphCoalescedOutgoingMessage
 )
 
 from bson.objectid import ObjectId
 from collections import defaultdict
 from tornado.ioloop import IOLoop
+from tornado.locks import Event
 from tornado.queues import Queue
 from uuid import UUID
 
-from typing import Dict, Set
+from typing import Dict, List, Set, Tuple
 JSON = Dict
 
 
 class Router:
+    # Actions that can take long enough to hold up everyone else's messages, which are run as jobs when there are job
+    # workers.
+    LONG_RUNNING_ACTIONS = {
+        'delete_story',
+        'delete_wiki',
+        'change_alias_name',
+        'approve_passive_links',
+    }
+
     class MessageTuple:
         def __init__(self, handler: LoomHandler, message: JSON, action: str, uuid: UUID, message_id=None):
             self.handler = handler
@@ -33,11 +49,69 @@ class Router:
             self.uuid = uuid
             self.message_id = message_id
 
-    def __init__(self, interface):
+    class PendingParagraphEdit:
+        def __init__(self):
+            # (message_tuple, message_object, story_id, wiki_id) for each held edit, in the order they arrived.
+            self.edits: List[Tuple['Router.MessageTuple', EditParagraphIncomingMessage, ObjectId, ObjectId]] = []
+            # The stories, sections and wikis of the held edits. Other messages for them are handled after the edits.
+            self.scope: Set[ObjectId] = set()
+            self.timeout = None
+
+    class PendingParagraphEditFlush:
+        def __init__(self, key: Tuple[ObjectId, ObjectId], pending: 'Router.PendingParagraphEdit'):
+            self.key = key
+            self.pending = pending
+
+    class Job:
+        def __init__(self, job_id: ObjectId, action: str, message: JSON, uuid: UUID, message_id, user_id: ObjectId,
+                     story_id: ObjectId, wiki_id: ObjectId, progress: JSON = None):
+            self.job_id = job_id
+            self.action = action
+            self.message = message
+            self.uuid = uuid
+            self.message_id = message_id
+            # The sender and their subscriptions, which fill in the fields the message leaves out.
+            self.user_id = user_id
+            self.story_id = story_id
+            self.wiki_id = wiki_id
+            # What the job last saved of how far it has got, which it carries on from if it is resumed.
+            self.progress = progress
+            # The stories and wikis the job may change. Messages for them are held until the job is finished.
+            self.scope: Set[ObjectId] = set()
+            # Earlier jobs that may change the same stories or wikis, which are finished before this one starts.
+            self.waits_for: List[Router.Job] = []
+            self.finished = Event()
+
+    class FinishedJob:
+        def __init__(self, job: 'Router.Job'):
+            self.job = job
+
+    class HeldMessage:
+        def __init__(self, message_tuple: 'Router.MessageTuple', message_object: IncomingMessage, user_id: ObjectId,
+                     story_id: ObjectId, wiki_id: ObjectId, scope: Set[ObjectId]):
+            self.message_tuple = message_tuple
+            self.message_object = message_object
+            self.user_id = user_id
+            self.story_id = story_id
+            self.wiki_id = wiki_id
+            self.scope = scope
+
+    def __init__(self, interface, edit_coalescing_window=0, job_workers=0):
         # Classes used throughout.
         self.dispatcher = LAWProtocolDispatcher(interface)
         self.message_factory = IncomingMessageFactory()
         self.message_tuples = Queue()
+        # When positive, `set_text` edits are held for this many seconds per paragraph and only the latest is saved.
+        self.edit_coalescing_window = edit_coalescing_window
+        self.pending_paragraph_edits: Dict[Tuple[ObjectId, ObjectId], Router.PendingParagraphEdit] = dict()
+        # When positive, the long-running actions are saved as jobs and run by this many workers, apart from the queue.
+        self.job_workers = job_workers
+        self.jobs = Queue()
+        self.jobs_resumed = Event()
+        # The jobs that are queued or running, and the messages held back until the jobs for their stories and wikis
+        # are finished, in the order they arrived.
+        self.active_jobs: List[Router.Job] = []
+        self.held_messages: List[Router.HeldMessage] = []
         # Various dictionaries for keeping track of user information.
         self.user_to_uuids: Dict[ObjectId, Set[UUID]] = defaultdict(set)
         self.story_to_uuids: Dict[ObjectId, Set[UUID]] = defaultdict(set)
@@ -48,6 +122,11 @@ class Router:
         self.uuid_to_handler: Dict[UUID, LoomHandler] = dict()
         # Begin reading from the queue.
         IOLoop.current().spawn_callback(self.process_tuples)
+        if job_workers > 0:
+            # Pick up the jobs left unfinished by the last run before any new ones arrive.
+            IOLoop.current().spawn_callback(self.resume_jobs)
+            for _ in range(job_workers):
+                IOLoop.current().spawn_callback(self.process_jobs)
 
     async def enqueue_message(self, handler: LoomHandler, message: JSON, action: str, uuid: UUID, message_id=None):
         message_tuple = Router.MessageTuple(handler, message, action, uuid, message_id)
@@ -55,7 +134,15 @@ class Router:
 
     async def process_tuples(self):
         async for message_tuple in self.message_tuples:
-            await self.handle_message_tuple(message_tuple)
+            if isinstance(message_tuple, Router.PendingParagraphEditFlush):
+                # The edits may have been saved ahead of another message since the timeout fired, in which case any
+                # edits held after that are left to their own timeout.
+                if self.pending_paragraph_edits.get(message_tuple.key) is message_tuple.pending:
+                    await self.flush_paragraph_edits(message_tuple.key)
+            elif isinstance(message_tuple, Router.FinishedJob):
+                await self.release_held_messages(message_tuple.job)
+            else:
+                await self.handle_message_tuple(message_tuple)
             self.message_tuples.task_done()
 
     async def handle_message_tuple(self, message_tuple: MessageTuple):
@@ -65,13 +152,12 @@ class Router:
             user_id = self.uuid_to_user[message_tuple.uuid]
             story_id = self.uuid_to_story.get(message_tuple.uuid)
             wiki_id = self.uuid_to_wiki.get(message_tuple.uuid)
-            additional_args = {'user_id': user_id}
-            if story_id is not None:
-                additional_args['story_id'] = story_id
-            if wiki_id is not None:
-                additional_args['wiki_id'] = wiki_id
+            additional_args = self._get_additional_fields(user_id, story_id, wiki_id)
+            # The factory fills in the missing fields of the message it is given, so it is given a copy to keep the
+            # message as it was sent.
             message_object: IncomingMessage = self.message_factory.build_message(self.dispatcher, message_tuple.action,
-                                                                                 message_tuple.message, additional_args)
+                                                                                 dict(message_tuple.message),
+                                                                                 additional_args)
         # Bad action.
         except ValueError:
             # Should write the message?
@@ -91,6 +177,33 @@ class Router:
         # Check whether the user is already connected to the router.
         if message_tuple.uuid not in self.uuid_to_handler:
             self.uuid_to_handler[message_tuple.uuid] = message_tuple.handler
+        scope = self._get_scope(message_tuple.message, story_id, wiki_id)
+        if self.job_workers > 0:
+            # Jobs left unfinished by the last run must be known before messages can be checked against them.
+            await self.jobs_resumed.wait()
+            if self._should_hold(scope):
+                self.held_messages.append(Router.HeldMessage(message_tuple, message_object, user_id, story_id, wiki_id,
+                                                             scope))
+                return
+        await self.route_message(message_tuple, message_object, user_id, story_id, wiki_id, scope)
+
+    @staticmethod
+    def _get_additional_fields(user_id: ObjectId, story_id: ObjectId, wiki_id: ObjectId) -> JSON:
+        additional_fields = {'user_id': user_id}
+        if story_id is not None:
+            additional_fields['story_id'] = story_id
+        if wiki_id is not None:
+            additional_fields['wiki_id'] = wiki_id
+        return additional_fields
+
+    async def route_message(self, message_tuple: MessageTuple, message_object: IncomingMessage, user_id: ObjectId,
+                            story_id: ObjectId, wiki_id: ObjectId, scope: Set[ObjectId]):
+        if self._should_coalesce(message_object):
+            self.hold_paragraph_edit(message_tuple, message_object, story_id, wiki_id, scope)
+            return
+        # Other messages for the same stories, sections or wikis may depend on held edits, so those are saved first to
+        # preserve the order of changes.
+        await self.flush_paragraph_edits_in_scope(scope)
         # Check if the new message is meant for subscription.
         if isinstance(message_object, SubscriptionIncomingMessage):
             if isinstance(message_object, SubscribeToStoryIncomingMessage):
@@ -105,22 +218,211 @@ class Router:
                 raise RuntimeError(f"unknown instance of SubscriptionIncomingMessage: {message_object}")
         elif isinstance(message_object, UserSignOutIncomingMessage):
             self.disconnect(message_tuple.handler)
+        elif self.job_workers > 0 and message_tuple.action in self.LONG_RUNNING_ACTIONS:
+            await self.enqueue_job(message_tuple, user_id, story_id, wiki_id, scope)
         else:
-            # Dispatch the incoming message and process the responses.
-            async for response in message_object.dispatch():
-                if isinstance(response, UnicastMessage):
-                    self.unicast(response)
-                elif isinstance(response, MulticastMessage):
-                    if isinstance(response, UserSpecifiedMulticastMessage):
-                        self.multicast(response, response.user_id)
-                    else:
-                        self.multicast(response)
-                elif isinstance(response, StoryBroadcastMessage):
-                    self.broadcast_to_story(story_id, response)
-                elif isinstance(response, WikiBroadcastMessage):
-                    self.broadcast_to_wiki(wiki_id, response)
+            await self.dispatch_message(message_object, story_id, wiki_id)
+
+    async def dispatch_message(self, message_object: IncomingMessage, story_id: ObjectId, wiki_id: ObjectId):
+        # Dispatch the incoming message and process the responses.
+        async for response in message_object.dispatch():
+            if isinstance(response, BackgroundResponses):
+                # The rest of the work is finished before the next message, since running it alongside other messages
+                # could interleave their changes with its own. Long-running actions are kept off the queue as jobs.
+                await self.send_background_responses(response.responses, story_id, wiki_id)
+            elif isinstance(response, JobProgress):
+                # Only a job can be resumed, so the progress of an action run from the queue is not kept.
+                pass
+            else:
+                self.send_response(response, story_id, wiki_id)
+
+    async def send_background_responses(self, responses, story_id: ObjectId, wiki_id: ObjectId):
+        async for response in responses:
+            try:
+                self.send_response(response, story_id, wiki_id)
+            except KeyError:
+                # The user disconnected while the responses were being produced, but the work behind them continues.
+                pass
+
+    def send_response(self, response, story_id: ObjectId, wiki_id: ObjectId):
+        if isinstance(response, UnicastMessage):
+            self.unicast(response)
+        elif isinstance(response, MulticastMessage):
+            if isinstance(response, UserSpecifiedMulticastMessage):
+                self.multicast(response, response.user_id)
+            else:
+                self.multicast(response)
+        elif isinstance(response, StoryBroadcastMessage):
+            self.broadcast_to_story(story_id, response)
+        elif isinstance(response, WikiBroadcastMessage):
+            self.broadcast_to_wiki(wiki_id, response)
+        else:
+            raise RuntimeError(f"unknown instance of OutgoingMessage: {response}")
+
+    async def enqueue_job(self, message_tuple: MessageTuple, user_id: ObjectId, story_id: ObjectId, wiki_id: ObjectId,
+                          scope: Set[ObjectId]):
+        # The message is saved without the identifier, which is kept separately since the UUID cannot be stored as is.
+        message = {key: value for key, value in message_tuple.message.items() if key not in ('uuid', 'message_id')}
+        try:
+            job_id = await self.dispatcher.db_interface.create_job(message_tuple.action, message, user_id,
+                                                                   str(message_tuple.uuid), message_tuple.message_id,
+                                                                   story_id, wiki_id)
+        except InterfaceError as e:
+            self.unicast(LoomErrorOutgoingMessage(message_tuple.uuid, message_tuple.message_id,
+                                                  action=message_tuple.action,
+                                                  reason=e.message))
+            return
+        self.unicast(JobQueuedOutgoingMessage(message_tuple.uuid, message_tuple.message_id,
+                                              job_id=job_id,
+                                              action=message_tuple.action))
+        await self.put_job(Router.Job(job_id, message_tuple.action, message, message_tuple.uuid,
+                                      message_tuple.message_id, user_id, story_id, wiki_id), scope)
+
+    async def resume_jobs(self):
+        try:
+            for job in await self.dispatcher.db_interface.get_unfinished_jobs():
+                scope = self._get_scope(job['message'], job['story_id'], job['wiki_id'])
+                await self.put_job(Router.Job(job['_id'], job['action'], job['message'], UUID(job['uuid']),
+                                              job['message_id'], job['user_id'], job['story_id'], job['wiki_id'],
+                                              job.get('progress')), scope)
+        except InterfaceError as e:
+            interface_log.error(f'{e.query}: {e.message}')
+        finally:
+            # Messages wait for this, so it is set even if the unfinished jobs could not be read.
+            self.jobs_resumed.set()
+
+    async def put_job(self, job: Job, scope: Set[ObjectId]):
+        job.scope = scope
+        job.waits_for = [active_job for active_job in self.active_jobs if active_job.scope & scope]
+        self.active_jobs.append(job)
+        await self.jobs.put(job)
+
+    async def process_jobs(self):
+        async for job in self.jobs:
+            try:
+                for earlier_job in job.waits_for:
+                    await earlier_job.finished.wait()
+                job.waits_for = []
+                await self.run_job(job)
+            except InterfaceError as e:
+                # The job's record could not be updated, which should not stop this worker from running others.
+                interface_log.error(f'{e.query}: {e.message}')
+            finally:
+                job.finished.set()
+                # The held messages are released in turn with the queue.
+                self.message_tuples.put_nowait(Router.FinishedJob(job))
+            self.jobs.task_done()
+
+    async def release_held_messages(self, job: Job):
+        self.active_jobs.remove(job)
+        held_messages, self.held_messages = self.held_messages, []
+        for held_message in held_messages:
+            if held_message.message_tuple.uuid not in self.uuid_to_handler:
+                # The user disconnected while the message was held.
+                continue
+            if self._should_hold(held_message.scope):
+                self.held_messages.append(held_message)
+            else:
+                await self.route_message(held_message.message_tuple, held_message.message_object, held_message.user_id,
+                                         held_message.story_id, held_message.wiki_id, held_message.scope)
+
+    @staticmethod
+    def _get_scope(message: JSON, story_id: ObjectId, wiki_id: ObjectId) -> Set[ObjectId]:
+        # A message may use the story, section and wiki it names as well as the story and wiki its sender is subscribed
+        # to.
+        ids = {story_id, wiki_id, message.get('story_id'), message.get('section_id'), message.get('wiki_id')}
+        return {_id for _id in ids if isinstance(_id, ObjectId)}
+
+    def _should_hold(self, scope: Set[ObjectId]) -> bool:
+        # Messages held earlier for the same stories or wikis are also waited for, so that the order is kept.
+        return (any(job.scope & scope for job in self.active_jobs)
+                or any(held_message.scope & scope for held_message in self.held_messages))
+
+    async def run_job(self, job: Job):
+        interface = self.dispatcher.db_interface
+        await interface.start_job(job.job_id)
+        self.send_job_response(job, JobStartedOutgoingMessage(job.uuid, job.message_id,
+                                                              job_id=job.job_id,
+                                                              action=job.action))
+        try:
+            message = dict(job.message, uuid=job.uuid, message_id=job.message_id)
+            message_object = self.message_factory.build_message(self.dispatcher, job.action, message,
+                                                                self._get_additional_fields(job.user_id, job.story_id,
+                                                                                            job.wiki_id))
+            if job.progress is None:
+                responses = message_object.dispatch()
+            else:
+                # The job was interrupted after saving its progress, so it carries on from there rather than repeating
+                # the steps that can no longer be repeated.
+                fields = {field: value for field, value in vars(message_object).items() if not field.startswith('_')}
+                responses = getattr(self.dispatcher, f'resume_{job.action}')(**fields, **job.progress)
+            async for response in responses:
+                if isinstance(response, BackgroundResponses):
+                    # The job is already apart from the queue, so it waits for these before it is finished.
+                    async for background_response in response.responses:
+                        self.send_job_response(job, background_response)
+                elif isinstance(response, JobProgress):
+                    await interface.save_job_progress(job.job_id, response.progress)
+                    job.progress = response.progress
                 else:
-                    raise RuntimeError(f"unknown instance of OutgoingMessage: {response}")
+                    self.send_job_response(job, response)
+        except Exception:
+            interface_log.exception(f'job {job.job_id} ({job.action}) failed')
+            await interface.fail_job(job.job_id)
+            succeeded = False
+        else:
+            await interface.finish_job(job.job_id)
+            succeeded = True
+        self.send_job_response(job, JobFinishedOutgoingMessage(job.uuid, job.message_id,
+                                                               job_id=job.job_id,
+                                                               action=job.action,
+                                                               succeeded=succeeded))
+
+    def send_job_response(self, job: Job, response):
+        try:
+            self.send_response(response, job.story_id, job.wiki_id)
+        except KeyError:
+            # The user has disconnected, or the job was resumed after a restart and there is no one left to tell.
+            pass
+
+    def _should_coalesce(self, message_object: IncomingMessage):
+        return (self.edit_coalescing_window > 0
+                and isinstance(message_object, EditParagraphIncomingMessage)
+                and isinstance(message_object.update, dict)
+                and message_object.update.get('update_type') == 'set_text'
+                and isinstance(message_object.section_id, ObjectId)
+                and isinstance(message_object.paragraph_id, ObjectId))
+
+    def hold_paragraph_edit(self, message_tuple: MessageTuple, message_object: EditParagraphIncomingMessage,
+                            story_id: ObjectId, wiki_id: ObjectId, scope: Set[ObjectId]):
+        key = (message_object.section_id, message_object.paragraph_id)
+        pending = self.pending_paragraph_edits.get(key)
+        if pending is None:
+            pending = Router.PendingParagraphEdit()
+            self.pending_paragraph_edits[key] = pending
+            # The flush goes through the queue so that it is processed in turn with other messages.
+            pending.timeout = IOLoop.current().call_later(self.edit_coalescing_window, self.message_tuples.put_nowait,
+                                                          Router.PendingParagraphEditFlush(key, pending))
+        pending.edits.append((message_tuple, message_object, story_id, wiki_id))
+        pending.scope |= scope
+
+    async def flush_paragraph_edits(self, key: Tuple[ObjectId, ObjectId]):
+        pending = self.pending_paragraph_edits.pop(key)
+        IOLoop.current().remove_timeout(pending.timeout)
+        *superseded_edits, latest_edit = pending.edits
+        section_id, paragraph_id = key
+        for message_tuple, _, _, _ in superseded_edits:
+            if message_tuple.uuid in self.uuid_to_handler:
+                self.unicast(EditParagraphCoalescedOutgoingMessage(message_tuple.uuid, message_tuple.message_id,
+                                                                   section_id=section_id,
+                                                                   paragraph_id=paragraph_id))
+        _, message_object, story_id, wiki_id = latest_edit
+        await self.dispatch_message(message_object, story_id, wiki_id)
+
+    async def flush_paragraph_edits_in_scope(self, scope: Set[ObjectId]):
+        for key, pending in list(self.pending_paragraph_edits.items()):
+            if pending.scope & scope:
+                await self.flush_paragraph_edits(key)
 
     def connect(self, handler: LoomHandler, user_id: ObjectId):
         uuid = handler.uuid
@@ -1,4 +1,5 @@
 from loom import routing
+from loom.alias_trie import AliasNormalizer
 from loom.database.interfaces import MongoDBTornadoInterface
 from loom.dispatchers.LAWProtocolDispatcher import LAWProtocolDispatcher
 from loom.routers import Router
@@ -20,14 +21,21 @@ class LoomServer:
         self._dispatcher = dispatcher
         self._router = router
 
-    def create_db_interface(self, db_name, db_host, db_port, db_user=None, db_pass=None):
-        self._interface = MongoDBTornadoInterface(db_name, db_host, db_port, db_user, db_pass)
+    def create_db_interface(self, db_name, db_host, db_port, db_user=None, db_pass=None, normalize_aliases=False,
+                            document_cache_mb=0, paragraph_documents=False):
+        if normalize_aliases:
+            alias_normalizer = AliasNormalizer(case_fold=True, strip_possessives=True, strip_punctuation=True)
+        else:
+            alias_normalizer = AliasNormalizer()
+        self._interface = MongoDBTornadoInterface(db_name, db_host, db_port, db_user, db_pass, alias_normalizer,
+                                                  document_cache_mb * 1024 * 1024, paragraph_documents)
 
     def create_dispatcher(self):
         self._dispatcher = LAWProtocolDispatcher(self._interface)
 
-    def create_router(self):
-        self._router = Router(self._interface)
+    def create_router(self, edit_coalescing_ms=0, job_workers=0):
+        self._router = Router(self._interface, edit_coalescing_window=edit_coalescing_ms / 1000,
+                              job_workers=job_workers)
 
     def install_demo_endpoint(self, demo_db_data_file):
         routing.install_demo_endpoint(demo_db_data_file)
@@ -0,0 +1,84 @@
+from typing import Dict, List, Tuple
+
+
+class TextOperationError(ValueError):
+    pass
+
+
+def apply_text_operations(text: str, operations: List[Dict]) -> str:
+    """
+    Apply a sequence of text operations to `text`, each against the result of the one before it.
+
+    An operation is either `{'type': 'insert', 'index': int, 'text': str}` or
+    `{'type': 'delete', 'index': int, 'length': int}`.
+    """
+    if not isinstance(operations, list):
+        raise TextOperationError('operations must be a list')
+    for operation in operations:
+        try:
+            operation_type = operation['type']
+            index = operation['index']
+        except (KeyError, TypeError):
+            raise TextOperationError(f'invalid operation: {operation}')
+        if not isinstance(index, int) or not 0 <= index <= len(text):
+            raise TextOperationError(f'index out of range: {operation}')
+        if operation_type == 'insert':
+            inserted_text = operation.get('text')
+            if not isinstance(inserted_text, str):
+                raise TextOperationError(f'invalid operation: {operation}')
+            text = text[:index] + inserted_text + text[index:]
+        elif operation_type == 'delete':
+            length = operation.get('length')
+            if not isinstance(length, int) or not 0 <= length <= len(text) - index:
+                raise TextOperationError(f'length out of range: {operation}')
+            text = text[:index] + text[index + length:]
+        else:
+            raise TextOperationError(f'invalid operation type: {operation}')
+    return text
+
+
+def diff_text_operations(old_text: str, new_text: str) -> List[Dict]:
+    """
+    Return the operations that turn `old_text` into `new_text` by replacing whatever lies between their common prefix
+    and their common suffix.
+    """
+    limit = min(len(old_text), len(new_text))
+    prefix = 0
+    while prefix < limit and old_text[prefix] == new_text[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < limit - prefix and old_text[-1 - suffix] == new_text[-1 - suffix]:
+        suffix += 1
+    operations = []
+    if len(old_text) - suffix > prefix:
+        operations.append({'type': 'delete', 'index': prefix, 'length': len(old_text) - suffix - prefix})
+    if len(new_text) - suffix > prefix:
+        operations.append({'type': 'insert', 'index': prefix, 'text': new_text[prefix:len(new_text) - suffix]})
+    return operations
+
+
+def find_changed_sentences(old_text: str, old_spans: List[Tuple[int, int]], new_text: str,
+                           new_spans: List[Tuple[int, int]]) -> Tuple[int, int, int, int]:
+    """
+    Compare two versions of a paragraph sentence by sentence, and return the `(old_start, old_end, new_start, new_end)`
+    character range in each version that lies between the unchanged sentences at the start and the end.
+    """
+    shift = len(new_text) - len(old_text)
+    limit = min(len(old_spans), len(new_spans))
+    prefix = 0
+    while prefix < limit:
+        (old_start, old_end), (new_start, new_end) = old_spans[prefix], new_spans[prefix]
+        if old_start != new_start or old_text[old_start:old_end] != new_text[new_start:new_end]:
+            break
+        prefix += 1
+    suffix = 0
+    while suffix < limit - prefix:
+        (old_start, old_end), (new_start, new_end) = old_spans[-1 - suffix], new_spans[-1 - suffix]
+        if old_start + shift != new_start or old_text[old_start:old_end] != new_text[new_start:new_end]:
+            break
+        suffix += 1
+    old_start = old_spans[prefix - 1][1] if prefix else 0
+    new_start = new_spans[prefix - 1][1] if prefix else 0
+    old_end = old_spans[len(old_spans) - suffix][0] if suffix else len(old_text)
+    new_end = new_spans[len(new_spans) - suffix][0] if suffix else len(new_text)
+    return old_start, old_end, new_start, new_end
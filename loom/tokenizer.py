@@ -1,6 +1,8 @@
 import nltk
 import re
 
+from nltk.tokenize.util import align_tokens
+
 # Modify the NLTK data path to limit scope of potential problems.
 from os.path import abspath, dirname, join
 nltk.data.path = [abspath(join(dirname(__file__), 'nltk_data'))]  # ./../nltk_data
@@ -58,3 +60,15 @@ class LoomTokenizer:
     @classmethod
     def sent_tokenize(cls, text):
         return nltk.sent_tokenize(text)
+
+    @classmethod
+    def word_span_tokenize(cls, text):
+        """
+        Return the `(start, end)` character offsets of each token from `word_tokenize` within `text`. Tokenization only
+        ever inserts whitespace, so every token is an exact substring of the original text.
+        """
+        return align_tokens(cls.word_tokenize(text), text)
+
+    @classmethod
+    def sent_span_tokenize(cls, text):
+        return align_tokens(cls.sent_tokenize(text), text)
@@ -0,0 +1,405 @@
+#!/usr/bin/env python
+
+import sys
+
+from os.path import dirname
+
+sys.path.append(dirname(dirname(__file__)))
+
+from loom.alias_trie import AliasTrie, AliasTrieMatch
+from loom.data_processor import DataProcessor
+from loom.database.clients import MongoDBMotorAsyncioClient
+from loom.database.interfaces import MongoDBAsyncioInterface
+from loom.database.interfaces.mongodb_interfaces import LINK_FORMAT_REGEX, MongoDBInterface
+from loom.serialize import decode_string_to_bson, encode_bson_to_string
+from loom.tokenizer import LoomTokenizer
+
+from bson.objectid import ObjectId
+from collections import defaultdict
+from os.path import join
+
+import asyncio
+import random
+import time
+
+
+def timed(function, *args, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def report(name, seconds, count, unit):
+    print(f'{name:<40} {seconds * 1000:>10.2f} ms  {count / seconds:>14,.0f} {unit}/s')
+
+
+###########################################################################
+#
+# Alias Trie
+#
+###########################################################################
+
+class RecursiveAliasTrie:
+    """
+    The original object-per-node trie with recursive matching, kept here as a baseline.
+    """
+    class Node:
+        def __init__(self, depth):
+            self.children = {}
+            self.terminal = None
+            self.depth = depth
+
+        def find_next_terminal(self, tokens, next_token_index, last_terminal_node):
+            last_terminal_node = self if self.terminal is not None else last_terminal_node
+            if next_token_index >= len(tokens):
+                return last_terminal_node
+            next_node = self.children.get(tokens[next_token_index])
+            if next_node is None:
+                return last_terminal_node
+            return next_node.find_next_terminal(tokens, next_token_index + 1, last_terminal_node)
+
+    def __init__(self):
+        self.root = RecursiveAliasTrie.Node(0)
+
+    def add_path(self, path, page_id, alias_id):
+        node = self.root
+        for i, token in enumerate(path):
+            next_node = node.children.get(token)
+            if next_node is None:
+                next_node = RecursiveAliasTrie.Node(i + 1)
+                node.children[token] = next_node
+            node = next_node
+        node.terminal = (page_id, alias_id)
+
+    def find_longest_match_in_tokens(self, tokens, *, from_index):
+        node = self.root.find_next_terminal(tokens, from_index, None)
+        if node is None or node.depth == 0:
+            return None
+        return AliasTrieMatch(node.depth, *node.terminal)
+
+
+def generate_alias_paths(alias_count, vocabulary):
+    paths = set()
+    while len(paths) < alias_count:
+        length = random.choice((1, 1, 2, 2, 2, 3, 4))
+        paths.add(tuple(random.choice(vocabulary) for _ in range(length)))
+    return [list(path) for path in sorted(paths)]
+
+
+def generate_sentences(sentence_count, vocabulary, alias_paths):
+    sentences = []
+    for _ in range(sentence_count):
+        tokens = []
+        while len(tokens) < 25:
+            if random.random() < 0.1:
+                tokens.extend(random.choice(alias_paths))
+            else:
+                tokens.append(random.choice(vocabulary))
+        sentences.append(tokens)
+    return sentences
+
+
+def scan_each_position(trie, sentences):
+    for tokens in sentences:
+        index = 0
+        while index < len(tokens):
+            match = trie.find_longest_match_in_tokens(tokens, from_index=index)
+            index += 1 if match is None else match.length
+
+
+def scan_single_pass(trie, sentences):
+    for tokens in sentences:
+        trie.find_all_matches_in_tokens(tokens)
+
+
+def build_trie(trie_class, alias_paths):
+    trie = trie_class()
+    for i, path in enumerate(alias_paths):
+        trie.add_path(path, i, i)
+    return trie
+
+
+def benchmark_alias_trie(args):
+    alias_count = args.aliases
+    sentence_count = args.sentences
+    random.seed(0)
+    # Half of the vocabulary never appears in prose, and prose has plenty of words that never appear in aliases.
+    alias_vocabulary = [f'Name{i}' for i in range(alias_count)]
+    prose_vocabulary = [f'word{i}' for i in range(alias_count)] + alias_vocabulary[:alias_count // 10]
+    alias_paths = generate_alias_paths(alias_count, alias_vocabulary)
+    sentences = generate_sentences(sentence_count, prose_vocabulary, alias_paths)
+    token_count = sum(len(tokens) for tokens in sentences)
+    print(f'{alias_count} aliases, {sentence_count} sentences, {token_count} tokens')
+    report('build (recursive trie)', timed(build_trie, RecursiveAliasTrie, alias_paths), alias_count, 'aliases')
+    report('build (flat trie)', timed(build_trie, AliasTrie, alias_paths), alias_count, 'aliases')
+    recursive_trie = build_trie(RecursiveAliasTrie, alias_paths)
+    flat_trie = build_trie(AliasTrie, alias_paths)
+    report('match per position (recursive trie)', timed(scan_each_position, recursive_trie, sentences), token_count,
+           'tokens')
+    report('match per position (flat trie)', timed(scan_each_position, flat_trie, sentences), token_count, 'tokens')
+    report('single pass (flat trie, Aho-Corasick)', timed(scan_single_pass, flat_trie, sentences), token_count,
+           'tokens')
+
+
+###########################################################################
+#
+# Link Extraction
+#
+###########################################################################
+
+def generate_link_dense_paragraphs(paragraph_count, alias_ids):
+    paragraphs = []
+    for _ in range(paragraph_count):
+        sentences = []
+        for _ in range(random.randint(3, 8)):
+            words = []
+            for _ in range(random.randint(8, 20)):
+                if random.random() < 0.3:
+                    words.append(MongoDBInterface.encode_object_id(random.choice(alias_ids)))
+                else:
+                    words.append(random.choice(('the', 'old', 'man', 'walked', 'slowly', 'into', 'town')))
+            sentences.append(' '.join(words) + '.')
+        paragraphs.append(' '.join(sentences))
+    return paragraphs
+
+
+def extract_per_sentence(paragraphs, alias_names):
+    """
+    The original approach: find matches in each sentence, JSON-decode each one, and replace them one at a time.
+    """
+    for paragraph in paragraphs:
+        for sentence in LoomTokenizer.sent_tokenize(paragraph):
+            for match in [match.group(0) for match in LINK_FORMAT_REGEX.finditer(sentence)]:
+                sentence = sentence.replace(match, alias_names[decode_string_to_bson(match)])
+
+
+def extract_single_scan(paragraphs, alias_names):
+    for paragraph in paragraphs:
+        link_matches = [(match.start(), match.end(), ObjectId(match.group(1)))
+                        for match in LINK_FORMAT_REGEX.finditer(paragraph)]
+        match_index = 0
+        for sentence_start, sentence_end in LoomTokenizer.sent_span_tokenize(paragraph):
+            buffer = []
+            prev_end = sentence_start
+            while match_index < len(link_matches) and link_matches[match_index][0] < sentence_end:
+                start, end, object_id = link_matches[match_index]
+                match_index += 1
+                buffer.append(paragraph[prev_end:start])
+                buffer.append(alias_names[object_id])
+                prev_end = end
+            buffer.append(paragraph[prev_end:sentence_end])
+            ''.join(buffer)
+
+
+def benchmark_link_extraction(args):
+    paragraph_count = args.paragraphs
+    random.seed(0)
+    alias_names = {ObjectId(): f'Name {i}' for i in range(50)}
+    paragraphs = generate_link_dense_paragraphs(paragraph_count, list(alias_names))
+    link_count = sum(len(LINK_FORMAT_REGEX.findall(paragraph)) for paragraph in paragraphs)
+    print(f'{paragraph_count} paragraphs, {link_count} links')
+    report('per sentence (decode, replace)', timed(extract_per_sentence, paragraphs, alias_names), link_count,
+           'links')
+    report('single scan (offsets)', timed(extract_single_scan, paragraphs, alias_names), link_count, 'links')
+
+
+###########################################################################
+#
+# Subsection Moves
+#
+###########################################################################
+
+async def move_by_scan(client, section_id, to_parent_id):
+    """
+    The original move: pull the section from every section's lists, then push it to the new parent.
+    """
+    await client.sections.update_many({}, {'$pull': {field: section_id for field in client.SUBSECTION_FIELDS}})
+    await client.sections.update_one({'_id': to_parent_id}, {'$push': {'inner_subsections': section_id}})
+
+
+async def move_by_parent(client, section_id, to_parent_id):
+    await client.move_subsection(section_id, to_parent_id, 'inner_subsections')
+
+
+async def time_moves(move, client, section_id, parent_ids, move_count):
+    start = time.perf_counter()
+    for i in range(move_count):
+        await move(client, section_id, parent_ids[i % len(parent_ids)])
+    return time.perf_counter() - start
+
+
+async def run_move_benchmark(args):
+    client = MongoDBMotorAsyncioClient(args.db_name, args.db_host, args.db_port)
+    await client.drop_database()
+    parent_ids = [await client.create_section(f'Parent {i}') for i in range(2)]
+    section_id = await client.create_section('Moved')
+    await client.insert_inner_subsection(section_id, parent_ids[0])
+    section_count = 3
+    try:
+        for collection_size in sorted(args.collection_sizes):
+            # Pad the collection with unrelated sections up to the requested size.
+            padding = collection_size - section_count
+            for start in range(0, padding, 1000):
+                await client.sections.insert_many([{
+                    'title':                  'Padding',
+                    'parent_id':              None,
+                    'preceding_subsections':  [],
+                    'inner_subsections':      [],
+                    'succeeding_subsections': [],
+                } for _ in range(min(1000, padding - start))])
+            section_count = max(section_count, collection_size)
+            print(f'{section_count} sections, {args.moves} moves')
+            # Alternating between the two parents makes every move one between different parents.
+            report('  pull from all, then push', await time_moves(move_by_scan, client, section_id, parent_ids,
+                                                                  args.moves), args.moves, 'moves')
+            await client.sections.update_one({'_id': section_id}, {'$set': {'parent_id': parent_ids[0]}})
+            await client.sections.update_many({'_id': {'$in': parent_ids}}, {'$set': {'inner_subsections': []}})
+            await client.sections.update_one({'_id': parent_ids[0]}, {'$push': {'inner_subsections': section_id}})
+            report('  targeted by parent_id', await time_moves(move_by_parent, client, section_id, parent_ids[1:] +
+                                                               parent_ids[:1], args.moves), args.moves, 'moves')
+    finally:
+        await client.drop_database()
+
+
+def benchmark_moves(args):
+    asyncio.get_event_loop().run_until_complete(run_move_benchmark(args))
+
+
+###########################################################################
+#
+# Page Frequencies
+#
+###########################################################################
+
+async def frequencies_page_by_page(interface, story_id, segment_id):
+    """
+    The original path: walk the segments and read each page's references from the story one page at a time.
+    """
+    segment = await interface.client.get_segment(segment_id, {'pages': 1, 'segments': 1})
+    pages = []
+    for page_id in segment['pages']:
+        frequencies = defaultdict(int)
+        for reference in await interface.client.get_page_references_in_story(page_id, story_id):
+            frequencies[encode_bson_to_string(reference['context']['section_id'])] += 1
+        pages.append({'page_id': page_id, 'section_frequencies': frequencies})
+    for child_segment_id in segment['segments']:
+        pages.extend(await frequencies_page_by_page(interface, story_id, child_segment_id))
+    return pages
+
+
+async def frequencies_by_aggregation(interface, story_id, wiki_id):
+    return await interface.get_page_frequencies_in_story(story_id, wiki_id)
+
+
+async def time_queries(query, query_count, *args):
+    start = time.perf_counter()
+    for _ in range(query_count):
+        await query(*args)
+    return time.perf_counter() - start
+
+
+async def run_page_frequency_benchmark(args):
+    interface = MongoDBAsyncioInterface(args.db_name, args.db_host, args.db_port)
+    await interface.client.drop_database()
+    try:
+        await DataProcessor(interface).load_file(args.data_file, True)
+        story = await interface.client.stories.find_one({}, projection={'wiki_id': 1})
+        story_id, wiki_id = story['_id'], story['wiki_id']
+        wiki = await interface.client.get_wiki(wiki_id, {'segment_id': 1})
+        page_count = len(await interface.client.pages.find({}, projection={'_id': 1}).to_list(None))
+        reference_count = len(await interface.client.references.find({}, projection={'_id': 1}).to_list(None))
+        print(f'{page_count} pages, {reference_count} references, {args.queries} queries')
+        report('  page by page', await time_queries(frequencies_page_by_page, args.queries, interface, story_id,
+                                                    wiki['segment_id']), args.queries, 'queries')
+        report('  single aggregation', await time_queries(frequencies_by_aggregation, args.queries, interface,
+                                                          story_id, wiki_id), args.queries, 'queries')
+    finally:
+        await interface.client.drop_database()
+
+
+def benchmark_page_frequencies(args):
+    asyncio.get_event_loop().run_until_complete(run_page_frequency_benchmark(args))
+
+
+###########################################################################
+#
+# Wiki Creation
+#
+###########################################################################
+
+async def create_wiki_step_by_step(interface, user_id, title):
+    """
+    The original setup: create the root segment, then add each default segment and template heading in turn.
+    """
+    user = await interface.get_user_preferences(user_id)
+    user_description = interface._build_user_description(user_id, user['name'], 'owner')
+    segment_id = await interface.create_segment(title)
+    wiki_id = await interface.client.create_wiki(title, user_description, 'Summary', segment_id)
+    await interface._add_wiki_id_to_user(user_id, wiki_id)
+    for child_template in interface.DEFAULT_WIKI_TEMPLATE:
+        child_segment_id = await interface.add_child_segment(wiki_id, child_template['title'], segment_id)
+        for heading_title in child_template['template_headings']:
+            await interface.add_template_heading(heading_title, child_segment_id)
+
+
+async def create_wiki_batched(interface, user_id, title):
+    await interface.create_wiki(user_id, title, 'Summary')
+
+
+async def time_wiki_creation(create, interface, user_id, wiki_count):
+    start = time.perf_counter()
+    for i in range(wiki_count):
+        await create(interface, user_id, f'Wiki {i}')
+    return time.perf_counter() - start
+
+
+async def run_wiki_creation_benchmark(args):
+    interface = MongoDBAsyncioInterface(args.db_name, args.db_host, args.db_port)
+    await interface.client.drop_database()
+    try:
+        user_id = await interface.create_user('benchmark', 'password', 'Benchmark', 'benchmark@example.com')
+        print(f'{args.wikis} wikis')
+        report('  segment by segment', await time_wiki_creation(create_wiki_step_by_step, interface, user_id,
+                                                                args.wikis), args.wikis, 'wikis')
+        report('  single insert', await time_wiki_creation(create_wiki_batched, interface, user_id, args.wikis),
+               args.wikis, 'wikis')
+    finally:
+        await interface.client.drop_database()
+
+
+def benchmark_wiki_creation(args):
+    asyncio.get_event_loop().run_until_complete(run_wiki_creation_benchmark(args))
+
+
+BENCHMARKS = {
+    'alias_trie': benchmark_alias_trie,
+    'link_extraction': benchmark_link_extraction,
+    'moves': benchmark_moves,
+    'page_frequencies': benchmark_page_frequencies,
+    'wiki_creation': benchmark_wiki_creation,
+}
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument('benchmark', choices=sorted(BENCHMARKS), help='Name of the benchmark to run.')
+    parser.add_argument('--aliases', type=int, default=5000, help='Number of aliases in the generated wiki.')
+    parser.add_argument('--sentences', type=int, default=2000, help='Number of generated sentences to scan.')
+    parser.add_argument('--paragraphs', type=int, default=500, help='Number of generated paragraphs to scan.')
+    parser.add_argument('--collection-sizes', type=int, nargs='+', default=[1000, 10000, 100000],
+                        help='Numbers of sections in the collection to time moves at.')
+    parser.add_argument('--moves', type=int, default=200, help='Number of moves to time at each collection size.')
+    parser.add_argument('--data-file', default=join(dirname(__file__), 'game_of_thrones.json'),
+                        help='Data file to load for the page frequencies benchmark.')
+    parser.add_argument('--queries', type=int, default=100, help='Number of page frequency queries to time.')
+    parser.add_argument('--wikis', type=int, default=200, help='Number of wikis to create in each way.')
+    parser.add_argument('--db-name', default='loom-benchmark', help='Scratch database for the database benchmarks; it '
+                                                                    'is dropped before and after.')
+    parser.add_argument('--db-host', default='localhost', help='Address of the MongoDB server.')
+    parser.add_argument('--db-port', type=int, default=27017, help='MongoDB connection port.')
+    args = parser.parse_args()
+    BENCHMARKS[args.benchmark](args)
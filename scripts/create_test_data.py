@@ -13,7 +13,7 @@ import asyncio
 
 
 def main(jsonfile, db_name, db_user=None, db_pass=None, blind_override=False, load_without_drop=False,
-         approve_passive_links=False):
+         approve_passive_links=False, bulk=False):
     if not load_without_drop and not blind_override:
         answer = input("This will drop the `{}` database... continue? [y/N] ".format(db_name))
         if not answer.lower().startswith('y'):
@@ -22,11 +22,14 @@ def main(jsonfile, db_name, db_user=None, db_pass=None, blind_override=False, lo
         print("Continuing.")
     event_loop = asyncio.get_event_loop()
     interface = MongoDBAsyncioInterface(db_name, 'localhost', 27017, db_user, db_pass)
-    processor = DataProcessor(interface)
+    processor = DataProcessor(interface, bulk)
     if not load_without_drop:
         event_loop.run_until_complete(interface.client.drop_all_collections())
     event_loop.run_until_complete(processor.load_file(jsonfile, approve_passive_links))
     event_loop.close()
+    print("Loaded {} paragraphs in {:.2f}s ({:.1f} paragraphs/s).".format(processor.paragraphs_loaded,
+                                                                         processor.load_time,
+                                                                         processor.paragraphs_per_second))
 
 if __name__ == '__main__':
     import argparse
@@ -41,6 +44,8 @@ if __name__ == '__main__':
                         action='store_true')
     parser.add_argument('--approve-passive-links', help='Approve all the passive links that were created.',
                         action='store_true')
+    parser.add_argument('--bulk', help='Build each section\'s paragraphs in memory and store them with bulk writes.',
+                        action='store_true')
     args = parser.parse_args()
 
     # Ensure either both or neither of the authentication arguments are given.
@@ -52,4 +57,4 @@ if __name__ == '__main__':
         sys.exit(1)
 
     main(args.data_file, args.db_name, args.db_user, args.db_pass, args.no_ask, args.load_no_drop,
-         args.approve_passive_links)
+         args.approve_passive_links, args.bulk)
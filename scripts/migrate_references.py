@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+
+import sys
+
+from os.path import dirname
+
+sys.path.append(dirname(dirname(__file__)))
+
+from loom.database.clients import MongoDBMotorAsyncioClient
+
+import asyncio
+
+
+def main(db_name, db_host, db_port, db_user=None, db_pass=None, blind_override=False):
+    if not blind_override:
+        answer = input("This will rewrite every page in the `{}` database; the server must not be running... "
+                       "continue? [y/N] ".format(db_name))
+        if not answer.lower().startswith('y'):
+            print("Quitting...")
+            return
+        print("Continuing.")
+    event_loop = asyncio.get_event_loop()
+    client = MongoDBMotorAsyncioClient(db_name, db_host, db_port, db_user, db_pass)
+    migrated = event_loop.run_until_complete(client.migrate_page_references_to_collection())
+    print("Moved the references of {} pages into the `references` collection.".format(migrated))
+    event_loop.close()
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(
+        description='Migrate a database that embeds the references to each page in the page document to one that '
+                    'stores them in the `references` collection.')
+    parser.add_argument('--db-name', default='inkweaver', help='Name of the database you want to use.')
+    parser.add_argument('--db-host', default='localhost', help='Address of the MongoDB server.')
+    parser.add_argument('--db-port', default=27017, type=int, help='MongoDB connection port.')
+    parser.add_argument('--db-user', default=None, help='Username to authenticate MongoDB.')
+    parser.add_argument('--db-pass', default=None, help='Password to authenticate MongoDB.')
+    parser.add_argument('--no-ask', help='Do not ask for verification before migrating.', action='store_true')
+    args = parser.parse_args()
+
+    # Ensure either both or neither of the authentication arguments are given.
+    if args.db_user and not args.db_pass:
+        print("Cannot authenticate without password.")
+        sys.exit(1)
+    if args.db_pass and not args.db_user:
+        print("Cannot authenticate without username.")
+        sys.exit(1)
+
+    main(args.db_name, args.db_host, args.db_port, args.db_user, args.db_pass, args.no_ask)
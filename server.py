@@ -33,7 +33,11 @@ if parser.db_pass and not parser.db_user:
     sys.exit(1)
 
 # Initialize the database interface.
-main_server.create_db_interface(parser.db_name, parser.db_host, parser.db_port, parser.db_user, parser.db_pass)
+main_server.create_db_interface(parser.db_name, parser.db_host, parser.db_port, parser.db_user, parser.db_pass,
+                                parser.normalize_aliases, parser.document_cache_mb, parser.paragraph_documents)
+
+# Initialize the router.
+main_server.create_router(parser.edit_coalescing_ms, parser.job_workers)
 
 # Start the server!
 main_server.start_server(
@@ -0,0 +1,26 @@
+from tornado.platform.asyncio import AsyncIOLoop
+
+import asyncio
+
+
+def run(coroutine):
+    """
+    Run a coroutine to completion on a fresh event loop.
+    """
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def run_on_ioloop(coroutine, timeout=10):
+    """
+    Run a coroutine to completion on a fresh Tornado IOLoop, for code that schedules callbacks on the current IOLoop.
+    The coroutine fails if it has not finished within the timeout, so that a missed callback cannot hang the tests.
+    """
+    io_loop = AsyncIOLoop()
+    try:
+        return io_loop.run_sync(lambda: coroutine, timeout)
+    finally:
+        io_loop.close()
@@ -0,0 +1,112 @@
+"""
+An in-memory stand-in for MongoDB, for tests that compare what two ways of making the same changes leave in the
+database.
+"""
+from loom.database.clients import MongoDBClient, NoMatchError, ParagraphDocumentsMixin
+from loom.database.interfaces.mongodb_interfaces import MongoDBInterface
+
+from bson.objectid import ObjectId
+from mongomock import collection as mongomock_collection
+from mongomock_motor import AsyncMongoMockClient
+
+import asyncio
+import inspect
+import re
+
+
+# mongomock's bulk operations predate some of the keyword arguments PyMongo now passes them, so those are dropped.
+def _drop_unsupported_keywords(method):
+    parameters = set(inspect.signature(method).parameters)
+
+    def wrapped(self, *args, **kwargs):
+        return method(self, *args, **{key: value for key, value in kwargs.items() if key in parameters})
+    return wrapped
+
+
+for _name in ('add_insert', 'add_update', 'add_replace', 'add_delete'):
+    setattr(mongomock_collection.BulkOperationBuilder, _name,
+            _drop_unsupported_keywords(getattr(mongomock_collection.BulkOperationBuilder, _name)))
+
+
+class MockClient(MongoDBClient):
+    def __init__(self, db_name='inkweaver', db_host='localhost', db_port=27017, db_user=None, db_pass=None):
+        self._client = AsyncMongoMockClient()
+        self._host = db_host
+        self._port = db_port
+        self._database = getattr(self._client, db_name)
+
+    # mongomock does not support the positional `$` projections the paragraph getters use, so they are read from the
+    # whole section instead.
+    async def _get_paragraph_field(self, section_id: ObjectId, paragraph_id: ObjectId, array: str, field: str):
+        section = await self.sections.find_one({'_id': section_id})
+        if section is None:
+            raise NoMatchError
+        for item in section[array]:
+            if item.get('_id', item.get('paragraph_id')) == paragraph_id:
+                return item[field]
+        raise NoMatchError
+
+    async def get_paragraph_text(self, section_id: ObjectId, paragraph_id: ObjectId):
+        return await self._get_paragraph_field(section_id, paragraph_id, 'content', 'text')
+
+    async def get_paragraph_statistics(self, section_id: ObjectId, paragraph_id: ObjectId):
+        return await self._get_paragraph_field(section_id, paragraph_id, 'content', 'statistics')
+
+    async def get_links_in_paragraph(self, paragraph_id: ObjectId, section_id: ObjectId):
+        return await self._get_paragraph_field(section_id, paragraph_id, 'links', 'links')
+
+    async def get_passive_links_in_paragraph(self, paragraph_id: ObjectId, section_id: ObjectId):
+        return await self._get_paragraph_field(section_id, paragraph_id, 'passive_links', 'passive_links')
+
+
+class MockParagraphsClient(ParagraphDocumentsMixin, MockClient):
+    pass
+
+
+class MockInterface(MongoDBInterface):
+    def __init__(self, paragraph_documents=False):
+        super().__init__(MockParagraphsClient if paragraph_documents else MockClient, 'inkweaver', 'localhost', 27017)
+
+    def gather(self, awaitables):
+        return asyncio.gather(*awaitables)
+
+
+async def dump_database(interface: MongoDBInterface, exclude_fields=()):
+    """
+    Return every document in the database by collection name, without the given fields.
+    """
+    database = interface.client.database
+    documents = {}
+    for name in sorted(await database.list_collection_names()):
+        documents[name] = [{key: value for key, value in document.items() if key not in exclude_fields}
+                           async for document in database[name].find({})]
+    return documents
+
+
+ENCODED_OBJECT_ID_REGEX = re.compile(r'\{"\$oid":\s*"([a-f\d]{24})"\}')
+
+
+def label_object_ids(value):
+    """
+    Replace each object ID in the value, including those encoded in strings, with a label numbered by first appearance,
+    so that databases built with different IDs can be compared.
+    """
+    labels = {}
+
+    def label(object_id):
+        return labels.setdefault(str(object_id), f'ID{len(labels)}')
+
+    def walk(item):
+        if isinstance(item, ObjectId):
+            return label(item)
+        if isinstance(item, dict):
+            # Keys are visited in order, so that the labels do not depend on the order the fields were written in.
+            return {walk(key): walk(item[key]) for key in sorted(item)}
+        if isinstance(item, (list, tuple)):
+            return [walk(value) for value in item]
+        if isinstance(item, str):
+            if ObjectId.is_valid(item) and len(item) == 24:
+                return label(item)
+            return ENCODED_OBJECT_ID_REGEX.sub(lambda match: f'<{label(match.group(1))}>', item)
+        return item
+    return walk(value)
@@ -0,0 +1,25 @@
+from loom.data_processor import DataProcessor
+from tests.helpers import run
+from tests.mock_database import MockInterface, dump_database, label_object_ids
+
+from os.path import dirname, join
+
+import pytest
+
+DATA_FILE = join(dirname(dirname(__file__)), 'scripts', 'game_of_thrones.json')
+
+
+async def load(bulk, approve_passive_links):
+    interface = MockInterface()
+    processor = DataProcessor(interface, bulk)
+    await processor.load_file(DATA_FILE, approve_passive_links)
+    # Password hashes are salted, so they differ between any two loads.
+    return processor.paragraphs_loaded, await dump_database(interface, exclude_fields=('password_hash',))
+
+
+@pytest.mark.parametrize('approve_passive_links', [False, True])
+def test_bulk_import_matches_sequential_import(approve_passive_links):
+    sequential_paragraphs, sequential_database = run(load(False, approve_passive_links))
+    bulk_paragraphs, bulk_database = run(load(True, approve_passive_links))
+    assert bulk_paragraphs == sequential_paragraphs > 0
+    assert label_object_ids(bulk_database) == label_object_ids(sequential_database)
@@ -0,0 +1,274 @@
+from loom.database.interfaces.document_cache import DocumentCache, DocumentCachingClient
+from tests.helpers import run
+
+from bson import BSON
+from bson.objectid import ObjectId
+
+
+def encoded_size(document):
+    return len(BSON.encode(document))
+
+
+class FakeClient:
+    """
+    Stands in for a `MongoDBClient`, keeping sections in a dictionary and counting the reads that reach it.
+    """
+    def __init__(self):
+        self.sections = {}
+        self.reads = 0
+        self.before_read = None
+
+    async def get_section(self, section_id, projection=None):
+        self.reads += 1
+        if self.before_read is not None:
+            await self.before_read()
+        section = dict(self.sections[section_id])
+        if projection is not None:
+            section = {field: value for field, value in section.items() if field == '_id' or projection.get(field)}
+        return section
+
+    async def get_sections(self, section_ids, projection=None):
+        return [dict(self.sections[section_id]) for section_id in section_ids]
+
+    async def set_section_title(self, section_id, title):
+        self.sections[section_id]['title'] = title
+
+    async def delete_section(self, section_id):
+        del self.sections[section_id]
+
+    async def get_section_ancestor_ids(self, section_id):
+        # Stands in for the lookup recording a parent ID that was missing, which is a write to another section.
+        for section in self.sections.values():
+            section['parent_id'] = None
+        return []
+
+    def host(self):
+        return 'localhost'
+
+
+def create_section(client, title='Section'):
+    section_id = ObjectId()
+    client.sections[section_id] = {'_id': section_id, 'title': title, 'parent_id': None}
+    return section_id
+
+
+###########################################################################
+#
+# DocumentCache Tests
+#
+###########################################################################
+
+def test_get_returns_a_copy_of_the_document():
+    cache = DocumentCache(1024)
+    _id = ObjectId()
+    document = {'_id': _id, 'title': 'Title'}
+    cache.put('sections', _id, document, cache.generation)
+    cached = cache.get('sections', _id)
+    assert cached == document
+    cached['title'] = 'Changed'
+    assert cache.get('sections', _id)['title'] == 'Title'
+    assert cache.hits == 2
+    assert cache.size == encoded_size(document)
+
+
+def test_get_misses_unknown_documents():
+    cache = DocumentCache(1024)
+    assert cache.get('sections', ObjectId()) is None
+    assert cache.misses == 1
+
+
+def test_least_recently_used_documents_are_evicted():
+    documents = [{'_id': ObjectId(), 'title': 'Title'} for _ in range(3)]
+    cache = DocumentCache(2 * encoded_size(documents[0]))
+    cache.put('sections', documents[0]['_id'], documents[0], cache.generation)
+    cache.put('sections', documents[1]['_id'], documents[1], cache.generation)
+    # Using the first document leaves the second as the least recently used.
+    cache.get('sections', documents[0]['_id'])
+    cache.put('sections', documents[2]['_id'], documents[2], cache.generation)
+    assert cache.get('sections', documents[1]['_id']) is None
+    assert cache.get('sections', documents[0]['_id']) == documents[0]
+    assert cache.get('sections', documents[2]['_id']) == documents[2]
+    assert cache.evictions == 1
+    assert cache.size <= cache.max_bytes
+
+
+def test_documents_larger_than_the_cache_are_not_stored():
+    document = {'_id': ObjectId(), 'title': 'A long title'}
+    cache = DocumentCache(encoded_size(document) - 1)
+    cache.put('sections', document['_id'], document, cache.generation)
+    assert cache.get('sections', document['_id']) is None
+    assert cache.size == 0
+
+
+def test_documents_read_before_an_invalidation_are_not_stored():
+    cache = DocumentCache(1024)
+    _id = ObjectId()
+    generation = cache.generation
+    cache.invalidate(['sections'], [ObjectId()])
+    cache.put('sections', _id, {'_id': _id}, generation)
+    assert cache.get('sections', _id) is None
+
+
+def test_invalidate_drops_only_the_given_ids_and_collections():
+    cache = DocumentCache(1024)
+    section_id, other_id = ObjectId(), ObjectId()
+    cache.put('sections', section_id, {'_id': section_id}, cache.generation)
+    cache.put('sections', other_id, {'_id': other_id}, cache.generation)
+    cache.put('stories', section_id, {'_id': section_id}, cache.generation)
+    cache.invalidate(['sections'], [section_id])
+    assert cache.get('sections', section_id) is None
+    assert cache.get('sections', other_id) is not None
+    assert cache.get('stories', section_id) is not None
+    assert cache.invalidations == 1
+
+
+def test_invalidate_collection_and_clear():
+    cache = DocumentCache(1024)
+    section_id, story_id = ObjectId(), ObjectId()
+    cache.put('sections', section_id, {'_id': section_id}, cache.generation)
+    cache.put('stories', story_id, {'_id': story_id}, cache.generation)
+    cache.invalidate_collection('sections')
+    assert cache.get('sections', section_id) is None
+    assert cache.get('stories', story_id) is not None
+    cache.clear()
+    assert cache.get('stories', story_id) is None
+    assert cache.size == 0
+    assert cache.stats['entries'] == 0
+
+
+###########################################################################
+#
+# DocumentCachingClient Tests
+#
+###########################################################################
+
+def test_whole_document_reads_are_cached():
+    client = FakeClient()
+    section_id = create_section(client)
+    caching_client = DocumentCachingClient(client, DocumentCache(1024))
+
+    async def read_twice():
+        first = await caching_client.get_section(section_id)
+        second = await caching_client.get_section(section_id)
+        return first, second
+
+    first, second = run(read_twice())
+    assert first == second == client.sections[section_id]
+    assert client.reads == 1
+
+
+def test_projected_reads_are_served_from_a_cached_document():
+    client = FakeClient()
+    section_id = create_section(client, 'Title')
+    caching_client = DocumentCachingClient(client, DocumentCache(1024))
+
+    async def read():
+        await caching_client.get_section(section_id)
+        return await caching_client.get_section(section_id, {'title': 1})
+
+    assert run(read()) == {'_id': section_id, 'title': 'Title'}
+    assert client.reads == 1
+
+
+def test_projected_reads_do_not_fill_the_cache():
+    client = FakeClient()
+    section_id = create_section(client)
+    caching_client = DocumentCachingClient(client, DocumentCache(1024))
+
+    async def read():
+        await caching_client.get_section(section_id, {'title': 1})
+        await caching_client.get_section(section_id, {'title': 1})
+
+    run(read())
+    assert client.reads == 2
+    assert caching_client.document_cache.stats['entries'] == 0
+
+
+def test_projections_of_nested_fields_go_to_the_client():
+    client = FakeClient()
+    section_id = create_section(client)
+    caching_client = DocumentCachingClient(client, DocumentCache(1024))
+
+    async def read():
+        await caching_client.get_section(section_id)
+        await caching_client.get_section(section_id, {'statistics.word_count': 1})
+
+    run(read())
+    assert client.reads == 2
+
+
+def test_mutations_invalidate_the_documents_they_are_given():
+    client = FakeClient()
+    section_id = create_section(client, 'Title')
+    caching_client = DocumentCachingClient(client, DocumentCache(1024))
+
+    async def read_write_read():
+        await caching_client.get_section(section_id)
+        await caching_client.set_section_title(section_id, 'New Title')
+        return await caching_client.get_section(section_id)
+
+    assert run(read_write_read())['title'] == 'New Title'
+    assert client.reads == 2
+
+
+def test_broad_mutations_invalidate_their_collections():
+    client = FakeClient()
+    section_id = create_section(client)
+    other_section_id = create_section(client)
+    caching_client = DocumentCachingClient(client, DocumentCache(1024))
+
+    async def read_delete_read():
+        await caching_client.get_section(section_id)
+        await caching_client.delete_section(other_section_id)
+        await caching_client.get_section(section_id)
+
+    run(read_delete_read())
+    assert client.reads == 2
+
+
+def test_ancestor_lookups_are_treated_as_mutations():
+    client = FakeClient()
+    section_id = create_section(client)
+    other_section_id = create_section(client)
+    client.sections[section_id].pop('parent_id')
+    caching_client = DocumentCachingClient(client, DocumentCache(1024))
+
+    async def read_lookup_read():
+        await caching_client.get_section(section_id)
+        await caching_client.get_section_ancestor_ids(other_section_id)
+        return await caching_client.get_section(section_id)
+
+    assert run(read_lookup_read())['parent_id'] is None
+    assert client.reads == 2
+
+
+def test_uncached_reads_and_other_attributes_pass_through():
+    client = FakeClient()
+    section_id = create_section(client)
+    caching_client = DocumentCachingClient(client, DocumentCache(1024))
+
+    async def read():
+        await caching_client.get_section(section_id)
+        await caching_client.get_sections([section_id])
+        await caching_client.get_section(section_id)
+
+    run(read())
+    assert client.reads == 1
+    assert caching_client.host() == 'localhost'
+    assert caching_client.wrapped_client is client
+
+
+def test_a_read_overlapping_a_mutation_is_not_cached():
+    client = FakeClient()
+    section_id = create_section(client, 'Title')
+    caching_client = DocumentCachingClient(client, DocumentCache(1024))
+
+    async def write_during_read():
+        # The title is changed after the read has begun, as it would be by a write that finishes first.
+        client.before_read = lambda: caching_client.set_section_title(section_id, 'New Title')
+        await caching_client.get_section(section_id)
+        client.before_read = None
+        return await caching_client.get_section(section_id)
+
+    assert run(write_during_read())['title'] == 'New Title'
+    assert client.reads == 2
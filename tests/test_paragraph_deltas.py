@@ -0,0 +1,70 @@
+from loom.database.interfaces.mongodb_interfaces import generate_create_link_encoding
+from loom.text_delta import apply_text_operations
+from tests.helpers import run
+from tests.mock_database import MockInterface
+
+import pytest
+
+
+def insert(index, text):
+    return {'type': 'insert', 'index': index, 'text': text}
+
+
+def delete(index, length):
+    return {'type': 'delete', 'index': index, 'length': length}
+
+
+async def read_paragraph(interface, section_id, paragraph_id):
+    return [
+        await interface.client.get_paragraph_text(section_id, paragraph_id),
+        await interface.client.get_links_in_paragraph(paragraph_id, section_id),
+        await interface.client.get_passive_links_in_paragraph(paragraph_id, section_id),
+        await interface.get_paragraph_statistics(section_id, paragraph_id),
+        await interface.get_section_statistics(section_id),
+    ]
+
+
+@pytest.mark.parametrize('paragraph_documents', [False, True])
+def test_deltas_update_links_and_statistics_as_a_full_rescan_would(paragraph_documents):
+    async def edit():
+        interface = MockInterface(paragraph_documents)
+        user_id = await interface.create_user('user', 'password', 'User', 'user@example.com')
+        wiki_id = await interface.create_wiki(user_id, 'Wiki', 'A wiki.')
+        segment_id = (await interface.get_wiki(wiki_id))['segment_id']
+        scrooge_page_id, _ = await interface.create_page(wiki_id, 'Scrooge', segment_id)
+        bob_page_id, _ = await interface.create_page(wiki_id, 'Bob Cratchit', segment_id)
+        story_id = await interface.create_story(user_id, 'Story', 'A story.', wiki_id)
+        # The paragraph is the only one in its section, so the section's statistics are the paragraph's.
+        section_id = await interface.add_inner_subsection('Inner', (await interface.get_story(story_id))['section_id'])
+        text, paragraph_id, *_ = await interface.add_paragraph(wiki_id, section_id, '')
+
+        # Each edit is made against the text as it was stored after the one before it.
+        edits = [
+            lambda text: [insert(0, 'It was cold. ' + generate_create_link_encoding(story_id, bob_page_id, 'Bob')
+                                 + ' worked. Scrooge watched.')],
+            lambda text: [insert(text.rindex('. ') + 2, 'Bob Cratchit shivered. ')],
+            lambda text: [delete(0, text.index(' ') + 1)],
+            lambda text: [insert(0, 'At last ' + generate_create_link_encoding(story_id, scrooge_page_id, 'Ebenezer')
+                                 + ' ')],
+            lambda text: [delete(text.index('worked'), len('worked')), insert(text.index('worked'), 'wrote')],
+            lambda text: [delete(len(text) - 1, 1), insert(len(text) - 1, '!')],
+            lambda text: [delete(0, len(text)), insert(0, 'Nothing.')],
+        ]
+
+        results = []
+        for edit_operations in edits:
+            operations, *_ = await interface.apply_paragraph_delta(wiki_id, section_id, edit_operations(text),
+                                                                     paragraph_id)
+            text = apply_text_operations(text, operations)
+            links, passive_links = await interface._get_link_ids_in_text(wiki_id, text)
+            _, word_frequencies = await interface._get_links_and_word_counts_from_paragraph(wiki_id, text)
+            results.append((await read_paragraph(interface, section_id, paragraph_id),
+                            [text, links, passive_links, dict(word_frequencies)]))
+        return results
+
+    results = run(edit())
+    assert len(results) == 7
+    for stored, rescanned in results:
+        text, links, passive_links, paragraph_statistics, section_statistics = stored
+        assert [text, links, passive_links, paragraph_statistics['word_frequency']] == rescanned
+        assert section_statistics['word_frequency'] == paragraph_statistics['word_frequency']
@@ -0,0 +1,75 @@
+from loom.database.interfaces.mongodb_interfaces import generate_create_link_encoding
+from tests.helpers import run
+from tests.mock_database import MockInterface, MockParagraphsClient, label_object_ids
+
+
+async def create_story(interface):
+    user_id = await interface.create_user('user', 'password', 'User', 'user@example.com')
+    wiki_id = await interface.create_wiki(user_id, 'Wiki', 'A wiki.')
+    segment_id = (await interface.get_wiki(wiki_id))['segment_id']
+    scrooge_page_id, _ = await interface.create_page(wiki_id, 'Scrooge', segment_id)
+    bob_page_id, _ = await interface.create_page(wiki_id, 'Bob Cratchit', segment_id)
+    story_id = await interface.create_story(user_id, 'Story', 'A story.', wiki_id)
+    section_id = (await interface.get_story(story_id))['section_id']
+    # Paragraphs are added at the end and in the middle, edited, given notes and links, and deleted.
+    inner_section_id = await interface.add_inner_subsection('Inner', section_id)
+    _, first_id, *_ = await interface.add_paragraph(wiki_id, section_id, 'First Scrooge.')
+    _, third_id, *_ = await interface.add_paragraph(
+        wiki_id, section_id, 'Third ' + generate_create_link_encoding(story_id, bob_page_id, 'Bob') + '.')
+    _, second_id, *_ = await interface.add_paragraph(wiki_id, section_id, 'Second Bob Cratchit.', third_id)
+    await interface.add_paragraph(wiki_id, section_id, 'Zeroth.', first_id)
+    await interface.set_note(section_id, second_id, 'A note.')
+    await interface.set_paragraph_text(
+        wiki_id, section_id,
+        'Third, Scrooge ' + generate_create_link_encoding(story_id, scrooge_page_id, 'Ebenezer') + '.', third_id)
+    await interface.delete_paragraph(story_id, section_id, first_id)
+    await interface.add_paragraph(wiki_id, section_id, 'Fourth.', second_id)
+    await interface.add_paragraph(wiki_id, inner_section_id, 'Inner Scrooge.')
+    return story_id, section_id, inner_section_id
+
+
+async def read_story(interface, story_id, section_id, inner_section_id):
+    return [
+        await interface.get_section_content(section_id),
+        await interface.get_section_content(inner_section_id),
+        await interface.client.get_section(section_id),
+        await interface.client.get_paragraph_ids(section_id),
+        await interface.get_story_statistics(story_id),
+    ]
+
+
+def test_paragraph_documents_match_the_default_layout():
+    async def build_and_read(paragraph_documents):
+        interface = MockInterface(paragraph_documents)
+        story = await create_story(interface)
+        return label_object_ids(await read_story(interface, *story))
+
+    assert run(build_and_read(True)) == run(build_and_read(False))
+
+
+def test_migration_to_paragraph_documents_and_back():
+    async def migrate():
+        interface = MockInterface()
+        story = await create_story(interface)
+        sections_before = await interface.client.sections.find({}).to_list(None)
+        read_before = await read_story(interface, *story)
+        # The migrated database is read through a client for the new layout.
+        client = MockParagraphsClient()
+        client._database = interface.client.database
+        migrated = await client.migrate_sections_to_paragraph_documents()
+        migrated_again = await client.migrate_sections_to_paragraph_documents()
+        interface._client = client
+        read_migrated = await read_story(interface, *story)
+        paragraph_count = await client.paragraphs.count_documents({})
+        restored = await client.migrate_paragraph_documents_to_sections()
+        sections_after = await client.sections.find({}).to_list(None)
+        return (migrated, migrated_again, read_before, read_migrated, paragraph_count, restored, sections_before,
+                sections_after)
+
+    (migrated, migrated_again, read_before, read_migrated, paragraph_count, restored, sections_before,
+     sections_after) = run(migrate())
+    assert (migrated, migrated_again, restored) == (2, 0, 2)
+    assert paragraph_count == 6
+    assert read_migrated == read_before
+    assert sections_after == sections_before
+
@@ -0,0 +1,315 @@
+from loom.routers import Router
+from tests.helpers import run_on_ioloop
+from tests.mock_database import MockInterface
+
+from tornado import gen
+from tornado.locks import Event
+from uuid import uuid4
+
+import pytest
+
+
+class RecordingHandler:
+    def __init__(self):
+        self.uuid = uuid4()
+        self.messages = []
+
+    def write_json(self, message):
+        self.messages.append(message)
+
+    def events(self):
+        return [(message.identifier.message_id, message.event) for message in self.messages]
+
+
+async def create_user_wiki_and_story(interface, username='user'):
+    user_id = await interface.create_user(username, 'password', 'User', f'{username}@example.com')
+    wiki_id = await interface.create_wiki(user_id, 'Wiki', 'A wiki.')
+    segment_id = (await interface.get_wiki(wiki_id))['segment_id']
+    await interface.create_page(wiki_id, 'Scrooge', segment_id)
+    story_id = await interface.create_story(user_id, 'Story', 'A story.', wiki_id)
+    section_id = (await interface.get_story(story_id))['section_id']
+    inner_section_id = await interface.add_inner_subsection('Inner', section_id)
+    await interface.add_paragraph(wiki_id, inner_section_id, 'Scrooge.')
+    return user_id, wiki_id, segment_id, story_id, section_id
+
+
+async def count_wiki_documents(interface, wiki_id, segment_ids):
+    # The story is given a replacement wiki when its wiki is deleted, so only the original wiki's documents are counted.
+    return (await interface.client.wikis.count_documents({'_id': wiki_id}),
+            await interface.client.segments.count_documents({'_id': {'$in': segment_ids}}),
+            await interface.client.pages.count_documents({'title': 'Scrooge'}))
+
+
+async def send(router, handler, action, message_id, **fields):
+    await router.enqueue_message(handler, dict(fields, uuid=handler.uuid, message_id=message_id), action, handler.uuid,
+                                 message_id)
+
+
+async def settle(router):
+    # Finished jobs release the messages held for them through the message queue.
+    await router.jobs_resumed.wait()
+    await router.message_tuples.join()
+    await router.jobs.join()
+    await router.message_tuples.join()
+
+
+def set_text(text):
+    return {'update_type': 'set_text', 'text': text}
+
+
+def record_saved_texts(interface, edited_paragraph_id):
+    saved_texts = []
+    set_paragraph_text = interface.set_paragraph_text
+
+    async def recorded(wiki_id, section_id, text, paragraph_id):
+        if paragraph_id == edited_paragraph_id:
+            saved_texts.append(text)
+        return await set_paragraph_text(wiki_id, section_id, text, paragraph_id)
+    interface.set_paragraph_text = recorded
+    return saved_texts
+
+
+def block(method, reached, release):
+    # Holds the method up until it is released, so that the state while it is running can be checked.
+    async def blocked(*args, **kwargs):
+        reached.set()
+        await release.wait()
+        return await method(*args, **kwargs)
+    return blocked
+
+
+###########################################################################
+#
+# Job Tests
+#
+###########################################################################
+
+def test_long_running_action_is_saved_and_run_as_a_job():
+    async def delete_wiki():
+        interface = MockInterface()
+        user_id, wiki_id, segment_id, _, _ = await create_user_wiki_and_story(interface)
+        segment_ids = await interface.client.segments.distinct('_id')
+        reached, release = Event(), Event()
+        interface.delete_wiki = block(interface.delete_wiki, reached, release)
+        router = Router(interface, job_workers=1)
+        handler = RecordingHandler()
+        router.connect(handler, user_id)
+        # The wiki is not named in the message, so it is taken from the subscription.
+        await send(router, handler, 'subscribe_to_wiki', 1, wiki_id=wiki_id)
+        await send(router, handler, 'delete_wiki', 2)
+        await reached.wait()
+        jobs_while_running = await interface.client.jobs.find({}).to_list(None)
+        release.set()
+        await settle(router)
+        return (user_id, wiki_id, segment_id, handler.events(), jobs_while_running,
+                await interface.client.jobs.find({}).to_list(None), await count_wiki_documents(interface, wiki_id, segment_ids))
+
+    user_id, wiki_id, segment_id, events, jobs_while_running, jobs, wiki_documents = run_on_ioloop(delete_wiki())
+    assert events[:4] == [(1, 'subscribed_to_wiki'), (2, 'job_queued'), (2, 'job_started'), (2, 'wiki_deleted')]
+    assert events[-1] == (2, 'job_finished')
+    [job] = jobs_while_running
+    assert job['action'] == 'delete_wiki'
+    assert job['status'] == 'running'
+    # The message is saved as it was sent, and the sender and their subscriptions are kept alongside it.
+    assert job['message'] == {}
+    assert (job['user_id'], job['story_id'], job['wiki_id']) == (user_id, None, wiki_id)
+    assert job['progress'] == {'segment_id': segment_id}
+    assert jobs == []
+    assert wiki_documents == (0, 0, 0)
+
+
+def test_messages_for_a_job_are_held_until_it_is_finished():
+    async def delete_story():
+        interface = MockInterface()
+        user_id, _, _, story_id, _ = await create_user_wiki_and_story(interface)
+        reached, release = Event(), Event()
+        interface.delete_story = block(interface.delete_story, reached, release)
+        router = Router(interface, job_workers=1)
+        handler = RecordingHandler()
+        router.connect(handler, user_id)
+        await send(router, handler, 'delete_story', 1, story_id=story_id)
+        await send(router, handler, 'get_story_information', 2, story_id=story_id)
+        await send(router, handler, 'get_user_preferences', 3)
+        await reached.wait()
+        await router.message_tuples.join()
+        events_while_running = handler.events()
+        held_message_ids = [held_message.message_tuple.message_id for held_message in router.held_messages]
+        release.set()
+        await settle(router)
+        return events_while_running, held_message_ids, handler.events(), router.held_messages
+
+    events_while_running, held_message_ids, events, held_messages = run_on_ioloop(delete_story())
+    # Messages that do not touch the story are answered while the job runs.
+    assert sorted(events_while_running) == [(1, 'job_queued'), (1, 'job_started'), (3, 'got_user_preferences')]
+    assert held_message_ids == [2]
+    # The held message is answered once the story is gone.
+    assert events[-2:] == [(1, 'job_finished'), (2, 'error_occurred')]
+    assert held_messages == []
+
+
+@pytest.mark.parametrize('wiki_deleted', [False, True])
+def test_interrupted_delete_wiki_job_is_resumed(wiki_deleted):
+    async def resume():
+        interface = MockInterface()
+        user_id, wiki_id, segment_id, _, _ = await create_user_wiki_and_story(interface)
+        segment_ids = await interface.client.segments.distinct('_id')
+        # The job was left running by the last run after it saved its progress, and perhaps after deleting the wiki.
+        job_id = await interface.create_job('delete_wiki', {}, user_id, str(uuid4()), 1, None, wiki_id)
+        await interface.start_job(job_id)
+        await interface.save_job_progress(job_id, {'segment_id': segment_id})
+        if wiki_deleted:
+            await interface.delete_wiki(user_id, wiki_id)
+        router = Router(interface, job_workers=1)
+        await settle(router)
+        return await interface.client.jobs.find({}).to_list(None), await count_wiki_documents(interface, wiki_id, segment_ids)
+
+    assert run_on_ioloop(resume()) == ([], (0, 0, 0))
+
+
+def test_interrupted_delete_story_job_is_run_again():
+    async def resume():
+        interface = MockInterface()
+        user_id, _, _, story_id, section_id = await create_user_wiki_and_story(interface)
+        job_id = await interface.create_job('delete_story', {'story_id': story_id}, user_id, str(uuid4()), 1)
+        await interface.start_job(job_id)
+        # The job was interrupted after deleting the story's subsection, but before its root section.
+        inner_section_id = (await interface.client.get_section(section_id))['inner_subsections'][0]
+        await interface.client.sections.delete_one({'_id': inner_section_id})
+        router = Router(interface, job_workers=1)
+        await settle(router)
+        return (await interface.client.jobs.find({}).to_list(None), await interface.client.stories.count_documents({}),
+                await interface.client.sections.count_documents({}), (await interface.client.users.find_one({'_id': user_id}))['stories'])
+
+    assert run_on_ioloop(resume()) == ([], 0, 0, [])
+
+
+def test_failed_job_is_kept_and_not_resumed():
+    async def fail():
+        interface = MockInterface()
+        user_id, _, _, story_id, _ = await create_user_wiki_and_story(interface)
+
+        async def delete_story(story_id, user_id):
+            raise RuntimeError
+        interface.delete_story = delete_story
+        router = Router(interface, job_workers=1)
+        handler = RecordingHandler()
+        router.connect(handler, user_id)
+        await send(router, handler, 'delete_story', 1, story_id=story_id)
+        await settle(router)
+        # A later run leaves the failed job alone.
+        await settle(Router(interface, job_workers=1))
+        return handler.messages[-1].succeeded, await interface.client.jobs.find({}).to_list(None)
+
+    succeeded, jobs = run_on_ioloop(fail())
+    assert not succeeded
+    assert [job['status'] for job in jobs] == ['failed']
+
+
+###########################################################################
+#
+# Edit Coalescing Tests
+#
+###########################################################################
+
+async def start_editing(edit_coalescing_window):
+    interface = MockInterface()
+    user_id, wiki_id, _, story_id, section_id = await create_user_wiki_and_story(interface)
+    _, paragraph_id, *_ = await interface.add_paragraph(wiki_id, section_id, 'First.')
+    saved_texts = record_saved_texts(interface, paragraph_id)
+    router = Router(interface, edit_coalescing_window)
+    handler = RecordingHandler()
+    router.connect(handler, user_id)
+    await send(router, handler, 'subscribe_to_story', 1, story_id=story_id)
+
+    async def edit(message_id, text):
+        await send(router, handler, 'edit_paragraph', message_id, wiki_id=wiki_id, section_id=section_id,
+                   paragraph_id=paragraph_id, update=set_text(text))
+
+    async def read(message_id):
+        await send(router, handler, 'get_story_information', message_id, story_id=story_id)
+        await router.message_tuples.join()
+        return await interface.client.get_paragraph_text(section_id, paragraph_id)
+    return interface, router, handler, saved_texts, edit, read
+
+
+def test_coalesced_edits_are_acknowledged_in_order_and_only_the_latest_is_saved():
+    async def coalesce():
+        interface, router, handler, saved_texts, edit, read = await start_editing(60)
+        await edit(2, 'Second.')
+        await edit(3, 'Third.')
+        await edit(4, 'Fourth.')
+        await router.message_tuples.join()
+        events_while_held = handler.events()
+        text = await read(5)
+        return events_while_held, handler.events(), saved_texts, text
+
+    events_while_held, events, saved_texts, text = run_on_ioloop(coalesce())
+    assert events_while_held == [(1, 'subscribed_to_story')]
+    assert events == [(1, 'subscribed_to_story'), (2, 'paragraph_edit_coalesced'), (3, 'paragraph_edit_coalesced'),
+                      (4, 'paragraph_updated'), (5, 'got_story_information')]
+    assert saved_texts == ['Fourth.']
+    assert text == 'Fourth.'
+
+
+def test_edits_are_saved_when_the_window_ends():
+    async def wait():
+        interface, router, handler, saved_texts, edit, read = await start_editing(0.01)
+        await edit(2, 'Second.')
+        await edit(3, 'Third.')
+        await gen.sleep(0.05)
+        await router.message_tuples.join()
+        return handler.events(), saved_texts, router.pending_paragraph_edits
+
+    events, saved_texts, pending_paragraph_edits = run_on_ioloop(wait())
+    assert events[1:] == [(2, 'paragraph_edit_coalesced'), (3, 'paragraph_updated')]
+    assert saved_texts == ['Third.']
+    assert pending_paragraph_edits == {}
+
+
+def test_messages_for_other_stories_and_wikis_leave_edits_held():
+    async def other_user():
+        interface, router, handler, saved_texts, edit, read = await start_editing(60)
+        await edit(2, 'Second.')
+        other_user_id, _, _, other_story_id, _ = await create_user_wiki_and_story(interface, 'other')
+        other_handler = RecordingHandler()
+        router.connect(other_handler, other_user_id)
+        await send(router, other_handler, 'subscribe_to_story', 1, story_id=other_story_id)
+        await send(router, other_handler, 'get_story_information', 2, story_id=other_story_id)
+        await send(router, other_handler, 'get_user_preferences', 3)
+        await router.message_tuples.join()
+        saved_texts_before_read = list(saved_texts)
+        text = await read(3)
+        return other_handler.events(), saved_texts_before_read, saved_texts, text
+
+    other_events, saved_texts_before_read, saved_texts, text = run_on_ioloop(other_user())
+    assert other_events == [(1, 'subscribed_to_story'), (2, 'got_story_information'), (3, 'got_user_preferences')]
+    assert saved_texts_before_read == []
+    # A message for the edited story saves the edit before it is handled.
+    assert saved_texts == ['Second.']
+    assert text == 'Second.'
+
+
+def test_timeout_firing_after_edits_are_saved_leaves_later_edits_held():
+    async def late_timeout():
+        interface, router, handler, saved_texts, edit, read = await start_editing(60)
+        await edit(2, 'Second.')
+        await router.message_tuples.join()
+        [(key, pending)] = router.pending_paragraph_edits.items()
+        await read(3)
+        await edit(4, 'Third.')
+        # The first edit's timeout fired just before the read saved the edit, so its flush arrives afterwards.
+        await router.message_tuples.put(Router.PendingParagraphEditFlush(key, pending))
+        await router.message_tuples.join()
+        held_message_ids = [message_tuple.message_id
+                            for message_tuple, _, _, _ in router.pending_paragraph_edits[key].edits]
+        saved_texts_before_read = list(saved_texts)
+        text = await read(5)
+        return held_message_ids, saved_texts_before_read, saved_texts, text, handler.events()
+
+    held_message_ids, saved_texts_before_read, saved_texts, text, events = run_on_ioloop(late_timeout())
+    assert held_message_ids == [4]
+    assert saved_texts_before_read == ['Second.']
+    assert saved_texts == ['Second.', 'Third.']
+    assert text == 'Third.'
+    assert events == [(1, 'subscribed_to_story'), (2, 'paragraph_updated'), (3, 'got_story_information'),
+                      (4, 'paragraph_updated'), (5, 'got_story_information')]
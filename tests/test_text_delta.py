@@ -0,0 +1,124 @@
+from loom.text_delta import apply_text_operations, diff_text_operations, find_changed_sentences, TextOperationError
+from loom.tokenizer import LoomTokenizer
+
+import pytest
+
+
+def insert(index, text):
+    return {'type': 'insert', 'index': index, 'text': text}
+
+
+def delete(index, length):
+    return {'type': 'delete', 'index': index, 'length': length}
+
+
+def changed_sentences(old_text, new_text):
+    return find_changed_sentences(old_text, LoomTokenizer.sent_span_tokenize(old_text),
+                                  new_text, LoomTokenizer.sent_span_tokenize(new_text))
+
+
+###########################################################################
+#
+# apply_text_operations Tests
+#
+###########################################################################
+
+def test_operations_apply_in_order():
+    operations = [insert(5, ' there'), delete(0, 1), insert(0, 'J')]
+    assert apply_text_operations('Hello.', operations) == 'Jello there.'
+
+
+def test_no_operations_leave_the_text_unchanged():
+    assert apply_text_operations('Hello.', []) == 'Hello.'
+
+
+def test_operations_may_touch_both_ends_of_the_text():
+    assert apply_text_operations('ab', [insert(2, 'c'), delete(0, 1)]) == 'bc'
+
+
+@pytest.mark.parametrize('operations', [
+    None,
+    [None],
+    [{'index': 0}],
+    [{'type': 'insert'}],
+    [{'type': 'replace', 'index': 0}],
+    [insert(-1, 'x')],
+    [insert(3, 'x')],
+    [insert('0', 'x')],
+    [{'type': 'insert', 'index': 0}],
+    [delete(0, 3)],
+    [delete(1, -1)],
+    [{'type': 'delete', 'index': 0}],
+])
+def test_invalid_operations_are_rejected(operations):
+    with pytest.raises(TextOperationError):
+        apply_text_operations('ab', operations)
+
+
+###########################################################################
+#
+# diff_text_operations Tests
+#
+###########################################################################
+
+@pytest.mark.parametrize('old_text, new_text', [
+    ('', ''),
+    ('same', 'same'),
+    ('', 'new'),
+    ('old', ''),
+    ('abc', 'abXc'),
+    ('abXc', 'abc'),
+    ('a {link} b', 'a {"$oid":"0"} b'),
+    ('aaaa', 'aa'),
+    ('abab', 'ab'),
+])
+def test_diff_operations_turn_the_old_text_into_the_new_text(old_text, new_text):
+    assert apply_text_operations(old_text, diff_text_operations(old_text, new_text)) == new_text
+
+
+def test_diff_operations_replace_only_the_changed_middle():
+    assert diff_text_operations('The cat sat.', 'The dog sat.') == [delete(4, 3), insert(4, 'dog')]
+    assert diff_text_operations('same', 'same') == []
+
+
+###########################################################################
+#
+# find_changed_sentences Tests
+#
+###########################################################################
+
+def test_changed_sentence_in_the_middle():
+    old_text = 'One fish. Two fish. Red fish.'
+    new_text = 'One fish. Two blue fish. Red fish.'
+    old_start, old_end, new_start, new_end = changed_sentences(old_text, new_text)
+    assert old_text[:old_start] == new_text[:new_start] == 'One fish.'
+    assert old_text[old_end:] == new_text[new_end:] == 'Red fish.'
+    assert new_text[new_start:new_end].strip() == 'Two blue fish.'
+
+
+def test_appended_sentence():
+    old_text = 'One fish.'
+    new_text = 'One fish. Two fish.'
+    old_start, old_end, new_start, new_end = changed_sentences(old_text, new_text)
+    assert (old_start, old_end) == (len(old_text), len(old_text))
+    assert new_text[new_start:new_end] == ' Two fish.'
+
+
+def test_every_sentence_changed():
+    old_text = 'One fish.'
+    new_text = 'Two fish.'
+    assert changed_sentences(old_text, new_text) == (0, len(old_text), 0, len(new_text))
+
+
+def test_unchanged_text_has_an_empty_changed_range():
+    text = 'One fish. Two fish.'
+    old_start, old_end, new_start, new_end = changed_sentences(text, text)
+    assert old_start == old_end
+    assert new_start == new_end
+
+
+def test_unchanged_text_around_the_change_is_kept():
+    old_text = 'One fish. Two fish. Red fish. Blue fish.'
+    new_text = 'One fish. Two fish! Blue fish.'
+    old_start, old_end, new_start, new_end = changed_sentences(old_text, new_text)
+    assert old_text[:old_start] + new_text[new_start:new_end] + old_text[old_end:] == new_text